@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Micro-benchmark da detecção de banco
+
+Compara, por documento, o tempo de casar os padrões no texto de amostra:
+
+- antes: re.search de cada padrão, banco a banco, até o primeiro acerto
+- antes (todos): re.search de todos os padrões, para ter a pontuação por banco
+- depois: BankPatternMatcher (uma leitura do texto + confirmação), que já
+  devolve a pontuação de todos os bancos
+
+A extração do texto (pdfplumber) é feita uma vez e fica fora da medição.
+
+Uso:
+    python benchmarks/bench_bank_detection.py [pasta_pdfs] [repeticoes]
+"""
+
+import re
+import sys
+import os
+import time
+from pathlib import Path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from core.bank_detector import BankDetector, BankType
+
+
+def legacy_scores(text: str) -> dict:
+    """Pontuação como era feita antes: re.search padrão a padrão"""
+
+    scores = {}
+    for bank_type, patterns in BankDetector.BANK_PATTERNS.items():
+        scores[bank_type] = sum(
+            1 for pattern in patterns if re.search(pattern, text, re.IGNORECASE)
+        )
+    return scores
+
+
+def legacy_detect(text: str) -> BankType:
+    """Detecção antiga: primeiro banco com algum padrão encontrado"""
+
+    for bank_type, patterns in BankDetector.BANK_PATTERNS.items():
+        score = 0
+        for pattern in patterns:
+            try:
+                if re.search(pattern, text, re.IGNORECASE):
+                    score += 1
+            except:
+                continue
+        if score >= 1:
+            return bank_type
+    return BankType.UNKNOWN
+
+
+def new_detect(text: str) -> BankType:
+    return BankDetector.best_match(BankDetector.score_text(text))
+
+
+def time_per_call(func, text: str, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func(text)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    input_folder = Path(sys.argv[1] if len(sys.argv) > 1 else "data/input")
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    pdf_files = sorted(input_folder.glob("*.pdf"))
+    if not pdf_files:
+        print(f"Nenhum PDF encontrado em: {input_folder}")
+        return
+
+    print(f"📄 Lendo amostras de {len(pdf_files)} PDFs...")
+    samples = {pdf_file.name: BankDetector.read_text_sample(str(pdf_file)) for pdf_file in pdf_files}
+
+    # Compila os padrões antes de medir
+    BankDetector.get_matcher()
+
+    print(f"\n{'arquivo':<46} {'antes ms':>9} {'todos ms':>9} {'depois ms':>10}  banco")
+    print("-" * 96)
+
+    total_before = total_all = total_after = 0.0
+    for name, text in samples.items():
+        before_result = legacy_detect(text)
+        after_result = new_detect(text)
+        assert before_result == after_result, f"{name}: {before_result} != {after_result}"
+        assert legacy_scores(text) == BankDetector.score_text(text), f"{name}: pontuações diferentes"
+
+        before = time_per_call(legacy_detect, text, repeats)
+        before_all = time_per_call(legacy_scores, text, repeats)
+        after = time_per_call(new_detect, text, repeats)
+        total_before += before
+        total_all += before_all
+        total_after += after
+
+        print(f"{name[:46]:<46} {before:>9.3f} {before_all:>9.3f} {after:>10.3f}  {after_result.value}")
+
+    n = len(samples)
+    print("-" * 96)
+    print(f"{'média por documento':<46} {total_before / n:>9.3f} {total_all / n:>9.3f} {total_after / n:>10.3f}")
+    print(f"\n⚡ {total_before / total_after:.1f}x mais rápido que a detecção antiga "
+          f"e {total_all / total_after:.1f}x que pontuar todos os padrões (mesmos resultados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Micro-benchmark da separação das linhas por banco no consolidado
+
+Para quantidades crescentes de bancos, compara o tempo de obter as linhas
+de cada banco (na ordem original) para as abas do Excel:
+
+- antes: for banco in df.banco_detectado.unique(): df[df.banco_detectado == banco]
+- depois: códigos da categoria + uma ordenação estável (como o ExcelSink)
+
+e confere que as posições de cada banco são as mesmas. A gravação da
+planilha fica fora da medição (ver bench_excel_writer.py).
+
+Uso:
+    python benchmarks/bench_bank_partitions.py [linhas] [bancos,bancos,...]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ROWS = 500000
+DEFAULT_BANKS = "5,20,50,100"
+
+
+def partitions_before(df: pd.DataFrame) -> dict:
+    partitions = {}
+    for banco in df['banco_detectado'].unique():
+        if pd.notna(banco):
+            partitions[banco] = np.flatnonzero(df['banco_detectado'] == banco)
+    return partitions
+
+
+def partitions_after(df: pd.DataFrame) -> dict:
+    banks = df['banco_detectado'].astype('category')
+    codes = banks.cat.codes.to_numpy()
+    order = np.argsort(codes, kind='stable')
+
+    partitions = {}
+    for positions in np.split(order, np.flatnonzero(np.diff(codes[order])) + 1):
+        if codes[positions[0]] >= 0:
+            partitions[banks.cat.categories[codes[positions[0]]]] = positions
+    # Mesma ordem de abas: bancos na ordem em que aparecem
+    return {banco: partitions[banco] for banco in banks.unique().dropna()}
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    counts = list(map(int, (sys.argv[2] if len(sys.argv) > 2 else DEFAULT_BANKS).split(',')))
+    rng = np.random.default_rng(0)
+
+    print(f"{'bancos':>7} {'antes s':>8} {'depois s':>9}")
+    print("-" * 26)
+
+    for banks in counts:
+        names = np.array([f"Banco {i:03d}" for i in range(banks)], dtype=object)
+        df = pd.DataFrame({'banco_detectado': names[rng.integers(0, banks, rows)]})
+
+        start = time.perf_counter()
+        expected = partitions_before(df)
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = partitions_after(df)
+        after = time.perf_counter() - start
+
+        assert list(result) == list(expected), "ordem das abas diferente"
+        assert all(np.array_equal(result[b], expected[b]) for b in expected), "linhas diferentes"
+
+        print(f"{banks:>7} {before:>8.3f} {after:>9.3f}")
+
+    print(f"\n⚡ {before / after:.1f}x mais rápido com {counts[-1]} bancos e {rows} linhas (mesmas linhas por aba)")
+
+
+if __name__ == "__main__":
+    main()
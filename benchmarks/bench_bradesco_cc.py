@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Micro-benchmark do agrupamento de linhas do Bradesco conta corrente
+
+Monta páginas sintéticas com milhares de linhas no formato do extrato e
+mede, por tamanho de página, o tempo de agrupar as linhas em transações:
+
+- antes: laço com busca à frente (while j < len(lines)), junção do bloco
+  num texto e novo re.findall sobre ele
+- depois: iter_bradesco_cc_lines (uma passada, uma regex por linha), com
+  datas e valores convertidos em bloco por bradesco_cc_frame
+
+Dois formatos de página: uma data por transação, e poucas datas seguidas
+de blocos longos (como no extrato real, em que só a primeira transação
+do dia tem data). O tempo por linha deve ficar estável conforme a página
+cresce. Os dois lados terminam no DataFrame da página; a extração do texto
+do PDF fica fora da medição.
+
+Uso:
+    python benchmarks/bench_bradesco_cc.py [repeticoes]
+"""
+
+import re
+import sys
+import os
+import time
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import pandas as pd
+
+from parsers.bradesco.bradesco_conta_corrente import bradesco_cc_frame, bradesco_cc_rows, iter_bradesco_cc_lines
+
+SIZES = [1000, 2000, 4000, 8000, 16000]
+
+# Colunas comparadas entre os dois lados
+COLUMNS = ['data_movimento', 'historico', 'documento', 'credito', 'debito', 'saldo', 'tipo']
+
+
+def legacy_group(lines):
+    """Agrupamento como era feito antes (mesmas regras, mesmo resultado)"""
+
+    rows = []
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        date_match = re.match(r'^(\d{2}/\d{2}/\d{4})', line)
+        if date_match:
+            try:
+                date_obj = datetime.strptime(date_match.group(1), '%d/%m/%Y')
+                if 'SALDO ANTERIOR' in line.upper():
+                    i += 1
+                    continue
+
+                linhas_transacao = [line[10:].strip()]
+                j = i + 1
+                while j < len(lines) and not re.match(r'^\d{2}/\d{2}/\d{4}', lines[j]):
+                    if lines[j].strip():
+                        linhas_transacao.append(lines[j].strip())
+                    j += 1
+
+                texto_completo = ' '.join(linhas_transacao)
+                valores = re.findall(r'([\d.,]+)', texto_completo)
+
+                if len(valores) >= 2:
+                    saldo = float(valores[-1].replace('.', '').replace(',', '.'))
+                    valor = float(valores[-2].replace('.', '').replace(',', '.'))
+                    if '-' in texto_completo or 'CHEQUE' in texto_completo.upper():
+                        credito, debito, tipo = 0.0, valor, 'debit'
+                    else:
+                        credito, debito, tipo = valor, 0.0, 'credit'
+                    documento = valores[0] if len(valores) >= 3 else ''
+                    historico = re.sub(r'[\d.,]+', '', texto_completo).strip()
+                    historico = re.sub(r'\s+', ' ', historico)
+                    historico = historico.replace('-', '').strip()
+                    rows.append((date_obj.strftime('%d/%m/%Y'), historico, documento,
+                                 credito, debito, saldo, tipo))
+
+                i = j - 1
+            except Exception:
+                pass
+        i += 1
+    return rows
+
+
+def legacy_frame(lines):
+    """DataFrame da página como era montado antes (valores já convertidos por linha)"""
+
+    return pd.DataFrame(legacy_group(lines), columns=COLUMNS)
+
+
+def new_frame(lines):
+    """Agrupamento em uma passada e conversão em bloco"""
+
+    rows = bradesco_cc_rows('extrato.pdf')
+    for row in iter_bradesco_cc_lines(lines):
+        rows.append(*row)
+    return bradesco_cc_frame(rows)
+
+
+def synthetic_page(size: int, dated_every: int) -> list:
+    """Linhas no formato do extrato; uma data a cada dated_every transações"""
+
+    lines = ['Data Lançamento Dcto. Crédito (R$) Débito (R$) Saldo (R$)',
+             '30/09/2025 SALDO ANTERIOR 495.514,07']
+    saldo = 495514.07
+    n = 0
+    while len(lines) < size:
+        valor = 100 + (n * 37) % 9000
+        saldo += valor
+        valores = f"{200 + n} {valor:,.2f} {saldo:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+        day = 1 + (n // dated_every) % 28
+        prefix = f"{day:02d}/10/2025 " if n % dated_every == 0 else ''
+        lines.append('DEP ETV DINHEIRO' if n % 3 else 'PAGTO CHEQUE')
+        lines.append(prefix + valores)
+        lines.append(f"{n % 300} - NISSEI LOJA {n % 97}")
+        n += 1
+    return lines
+
+
+def time_per_call(func, lines: list, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func(lines)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    for label, dated_every in [('uma data por transação', 1), ('data a cada 50 transações', 50)]:
+        print(f"\n📄 {label}")
+        print(f"{'linhas':>8} {'antes ms':>10} {'depois ms':>10} {'antes µs/linha':>15} {'depois µs/linha':>16}")
+        print("-" * 64)
+
+        for size in SIZES:
+            lines = synthetic_page(size, dated_every)
+            expected = legacy_frame(lines)
+            expected['data_movimento'] = pd.to_datetime(expected['data_movimento'], format='%d/%m/%Y')
+            pd.testing.assert_frame_equal(new_frame(lines)[COLUMNS], expected, obj=f"{size} linhas")
+
+            before = time_per_call(legacy_frame, lines, repeats)
+            after = time_per_call(new_frame, lines, repeats)
+            print(f"{len(lines):>8} {before:>10.2f} {after:>10.2f} "
+                  f"{before * 1000 / len(lines):>15.2f} {after * 1000 / len(lines):>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
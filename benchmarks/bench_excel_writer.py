@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Tempo e memória para gravar o consolidado em Excel
+
+Gera transações sintéticas de vários bancos e grava a planilha do
+extrator universal (Todas_Transacoes, uma aba por banco e Resumo):
+
+- antes: pd.ExcelWriter(engine='openpyxl') com um df[df.banco == banco] por aba
+- depois: UniversalExtractor.save_results (ExcelSink em modo write-only)
+
+Cada gravação roda num processo novo, medindo o tempo e o pico de memória
+(RSS) acima do DataFrame já montado. Antes da medição, confere que as duas
+planilhas têm o mesmo conteúdo numa amostra pequena.
+
+Uso:
+    python benchmarks/bench_excel_writer.py [linhas,linhas,...]
+"""
+
+import io
+import contextlib
+import resource
+import subprocess
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+import pandas as pd
+
+from core.universal_extractor import STREAM_COLUMNS, UniversalExtractor, summary_frame
+from utils.pdf_document import current_rss_mb
+
+DEFAULT_ROWS = "20000,100000,200000"
+BANKS = ['Banco do Brasil', 'Banco Bradesco S/A', 'Itaú Unibanco', 'Caixa Econômica Federal', 'Banco Safra']
+
+
+def synthetic_transactions(rows: int) -> tuple[pd.DataFrame, dict]:
+    """Transações com as colunas do consolidado, ordenadas por arquivo e data"""
+
+    rng = np.random.default_rng(0)
+    files = rng.integers(0, 30, rows)
+    valor = rng.normal(0, 1000, rows).round(2)
+
+    df = pd.DataFrame({column: '' for column in STREAM_COLUMNS}, index=range(rows))
+    df['arquivo'] = [f"extrato_{f:02d}.pdf" for f in files]
+    df['banco'] = df['banco_detectado'] = [BANKS[f % len(BANKS)] for f in files]
+    df['codigo_banco'] = [f"{f % len(BANKS):03d}" for f in files]
+    df['data_movimento'] = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 31, rows), unit='D')
+    df['historico'] = [f"PIX RECEBIDO {i}" for i in range(rows)]
+    df['valor'] = valor
+    df['saldo'] = valor.cumsum().round(2)
+    df['tipo'] = np.where(valor > 0, 'credit', 'debit')
+    df = df.sort_values(['arquivo', 'data_movimento'])
+
+    summary = {
+        arquivo: {'banco': group['banco_detectado'].iloc[0], 'status': 'sucesso', 'transacoes': len(group),
+                  'deteccao': 'nome', 'resumo': {'total_creditos': group['valor'].clip(lower=0).sum(),
+                                                'total_debitos': -group['valor'].clip(upper=0).sum()}}
+        for arquivo, group in df.groupby('arquivo')
+    }
+    return df, summary
+
+
+def save_legacy(df: pd.DataFrame, summary: dict, output_folder: str):
+    """save_results antes do ExcelSink"""
+
+    consolidated_file = Path(output_folder) / "extratos_consolidados.xlsx"
+    with pd.ExcelWriter(consolidated_file, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Todas_Transacoes', index=False)
+        for banco in df['banco_detectado'].unique():
+            if pd.notna(banco):
+                df_banco = df[df['banco_detectado'] == banco]
+                sheet_name = banco.replace(' ', '_').replace('/', '_').replace('\\', '_')
+                sheet_name = ''.join(c for c in sheet_name if c.isalnum() or c == '_')[:31]
+                df_banco.to_excel(writer, sheet_name=sheet_name, index=False)
+        summary_frame(summary).to_excel(writer, sheet_name='Resumo', index=False)
+    return consolidated_file
+
+
+def save(mode: str, df: pd.DataFrame, summary: dict, output_folder: str) -> Path:
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'antes':
+            return save_legacy(df, summary, output_folder)
+        return UniversalExtractor().save_results(df, summary, output_folder)
+
+
+def run_child(mode: str, rows: int):
+    """Grava a planilha e imprime segundos e pico de memória acima do DataFrame"""
+
+    df, summary = synthetic_transactions(rows)
+    start_rss = current_rss_mb()
+
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        save(mode, df, summary, folder)
+        elapsed = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.2f} {peak - start_rss:.1f}")
+
+
+def measure(mode: str, rows: int) -> tuple[float, float]:
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', mode, str(rows)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    seconds, memory = output.strip().splitlines()[-1].split()
+    return float(seconds), float(memory)
+
+
+def check_same_workbook(rows: int = 2000):
+    df, summary = synthetic_transactions(rows)
+    with tempfile.TemporaryDirectory() as before, tempfile.TemporaryDirectory() as after:
+        expected = pd.read_excel(save('antes', df, summary, before), sheet_name=None)
+        result = pd.read_excel(save('depois', df, summary, after), sheet_name=None)
+
+    assert list(result) == list(expected), "abas diferentes"
+    for sheet in expected:
+        pd.testing.assert_frame_equal(result[sheet], expected[sheet])
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child(sys.argv[2], int(sys.argv[3]))
+        return
+
+    check_same_workbook()
+    counts = list(map(int, (sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ROWS).split(',')))
+
+    print(f"{'linhas':>8} {'antes s':>8} {'depois s':>9} {'antes MB':>9} {'depois MB':>10}")
+    print("-" * 48)
+
+    for rows in counts:
+        before, before_mb = measure('antes', rows)
+        after, after_mb = measure('depois', rows)
+        print(f"{rows:>8} {before:>8.2f} {after:>9.2f} {before_mb:>9.1f} {after_mb:>10.1f}")
+
+    print(f"\n⚡ {before / after:.1f}x mais rápido, {before_mb / max(after_mb, 1):.1f}x menos memória "
+          f"com {counts[-1]} linhas (mesmas abas e valores)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Pico de memória ao percorrer as páginas de um PDF grande
+
+Para quantidades crescentes de páginas, lê o texto de cada página num
+processo novo e mede o pico de memória (RSS) acima do processo recém-aberto:
+
+- antes: for page in pdf.pages (os objetos de todas as páginas ficam vivos)
+- depois: pdf.iter_pages() (cada página é liberada depois de usada)
+- depois + reabrir: iter_pages com PageLimits(reopen_every=50)
+
+O pico do "depois" deve ficar praticamente igual conforme o número de
+páginas cresce, enquanto o "antes" cresce com ele.
+
+Uso:
+    python benchmarks/bench_page_memory.py [pdf] [páginas,páginas,...]
+"""
+
+import resource
+import subprocess
+import sys
+import os
+from pathlib import Path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.pdf_document import PageLimits, PDFDocument, current_rss_mb
+
+DEFAULT_PAGES = "25,50,100,200,300"
+MODES = ['antes', 'depois', 'reabrir']
+
+
+def peak_rss_mb() -> float:
+    """Pico de memória do processo em MB (ru_maxrss vem em KB no Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_child(mode: str, pdf_path: str, pages: int):
+    """Lê o texto das primeiras páginas e imprime o pico acima da memória inicial"""
+
+    start = current_rss_mb()
+    limits = PageLimits(reopen_every=50) if mode == 'reabrir' else None
+
+    with PDFDocument(pdf_path, limits=limits) as pdf:
+        if mode == 'antes':
+            for page in pdf.pages[:pages]:
+                page.extract_text()
+        else:
+            for page in pdf.iter_pages(0, pages):
+                page.extract_text()
+
+    print(f"{peak_rss_mb() - start:.1f}")
+
+
+def page_count(pdf_path: Path) -> int:
+    with PDFDocument(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def measure(mode: str, pdf_path: Path, pages: int) -> float:
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', mode, str(pdf_path), str(pages)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    if len(sys.argv) > 1:
+        pdf_path = Path(sys.argv[1])
+    else:
+        # PDF com mais páginas da pasta de entrada
+        pdf_files = sorted(Path("data/input").glob("*.pdf"), key=page_count)
+        if not pdf_files:
+            print("Nenhum PDF encontrado em: data/input")
+            return
+        pdf_path = pdf_files[-1]
+
+    total_pages = page_count(pdf_path)
+    counts = [n for n in map(int, (sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PAGES).split(','))
+              if n <= total_pages]
+
+    print(f"📄 {pdf_path.name} ({total_pages} páginas)\n")
+    print(f"{'páginas':>8} {'antes MB':>10} {'depois MB':>10} {'reabrir MB':>11}")
+    print("-" * 42)
+
+    peaks = {mode: [] for mode in MODES}
+    for pages in counts:
+        for mode in MODES:
+            peaks[mode].append(measure(mode, pdf_path, pages))
+        print(f"{pages:>8} {peaks['antes'][-1]:>10.1f} {peaks['depois'][-1]:>10.1f} {peaks['reabrir'][-1]:>11.1f}")
+
+    growth = {mode: values[-1] - values[0] for mode, values in peaks.items()}
+    print(f"\n📈 Crescimento de {counts[0]} para {counts[-1]} páginas: "
+          f"antes {growth['antes']:.1f} MB, depois {growth['depois']:.1f} MB, "
+          f"reabrir {growth['reabrir']:.1f} MB")
+
+    assert growth['depois'] < max(growth['antes'] / 4, 10), "pico de memória cresce com o número de páginas"
+
+
+if __name__ == "__main__":
+    main()
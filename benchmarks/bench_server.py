@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Latência de um extrato: processo novo por arquivo x servidor aquecido
+
+Para os menores PDFs da pasta (o caso do sistema que envia um extrato por
+vez), compara o tempo de resposta de:
+
+- antes: um processo Python novo por arquivo (inicialização, importação de
+  pandas/pdfplumber, padrões de detecção e extração)
+- depois: POST /extrair no servidor (extract_universal.py --serve), com os
+  processos já aquecidos
+
+e confere que as transações devolvidas são as mesmas.
+
+Uso:
+    python benchmarks/bench_server.py [pasta_pdfs] [arquivos]
+"""
+
+import json
+import socket
+import subprocess
+import sys
+import os
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ENTRY_POINT = ROOT / 'extract_universal.py'
+
+DEFAULT_FILES = 5
+
+# Extração num processo novo, com a mesma resposta do servidor
+COLD_RUN = """
+import sys
+from pathlib import Path
+sys.path.append({src!r})
+from core.universal_extractor import process_pdf
+from core.extraction_server import result_json
+pdf_file = Path({pdf!r})
+df, entry = process_pdf(pdf_file)
+Path({out!r}).write_bytes(result_json(pdf_file.name, df, entry))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def cold_extract(pdf_file: Path, folder: str) -> tuple[float, dict]:
+    out = Path(folder) / 'resposta.json'
+    code = COLD_RUN.format(src=str(ROOT / 'src'), pdf=str(pdf_file), out=str(out))
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], capture_output=True, check=True)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, json.loads(out.read_bytes())
+
+
+def server_extract(port: int, pdf_file: Path) -> tuple[float, dict]:
+    query = urllib.parse.urlencode({'nome': pdf_file.name})
+    request = urllib.request.Request(f'http://127.0.0.1:{port}/extrair?{query}', data=pdf_file.read_bytes(),
+                                     headers={'Content-Type': 'application/pdf'})
+
+    start = time.perf_counter()
+    body = urllib.request.urlopen(request).read()
+    elapsed = time.perf_counter() - start
+
+    return elapsed, json.loads(body)
+
+
+def wait_ready(port: int, timeout: float = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/saude')
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("servidor não respondeu")
+
+
+def main():
+    input_folder = Path(sys.argv[1] if len(sys.argv) > 1 else "data/input").resolve()
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_FILES
+    pdf_files = sorted(input_folder.glob("*.pdf"), key=lambda f: f.stat().st_size)[:count]
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, str(ENTRY_POINT), '--serve', '--no-cache', '--port', str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=ROOT)
+
+    print(f"{'arquivo':<42} {'transações':>10} {'antes s':>8} {'depois s':>9}")
+    print("-" * 72)
+
+    total_before = total_after = 0
+    try:
+        wait_ready(port)
+
+        with tempfile.TemporaryDirectory() as folder:
+            for pdf_file in pdf_files:
+                before, expected = cold_extract(pdf_file, folder)
+                after, result = server_extract(port, pdf_file)
+
+                assert result['transacoes'] == expected['transacoes'], f"{pdf_file.name}: transações diferentes"
+                assert result['resultado']['banco'] == expected['resultado']['banco'], f"{pdf_file.name}: banco diferente"
+
+                total_before += before
+                total_after += after
+                print(f"{pdf_file.name[:42]:<42} {len(result['transacoes']):>10} {before:>8.2f} {after:>9.2f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\n⚡ {total_before / total_after:.1f}x menos tempo por extrato com o servidor aquecido (mesmas transações)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Tempo de inicialização do extrator universal
+
+Roda o extract_universal.py com python -X importtime numa pasta sem PDFs e
+numa execução incremental sem arquivos alterados (os casos comuns das
+rotinas agendadas) e mostra, para cada um:
+
+- tempo total do processo e tempo somado de importação
+- bibliotecas pesadas que foram importadas (devem ser nenhuma)
+
+Como referência, mede também a importação de pandas, pdfplumber, openpyxl
+e pyarrow, que antes eram carregadas na inicialização em qualquer caso.
+
+Uso:
+    python benchmarks/bench_startup.py [pasta_pdfs]
+"""
+
+import subprocess
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ENTRY_POINT = ROOT / 'extract_universal.py'
+
+HEAVY_MODULES = ['pandas', 'numpy', 'pdfplumber', 'pdfminer', 'openpyxl', 'pyarrow', 'pymupdf', 'fitz']
+
+
+def run_importtime(args: list) -> tuple[float, float, list]:
+    """(segundos do processo, segundos de importação, pesados importados)"""
+
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args,
+                            capture_output=True, text=True, check=True, cwd=ROOT)
+    elapsed = time.perf_counter() - start
+
+    imported = set()
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        imported.add(name.strip())
+        # Só as importações de primeiro nível (as aninhadas já estão somadas nelas)
+        if not name.startswith('  '):
+            total += int(cumulative)
+    total /= 1e6
+    heavy = [name for name in HEAVY_MODULES if name in imported]
+    return elapsed, total, heavy
+
+
+def main():
+    input_folder = Path(sys.argv[1] if len(sys.argv) > 1 else "data/input").resolve()
+    pdf_files = sorted(input_folder.glob("*.pdf"), key=lambda f: f.stat().st_size)
+
+    print(f"{'caso':<34} {'processo s':>11} {'imports s':>10}  pesados importados")
+    print("-" * 80)
+
+    with tempfile.TemporaryDirectory() as folder:
+        empty = Path(folder) / 'vazia'
+        empty.mkdir()
+        output = Path(folder) / 'saida'
+
+        cases = [('sem PDFs', [str(ENTRY_POINT), '--input', str(empty), '--output', str(output)])]
+
+        if pdf_files:
+            # Menor PDF da pasta; a primeira execução registra no manifesto
+            single = Path(folder) / 'um_pdf'
+            single.mkdir()
+            (single / pdf_files[0].name).write_bytes(pdf_files[0].read_bytes())
+            incremental = [str(ENTRY_POINT), '--input', str(single), '--output', str(output),
+                           '--incremental', '--no-cache']
+            subprocess.run([sys.executable] + incremental, capture_output=True, check=True, cwd=ROOT)
+            cases.append(('incremental sem alterações', incremental))
+
+        for label, args in cases:
+            elapsed, total, heavy = run_importtime(args)
+            print(f"{label:<34} {elapsed:>11.2f} {total:>10.2f}  {', '.join(heavy) or '-'}")
+            assert not heavy, f"{label}: bibliotecas pesadas importadas na inicialização"
+
+        for module in ['pandas', 'pdfplumber', 'openpyxl', 'pyarrow']:
+            elapsed, total, _ = run_importtime(['-c', f'import {module}'])
+            print(f"{'referência: import ' + module:<34} {elapsed:>11.2f} {total:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Micro-benchmark das tabelas com colunas aprendidas
+
+Para cada PDF, compara o tempo de obter as tabelas de todas as páginas:
+
+- antes: page.extract_tables() em todas as páginas
+- depois: LayoutTableReader (detecta a tabela uma vez e reaplica as colunas)
+
+e confere que as tabelas são iguais página a página. O texto das páginas
+é extraído antes (como nos parsers) e fica fora da medição.
+
+Uso:
+    python benchmarks/bench_table_layout.py [pasta_pdfs] [palavras_do_cabecalho]
+"""
+
+import sys
+import os
+import time
+from pathlib import Path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import pdfplumber
+
+from utils.table_layout import LayoutTableReader
+
+# Cabeçalhos de transações de BB, Bradesco e Caixa
+DEFAULT_KEYWORDS = "DATA,HISTÓRICO,VALOR,SALDO,DT. MOVIMENTO"
+
+
+def main():
+    input_folder = Path(sys.argv[1] if len(sys.argv) > 1 else "data/input")
+    keywords = (sys.argv[2] if len(sys.argv) > 2 else DEFAULT_KEYWORDS).upper().split(',')
+
+    pdf_files = sorted(input_folder.glob("*.pdf"))
+    if not pdf_files:
+        print(f"Nenhum PDF encontrado em: {input_folder}")
+        return
+
+    def is_header_row(row):
+        return any(keyword in str(cell).upper() for cell in row if cell for keyword in keywords)
+
+    print(f"{'arquivo':<46} {'páginas':>8} {'aprendidas':>11} {'antes s':>8} {'depois s':>9}")
+    print("-" * 86)
+
+    total_before = total_after = 0.0
+    for pdf_file in pdf_files:
+        reader = LayoutTableReader(is_header_row)
+        before = after = 0.0
+
+        with pdfplumber.open(pdf_file) as pdf:
+            for page in pdf.pages:
+                page.extract_text()
+
+                start = time.perf_counter()
+                expected = page.extract_tables()
+                before += time.perf_counter() - start
+
+                start = time.perf_counter()
+                tables = reader.extract_tables(page)
+                after += time.perf_counter() - start
+
+                assert tables == expected, f"{pdf_file.name} página {page.page_number}: tabelas diferentes"
+
+            pages = len(pdf.pages)
+
+        total_before += before
+        total_after += after
+        print(f"{pdf_file.name[:46]:<46} {pages:>8} {reader.layout_pages:>11} {before:>8.2f} {after:>9.2f}")
+
+    print("-" * 86)
+    print(f"{'total':<46} {'':>8} {'':>11} {total_before:>8.2f} {total_after:>9.2f}")
+    print(f"\n⚡ {total_before / total_after:.1f}x mais rápido (mesmas tabelas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -200,6 +200,8 @@ def extract_transactions_all_pages(pdf, bank_name):
     
     for page_num, page in enumerate(pdf.pages):
         text = page.extract_text()
+        # Só o texto é usado: libera os objetos da página
+        page.close()
         if not text:
             continue
         
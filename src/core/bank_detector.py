@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 """Detector automático de bancos - versão corrigida"""
 
-import pdfplumber
 import re
+import os
+import unicodedata
 from enum import Enum
+from typing import Dict, List
+
+from utils.pdf_document import PDFDocument, open_document
+from utils.stage_timer import timed
 
 class BankType(Enum):
     BANCO_DO_BRASIL = "bb"
@@ -40,6 +45,141 @@ class BankType(Enum):
     RENDIMENTO = "rendimento"
     UNKNOWN = "unknown"
 
+# Caracteres que fazem um padrão deixar de ser texto literal
+_REGEX_META = set('.^$*+?{}[]\\|()')
+
+# Tamanho mínimo de um trecho literal para servir de filtro
+MIN_REQUIRED_LITERAL = 3
+
+# Letras que o re.IGNORECASE iguala a I/K mas que str.upper() não converte
+_UPPER_FIXES = str.maketrans({'\u0130': 'I', '\u212a': 'K'})
+
+
+def _is_literal(pattern: str) -> bool:
+    return not any(c in _REGEX_META for c in pattern)
+
+
+def _leading_literal(part: str) -> str:
+    """Trecho literal no início de uma parte do padrão"""
+    
+    end = 0
+    while end < len(part) and part[end] not in _REGEX_META:
+        end += 1
+    
+    # Um quantificador logo depois torna o último caractere opcional
+    if end < len(part) and part[end] in '?*{+':
+        end -= 1
+    
+    return part[:max(end, 0)]
+
+
+def _required_literal(pattern: str):
+    """Trecho literal que precisa aparecer no texto para o padrão casar
+
+    Considera o início literal de cada parte separada por '.*' e escolhe o
+    mais longo; devolve None quando não há trecho garantido.
+    """
+    
+    if _is_literal(pattern):
+        return pattern
+    
+    # Com alternância (ou '|' escapado, por simplicidade) não há trecho garantido
+    if '|' in pattern:
+        return None
+    
+    literals = [_leading_literal(part) for part in pattern.split('.*')]
+    required = max(literals, key=len)
+    
+    # Trechos muito curtos aparecem em quase todo texto e só pesam na leitura
+    return required if len(required) >= MIN_REQUIRED_LITERAL else None
+
+
+def _trie_regex(words: List[str]) -> str:
+    """Alternativa única em forma de árvore de prefixos (mais longo primeiro)"""
+    
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+    
+    def build(node):
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ''
+        body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+    
+    return build(trie)
+
+
+class BankPatternMatcher:
+    """Avalia os padrões de todos os bancos com uma única leitura do texto
+
+    Os trechos literais obrigatórios de cada padrão (nomes de banco, códigos)
+    formam uma só regex em árvore de prefixos, aplicada uma vez sobre o texto
+    em maiúsculas e com lookahead, para achar também ocorrências sobrepostas.
+    Depois, só os padrões cujo trecho obrigatório apareceu (ou que não têm
+    nenhum) são confirmados com a regex original pré-compilada, então a
+    pontuação é a mesma de aplicar re.search em cada padrão.
+    """
+    
+    def __init__(self, bank_patterns: Dict['BankType', List[str]]):
+        self.banks = list(bank_patterns)
+        self.patterns = []
+        literals = set()
+        
+        for bank_type, patterns in bank_patterns.items():
+            for pattern in patterns:
+                try:
+                    compiled = re.compile(pattern, re.IGNORECASE)
+                except re.error:
+                    continue
+                
+                required = _required_literal(pattern)
+                if required is not None:
+                    required = required.upper()
+                    literals.add(required)
+                
+                self.patterns.append((bank_type, compiled, required))
+        
+        self.literals = literals
+        self.literal_lengths = sorted({len(lit) for lit in literals})
+        self.scanner = re.compile('(?=(' + _trie_regex(sorted(literals)) + '))') if literals else None
+    
+    def find_literals(self, text: str) -> set:
+        """Trechos literais presentes no texto (sem diferenciar maiúsculas)"""
+        
+        found = set()
+        if self.scanner is None:
+            return found
+        
+        upper_text = text.translate(_UPPER_FIXES).upper()
+        for matched in set(self.scanner.findall(upper_text)):
+            # O mais longo em cada posição; os prefixos dele também ocorrem ali
+            for length in self.literal_lengths:
+                if length > len(matched):
+                    break
+                if matched[:length] in self.literals:
+                    found.add(matched[:length])
+        
+        return found
+    
+    def score(self, text: str) -> Dict['BankType', int]:
+        """Quantidade de padrões encontrados por banco, na ordem dos bancos"""
+        
+        found = self.find_literals(text)
+        scores = {bank_type: 0 for bank_type in self.banks}
+        
+        for bank_type, compiled, required in self.patterns:
+            if required is not None and required not in found:
+                continue
+            if compiled.search(text):
+                scores[bank_type] += 1
+        
+        return scores
+
 class BankDetector:
     
     BANK_PATTERNS = {
@@ -270,32 +410,277 @@ class BankDetector:
         ]
     }
     
+    # Identificadores do banco procurados (como palavras inteiras) no nome do
+    # arquivo e nos metadados do PDF, antes de ler qualquer página. Siglas
+    # curtas (até SHORT_HINT_LENGTH caracteres) só valem no nome do arquivo
+    # e nos campos descritivos dos metadados
+    BANK_HINTS = {
+        BankType.BANCO_DO_BRASIL: ['BB', 'BANCO DO BRASIL'],
+        BankType.BRADESCO: ['BRADESCO'],
+        BankType.BRADESCO_INVESTIMENTOS: ['BRADESCO INVESTIMENTOS'],
+        BankType.ITAU: ['ITAU', 'ITAU UNIBANCO'],
+        BankType.CAIXA: ['CEF', 'CAIXA', 'CAIXA ECONOMICA'],
+        BankType.SANTANDER: ['SANTANDER'],
+        BankType.SAFRA: ['SAFRA'],
+        BankType.DAYCOVAL: ['DAYCOVAL'],
+        BankType.CITI: ['CITI', 'CITIBANK'],
+        BankType.BV: ['BV', 'BANCO BV'],
+        BankType.VOTORANTIM: ['VOTORANTIM', 'BANCO VOTORANTIM'],
+        BankType.ABC: ['ABC', 'ABC BRASIL'],
+        BankType.NUBANK: ['NUBANK'],
+        BankType.INTER: ['BANCO INTER'],
+        BankType.SICOOB: ['SICOOB'],
+        BankType.SICREDI: ['SICREDI'],
+        BankType.BANRISUL: ['BANRISUL'],
+        BankType.BRB: ['BRB'],
+        BankType.C6: ['C6', 'C6 BANK'],
+        BankType.HSBC: ['HSBC'],
+        BankType.BTG: ['BTG', 'BTG PACTUAL'],
+        BankType.BMG: ['BMG'],
+        BankType.SOFISA: ['SOFISA'],
+        BankType.OPPORTUNITY: ['OPPORTUNITY']
+    }
+    
+    # Campos do dicionário de informações do PDF usados na detecção
+    METADATA_FIELDS = ['Title', 'Author', 'Subject', 'Keywords', 'Creator', 'Producer']
+    
+    # Campos que descrevem o documento; nos demais (autor, programa que gerou
+    # o PDF) siglas como 'BB', 'C6' ou 'ABC' aparecem por acaso
+    DESCRIPTIVE_METADATA_FIELDS = ['Title', 'Subject']
+    
+    # Tamanho máximo de uma sigla curta em BANK_HINTS
+    SHORT_HINT_LENGTH = 4
+    
+    # Como o banco foi identificado (registrado no resumo do processamento)
+    TIER_FILENAME = 'nome_arquivo'
+    TIER_METADATA = 'metadados'
+    TIER_CONTENT = 'conteudo'
+    
+    # Páginas lidas no máximo para detectar o banco
+    MAX_SAMPLE_PAGES = 3
+    
+    # Fração do topo da página 1 avaliada antes da página inteira
+    TOP_REGION_FRACTION = 0.25
+    
+    # Para a leitura quando o líder tem essa pontuação e essa vantagem
+    CONFIDENT_SCORE = 2
+    CONFIDENT_MARGIN = 2
+    
+    # Montado na primeira detecção a partir de BANK_PATTERNS
+    _matcher = None
+    
+    @classmethod
+    def get_matcher(cls) -> 'BankPatternMatcher':
+        """Padrões pré-compilados (compartilhados entre as detecções)"""
+        
+        if cls._matcher is None:
+            cls._matcher = BankPatternMatcher(cls.BANK_PATTERNS)
+        return cls._matcher
+    
     @classmethod
-    def detect_bank(cls, pdf_path: str) -> BankType:
-        """Detecta o banco baseado no conteúdo do PDF"""
+    def iter_text_samples(cls, pdf: PDFDocument):
+        """Amostras de texto crescentes para a detecção progressiva
+        
+        Primeiro o topo da página 1 (recorte), depois as páginas inteiras,
+        acumulando até MAX_SAMPLE_PAGES. A última amostra é o mesmo texto
+        usado pela detecção completa.
+        """
+        
+        pages = pdf.pages[:cls.MAX_SAMPLE_PAGES]
+        if not pages:
+            return
+        
+        top_text = cls.top_region_text(pages[0])
+        if top_text:
+            yield top_text + "\\n"
+        
+        text_sample = ""
+        for page in pages:
+            page_text = page.extract_text()
+            if page_text:
+                text_sample += page_text + "\\n"
+                yield text_sample
+    
+    @classmethod
+    def top_region_text(cls, page) -> str:
+        """Texto do topo da página (TOP_REGION_FRACTION da altura)"""
+        
+        x0, top, x1, bottom = page.bbox
+        return page.crop((x0, top, x1, top + (bottom - top) * cls.TOP_REGION_FRACTION)).extract_text() or ""
+    
+    @classmethod
+    def read_text_sample(cls, pdf_path: str, document: PDFDocument = None) -> str:
+        """Texto das 3 primeiras páginas usado na detecção"""
+        
+        with open_document(pdf_path, document) as pdf:
+            text_sample = ""
+            for page in pdf.pages[:cls.MAX_SAMPLE_PAGES]:
+                page_text = page.extract_text()
+                if page_text:
+                    text_sample += page_text + "\\n"
+        
+        return text_sample
+    
+    @classmethod
+    def score_text(cls, text: str) -> Dict[BankType, int]:
+        """Quantidade de padrões encontrados no texto para cada banco"""
+        
+        return cls.get_matcher().score(text)
+    
+    @classmethod
+    def best_match(cls, scores: Dict[BankType, int]) -> BankType:
+        """Primeiro banco (na ordem de BANK_PATTERNS) com algum padrão encontrado"""
+        
+        for bank_type, score in scores.items():
+            if score >= 1:
+                return bank_type
+        
+        return BankType.UNKNOWN
+    
+    @classmethod
+    def score_banks(cls, pdf_path: str, document: PDFDocument = None) -> Dict[BankType, int]:
+        """Pontuação de todos os bancos para um PDF"""
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                text_sample = ""
-                for page in pdf.pages[:3]:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_sample += page_text + "\\n"
-                
-                for bank_type, patterns in cls.BANK_PATTERNS.items():
-                    score = 0
-                    
-                    for pattern in patterns:
-                        try:
-                            if re.search(pattern, text_sample, re.IGNORECASE):
-                                score += 1
-                        except:
-                            continue
-                    
-                    if score >= 1:
+            return cls.score_text(cls.read_text_sample(pdf_path, document))
+        except Exception as e:
+            print(f"Erro ao detectar banco em {pdf_path}: {e}")
+            return {}
+    
+    @classmethod
+    def confident_match(cls, scores: Dict[BankType, int]):
+        """Banco que domina claramente a pontuação, ou None se ainda há dúvida"""
+        
+        ranking = sorted(scores.values(), reverse=True)
+        if not ranking:
+            return None
+        
+        leader_score = ranking[0]
+        runner_up = ranking[1] if len(ranking) > 1 else 0
+        
+        if leader_score >= cls.CONFIDENT_SCORE and leader_score - runner_up >= cls.CONFIDENT_MARGIN:
+            # Empate não acontece aqui (margem > 0), então o líder é único
+            return next(bank_type for bank_type, score in scores.items() if score == leader_score)
+        
+        return None
+    
+    @staticmethod
+    def _normalize_hint_text(text: str) -> str:
+        """Maiúsculas, sem acentos e só com letras/dígitos separados por espaço"""
+        
+        text = unicodedata.normalize('NFKD', str(text))
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+        return ' ' + ' '.join(re.findall(r'[A-Z0-9]+', text.upper())) + ' '
+    
+    @classmethod
+    def hint_matches(cls, text: str, short_hints: bool = True) -> list:
+        """Bancos cujos identificadores aparecem no texto como palavras inteiras"""
+        
+        normalized = cls._normalize_hint_text(text)
+        
+        return [
+            bank_type for bank_type, hints in cls.BANK_HINTS.items()
+            if any(f' {hint} ' in normalized for hint in hints
+                   if short_hints or len(hint) > cls.SHORT_HINT_LENGTH)
+        ]
+    
+    @classmethod
+    def match_hints(cls, text: str):
+        """Banco indicado no texto, ou None se nenhum ou mais de um aparecer"""
+        
+        matches = cls.hint_matches(text)
+        return matches[0] if len(matches) == 1 else None
+    
+    @classmethod
+    def detect_from_filename(cls, pdf_path: str):
+        """Banco pelo nome do arquivo (ex.: 'BB 110000 - 01 A 10.pdf')"""
+        
+        return cls.match_hints(os.path.splitext(os.path.basename(str(pdf_path)))[0])
+    
+    @classmethod
+    def detect_from_metadata(cls, pdf_path: str, document: PDFDocument = None):
+        """Banco pelos metadados do PDF (título, autor, produtor...)"""
+        
+        with open_document(pdf_path, document) as pdf:
+            metadata = pdf.metadata or {}
+        
+        descriptive = [str(metadata[field]) for field in cls.DESCRIPTIVE_METADATA_FIELDS if metadata.get(field)]
+        others = [str(metadata[field]) for field in cls.METADATA_FIELDS
+                  if field not in cls.DESCRIPTIVE_METADATA_FIELDS and metadata.get(field)]
+        if not descriptive and not others:
+            return None
+        
+        # Siglas curtas só no título/assunto; nomes completos em qualquer campo
+        matches = set(cls.hint_matches(' | '.join(descriptive)))
+        matches.update(cls.hint_matches(' | '.join(others), short_hints=False))
+        
+        return matches.pop() if len(matches) == 1 else None
+    
+    @classmethod
+    def confirmed_by_content(cls, bank_type: BankType, pdf_path: str, document: PDFDocument = None) -> bool:
+        """O topo da página 1 tem algum padrão do banco indicado pelo nome/metadados?"""
+        
+        try:
+            with open_document(pdf_path, document) as pdf:
+                pages = pdf.pages
+                top_text = cls.top_region_text(pages[0]) if pages else ""
+        except Exception:
+            return False
+        
+        return cls.score_text(top_text).get(bank_type, 0) >= 1
+    
+    @classmethod
+    def detect_bank_with_tier(cls, pdf_path: str, document: PDFDocument = None) -> tuple[BankType, str]:
+        """Detecta o banco pelo caminho mais barato que for conclusivo
+        
+        O banco do nome do arquivo ou dos metadados só vale se o topo da
+        página 1 o confirmar: um nome como 'BB 110000.pdf' não garante o
+        layout que o extractor do banco espera. Sem confirmação, vale o
+        conteúdo.
+        
+        Returns:
+            tuple: (BankType, nível usado: nome_arquivo, metadados ou conteudo)
+        """
+        
+        with timed('deteccao'):
+            bank_type = cls.detect_from_filename(pdf_path)
+            if bank_type is not None and cls.confirmed_by_content(bank_type, pdf_path, document):
+                return bank_type, cls.TIER_FILENAME
+            
+            try:
+                bank_type = cls.detect_from_metadata(pdf_path, document)
+            except Exception:
+                bank_type = None
+            if bank_type is not None and cls.confirmed_by_content(bank_type, pdf_path, document):
+                return bank_type, cls.TIER_METADATA
+            
+            return cls.detect_from_content(pdf_path, document), cls.TIER_CONTENT
+    
+    @classmethod
+    def detect_bank(cls, pdf_path: str, document: PDFDocument = None) -> BankType:
+        """Detecta o banco (nome do arquivo, metadados e, por fim, conteúdo)"""
+        
+        return cls.detect_bank_with_tier(pdf_path, document)[0]
+    
+    @classmethod
+    def detect_from_content(cls, pdf_path: str, document: PDFDocument = None) -> BankType:
+        """Detecta o banco baseado no conteúdo do PDF
+        
+        Pontua a cada trecho lido (topo da página 1, página 1, 2, 3) e para
+        assim que um banco domina; só lê mais páginas quando há dúvida. Sem
+        um banco dominante, usa a regra de sempre sobre as 3 páginas.
+        """
+        
+        try:
+            with timed('deteccao'), open_document(pdf_path, document) as pdf:
+                scores = {}
+                for text_sample in cls.iter_text_samples(pdf):
+                    scores = cls.score_text(text_sample)
+                    bank_type = cls.confident_match(scores)
+                    if bank_type is not None:
                         return bank_type
                 
-                return BankType.UNKNOWN
+                return cls.best_match(scores)
                 
         except Exception as e:
             print(f"Erro ao detectar banco em {pdf_path}: {e}")
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""Servidor local de extração com processos pré-aquecidos
+
+Para sistemas que enviam um extrato por vez e esperam a resposta: cada
+chamada do extract_universal.py paga a inicialização do Python, a
+importação de pandas/pdfplumber e a compilação dos padrões de detecção. O
+servidor paga isso uma vez: os processos do pool já nascem com tudo
+carregado e só extraem.
+
+    python extract_universal.py --serve --workers 4
+
+    # PDF já no disco da máquina do servidor
+    curl -X POST localhost:8765/extrair -H 'Content-Type: application/json' \\
+         -d '{"caminho": "/dados/extrato.pdf"}'
+
+    # Conteúdo do PDF no corpo (nome usado na detecção pelo nome do arquivo)
+    curl -X POST 'localhost:8765/extrair?nome=BB%20110000.pdf' \\
+         -H 'Content-Type: application/pdf' --data-binary @extrato.pdf
+
+    # Mesma resposta em Arrow (stream IPC): ?formato=arrow ou
+    # Accept: application/vnd.apache.arrow.stream
+
+A resposta JSON traz o resultado do arquivo (mesma entrada do resumo de
+processamento) e as transações normalizadas; no Arrow o resultado vai nos
+metadados do schema (chave 'resultado'). Até workers + max_pending pedidos
+ficam em andamento ou na fila; acima disso o servidor responde 503.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import signal
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict
+from urllib.parse import parse_qs, urlparse
+
+from core.bank_detector import BankDetector
+from core.extractor_factory import ExtractorFactory
+from core.universal_extractor import _cache_info, _cache_key, _from_cache, _worker_failure, process_pdf
+from utils.lazy_imports import lazy_import
+from utils.pdf_backends import BACKENDS, backend_available
+from utils.pdf_document import PageLimits
+from utils.result_cache import ResultCache
+
+pd = lazy_import('pandas')
+pa = lazy_import('pyarrow')
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Pedidos aguardando processo livre, além dos que estão em extração
+DEFAULT_MAX_PENDING = 16
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Bibliotecas de leitura importadas no aquecimento de cada processo
+BACKEND_MODULES = {'pdfplumber': 'pdfplumber', 'pymupdf': 'pymupdf'}
+
+
+class ServerBusy(Exception):
+    """Fila de pedidos cheia"""
+
+
+def warm_worker():
+    """Carrega num processo tudo o que a primeira extração carregaria"""
+
+    ExtractorFactory.prewarm()
+    BankDetector.get_matcher()
+    pd.DataFrame()
+    for name in BACKENDS:
+        if backend_available(name):
+            importlib.import_module(BACKEND_MODULES[name])
+
+
+def _json_default(value):
+    # Tipos do numpy (int64, float64...) e datas do cabeçalho
+    item = getattr(value, 'item', None)
+    return item() if callable(item) else str(value)
+
+
+def result_json(pdf_name: str, df: pd.DataFrame, entry: Dict[str, Any]) -> bytes:
+    """Resposta JSON: arquivo, resultado e transações (uma por objeto)"""
+
+    transactions = df.to_json(orient='records', date_format='iso', force_ascii=False) if not df.empty else '[]'
+    header = json.dumps({'arquivo': pdf_name, 'resultado': entry}, ensure_ascii=False, default=_json_default)
+    # As transações entram já serializadas pelo pandas
+    return f'{header[:-1]}, "transacoes": {transactions}}}'.encode('utf-8')
+
+
+def result_arrow(pdf_name: str, df: pd.DataFrame, entry: Dict[str, Any]) -> bytes:
+    """Resposta Arrow (stream IPC): transações, com o resultado nos metadados"""
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'arquivo'] = pdf_name.encode('utf-8')
+    metadata[b'resultado'] = json.dumps(entry, ensure_ascii=False, default=_json_default).encode('utf-8')
+    table = table.replace_schema_metadata(metadata)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class ExtractionServer:
+    """Pool de processos aquecidos que extrai um PDF por pedido"""
+
+    def __init__(self, workers: int = 1, max_pending: int = DEFAULT_MAX_PENDING, backend: str = None,
+                 limits: PageLimits = None, cache: ResultCache = None):
+        self.workers = max(1, workers)
+        self.backend = backend
+        self.limits = limits
+        self.cache = cache
+        # Vagas: em extração + na fila do pool
+        self._slots = threading.BoundedSemaphore(self.workers + max(0, max_pending))
+        self._pool_lock = threading.Lock()
+        self._pool = None
+
+    def start(self):
+        """Cria o pool e espera todos os processos terminarem o aquecimento"""
+
+        with self._pool_lock:
+            self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # Carregado antes do fork: os processos já nascem aquecidos
+        warm_worker()
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+        # Uma tarefa vazia por processo força a criação de todos agora
+        wait([pool.submit(int) for _ in range(self.workers)])
+        return pool
+
+    def extract(self, pdf_file: Path) -> tuple[pd.DataFrame, Dict[str, Any]]:
+        """Extrai um PDF num processo do pool (ou do cache)
+
+        Raises:
+            ServerBusy: todas as vagas de extração e da fila estão ocupadas
+        """
+
+        if not self._slots.acquire(blocking=False):
+            raise ServerBusy(f"{self.workers} extração(ões) em andamento e fila cheia")
+
+        try:
+            cache_key = None
+            if self.cache is not None:
+                cache_key = _cache_key(self.cache, pdf_file, self.backend)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return _from_cache(pdf_file, *cached)
+
+            df, entry = self._run(pdf_file)
+
+            # Erros podem ser transitórios; não ficam no cache
+            if cache_key is not None and entry.get('status') in ('sucesso', 'sem_dados'):
+                self.cache.put(cache_key, df, _cache_info(entry))
+
+            return df, entry
+        finally:
+            self._slots.release()
+
+    def _run(self, pdf_file: Path) -> tuple[pd.DataFrame, Dict[str, Any]]:
+        # Um processo que morre derruba o pool e todos os pedidos em
+        # andamento; cada um tenta de novo uma vez num pool novo
+        for attempt in range(2):
+            pool = self._pool
+            try:
+                return pool.submit(process_pdf, pdf_file, 1, self.backend, self.limits).result()
+            except BrokenProcessPool as e:
+                error = e
+                with self._pool_lock:
+                    if self._pool is pool:
+                        print("♻️  Processo de extração encerrado inesperadamente; recriando o pool")
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        self._pool = self._new_pool()
+            except Exception as e:
+                error = e
+                break
+
+        return _worker_failure(pdf_file, error)
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+
+class ExtractionRequestHandler(BaseHTTPRequestHandler):
+    """Rotas: POST /extrair e GET /saude"""
+
+    # Atribuído por serve()
+    extraction_server: ExtractionServer = None
+
+    def do_GET(self):
+        if urlparse(self.path).path != '/saude':
+            return self._send_error(404, "rota não encontrada")
+
+        server = self.extraction_server
+        self._send(200, json.dumps({'status': 'ok', 'workers': server.workers}).encode('utf-8'))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/extrair':
+            return self._send_error(404, "rota não encontrada")
+
+        query = parse_qs(url.query)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip()
+
+        with tempfile.TemporaryDirectory(prefix='extrator_') as folder:
+            if content_type == 'application/json':
+                try:
+                    pdf_file = Path(json.loads(body)['caminho'])
+                except (ValueError, KeyError, TypeError):
+                    return self._send_error(400, "esperado JSON com a chave 'caminho'")
+                if not pdf_file.is_file():
+                    return self._send_error(404, f"arquivo não encontrado: {pdf_file}")
+            else:
+                if not body:
+                    return self._send_error(400, "corpo vazio: envie o PDF ou JSON com 'caminho'")
+                # Nome real do arquivo: a detecção começa pelo nome
+                name = Path(query.get('nome', ['documento.pdf'])[0]).name or 'documento.pdf'
+                pdf_file = Path(folder) / name
+                pdf_file.write_bytes(body)
+
+            try:
+                df, entry = self.extraction_server.extract(pdf_file)
+            except ServerBusy as e:
+                return self._send_error(503, str(e), {'Retry-After': '1'})
+
+        arrow = query.get('formato', [''])[0] == 'arrow' or ARROW_MEDIA_TYPE in (self.headers.get('Accept') or '')
+        try:
+            if arrow:
+                self._send(200, result_arrow(pdf_file.name, df, entry), ARROW_MEDIA_TYPE)
+            else:
+                self._send(200, result_json(pdf_file.name, df, entry))
+        except Exception as e:
+            # Ex.: coluna com tipos misturados que o Arrow não aceita
+            self._send_error(500, f"falha ao montar a resposta: {e}")
+
+    def _send(self, status: int, body: bytes, content_type: str = 'application/json; charset=utf-8',
+              headers: Dict[str, str] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, headers: Dict[str, str] = None):
+        self._send(status, json.dumps({'erro': message}, ensure_ascii=False).encode('utf-8'), headers=headers)
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+
+def serve(extraction_server: ExtractionServer, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Aquece o pool e atende pedidos até Ctrl+C ou SIGTERM"""
+
+    print(f"🔥 Aquecendo {extraction_server.workers} processo(s) de extração...")
+    extraction_server.start()
+
+    handler = type('Handler', (ExtractionRequestHandler,), {'extraction_server': extraction_server})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+
+    # SIGTERM (systemd, docker stop) encerra como Ctrl+C: sem isso os
+    # processos do pool ficariam órfãos
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    print(f"🛰️  Servidor de extração em http://{host}:{httpd.server_port} (POST /extrair, GET /saude)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Encerrando servidor")
+    finally:
+        httpd.server_close()
+        extraction_server.close()
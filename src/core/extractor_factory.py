@@ -1,45 +1,158 @@
 #!/usr/bin/env python3
-"""Factory para criar extractors específicos"""
+"""Factory para criar extractors específicos
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+Cada banco tem uma entrada no registro (EXTRACTORS) com a classe do
+extractor e o que ela suporta. A classe é importada na primeira vez que o
+banco aparece (ou em prewarm) e fica guardada na entrada; a criação é uma
+consulta ao dicionário. Bancos sem entrada usam o extractor genérico.
+
+    spec = ExtractorFactory.spec_for(BankType.CAIXA)
+    spec.page_sharding   # True: vale a pena dividir as páginas entre processos
+"""
+
+import importlib
 
 from core.bank_detector import BankType, BankDetector
 from parsers.base_extractor import BaseExtractor
+from utils.layout_profiles import get_layout_profile
+from utils.pdf_document import PDFDocument
+from utils.pdf_backends import DEFAULT_BACKEND, backend_available
+
+class ExtractorSpec:
+    """Classe do extractor de um banco e o que ela suporta
+
+    target: 'módulo:Classe', importado só quando a classe for usada
+    backend: biblioteca de leitura preferida (parsers que só dependem do
+        texto, ou que dão o mesmo resultado, usam o PyMuPDF)
+    needs_tables: usa extract_tables (precisa das linhas do desenho)
+    line_based: lê o texto linha a linha
+    streaming: gera um lote por página em iter_transaction_batches
+    page_sharding: divide as páginas de PDFs grandes entre processos
+    bank_layout: extractor genérico que recebe o nome do banco e o perfil
+        de layout (EnhancedGenericExtractor)
+    """
+
+    def __init__(self, target: str, backend: str = DEFAULT_BACKEND, needs_tables: bool = False,
+                 line_based: bool = False, streaming: bool = False, page_sharding: bool = False,
+                 bank_layout: bool = False):
+        self.target = target
+        self.backend = backend
+        self.needs_tables = needs_tables
+        self.line_based = line_based
+        self.streaming = streaming
+        self.page_sharding = page_sharding
+        self.bank_layout = bank_layout
+        self._extractor_class = None
+
+    @property
+    def extractor_class(self) -> type:
+        """Classe do extractor (importada uma vez por processo)"""
+
+        if self._extractor_class is None:
+            module_name, class_name = self.target.split(':')
+            self._extractor_class = getattr(importlib.import_module(module_name), class_name)
+        return self._extractor_class
+
+    def create(self, bank_type: BankType, pdf_path: str, document: PDFDocument = None,
+               page_workers: int = 1) -> BaseExtractor:
+        # Sem divisão de páginas o extractor lê tudo no próprio processo
+        page_workers = page_workers if self.page_sharding else 1
+
+        if self.bank_layout:
+            bank_info = BankDetector.get_bank_info(bank_type)
+            # Perfil de layout só no backend em que o documento será lido
+            backend = document.backend if document is not None else DEFAULT_BACKEND
+            return self.extractor_class(pdf_path, bank_info['name'], document, page_workers,
+                                        get_layout_profile(bank_info['extractor'], backend))
+
+        return self.extractor_class(pdf_path, document, page_workers)
+
+_ENHANCED_GENERIC = 'parsers.enhanced_generic_extractor:EnhancedGenericExtractor'
+
+# Extractor de cada banco
+EXTRACTORS = {
+    BankType.BANCO_DO_BRASIL: ExtractorSpec('parsers.bb.bb_extractor_adapter:BBExtractorAdapter',
+                                            needs_tables=True, streaming=True),
+    BankType.BRADESCO: ExtractorSpec('parsers.bradesco.bradesco_cc_adapter:BradescoCCAdapter',
+                                     line_based=True, streaming=True),
+    BankType.BRADESCO_INVESTIMENTOS: ExtractorSpec('parsers.bradesco.bradesco_inv_adapter:BradescoInvAdapter',
+                                                   needs_tables=True, line_based=True),
+    BankType.ITAU: ExtractorSpec('parsers.itau.itau_adapter:ItauAdapter', backend='pymupdf',
+                                 line_based=True, streaming=True),
+    BankType.CAIXA: ExtractorSpec('parsers.caixa.caixa_adapter:CaixaAdapter',
+                                  line_based=True, streaming=True, page_sharding=True),
+    BankType.SAFRA: ExtractorSpec(_ENHANCED_GENERIC, backend='pymupdf', needs_tables=True,
+                                  line_based=True, bank_layout=True),
+    BankType.DAYCOVAL: ExtractorSpec(_ENHANCED_GENERIC, needs_tables=True, line_based=True, bank_layout=True),
+    BankType.BV: ExtractorSpec(_ENHANCED_GENERIC, needs_tables=True, line_based=True, bank_layout=True),
+    # Banco Votorantim (hoje Banco BV, mesmo código 655): mesmo extrato do BV
+    BankType.VOTORANTIM: ExtractorSpec(_ENHANCED_GENERIC, needs_tables=True, line_based=True, bank_layout=True),
+    BankType.CITI: ExtractorSpec(_ENHANCED_GENERIC, needs_tables=True, line_based=True, bank_layout=True)
+}
+
+# Demais bancos: tabelas, padrões ou linhas, o que der resultado
+GENERIC_EXTRACTOR = ExtractorSpec('parsers.generic_smart_extractor:GenericSmartExtractor',
+                                  needs_tables=True, line_based=True)
 
 class ExtractorFactory:
     """Factory para criar extractors baseado no tipo de banco"""
-    
+
     @staticmethod
-    def create_extractor(bank_type: BankType, pdf_path: str) -> BaseExtractor:
-        """Cria extractor específico para o banco"""
-        
-        if bank_type == BankType.BANCO_DO_BRASIL:
-            from parsers.bb.bb_extractor_adapter import BBExtractorAdapter
-            return BBExtractorAdapter(pdf_path)
-        
-        elif bank_type == BankType.BRADESCO:
-            from parsers.bradesco.bradesco_cc_adapter import BradescoCCAdapter
-            return BradescoCCAdapter(pdf_path)
-        
-        elif bank_type == BankType.BRADESCO_INVESTIMENTOS:
-            from parsers.bradesco.bradesco_inv_adapter import BradescoInvAdapter
-            return BradescoInvAdapter(pdf_path)
-        
-        elif bank_type == BankType.ITAU:
-            from parsers.itau.itau_adapter import ItauAdapter
-            return ItauAdapter(pdf_path)
-        
-        elif bank_type == BankType.CAIXA:
-            from parsers.caixa.caixa_adapter import CaixaAdapter
-            return CaixaAdapter(pdf_path)
-        
-        elif bank_type in [BankType.SAFRA, BankType.DAYCOVAL, BankType.BV, BankType.CITI]:
-            from parsers.enhanced_generic_extractor import EnhancedGenericExtractor
-            bank_info = BankDetector.get_bank_info(bank_type)
-            return EnhancedGenericExtractor(pdf_path, bank_info['name'])
-        
-        else:
-            from parsers.generic_smart_extractor import GenericSmartExtractor
-            return GenericSmartExtractor(pdf_path)
\ No newline at end of file
+    def spec_for(bank_type: BankType) -> ExtractorSpec:
+        """Entrada do registro do banco (o genérico se não houver)"""
+
+        return EXTRACTORS.get(bank_type, GENERIC_EXTRACTOR)
+
+    @staticmethod
+    def backend_for(bank_type: BankType, backend: str = None) -> str:
+        """Backend a usar: o escolhido globalmente ou o preferido do banco"""
+
+        if backend:
+            return backend
+
+        preferred = ExtractorFactory.spec_for(bank_type).backend
+        return preferred if backend_available(preferred) else DEFAULT_BACKEND
+
+    @staticmethod
+    def prewarm(bank_types=None):
+        """Importa de antemão as classes dos extractors (todas, se bank_types for None)
+
+        Chamado antes de criar os processos de extração: com fork, os
+        processos já nascem com os parsers carregados; nos demais modos de
+        início serve de initializer do pool.
+        """
+
+        specs = [ExtractorFactory.spec_for(t) for t in bank_types] if bank_types is not None \
+            else list(EXTRACTORS.values()) + [GENERIC_EXTRACTOR]
+        for spec in specs:
+            spec.extractor_class
+
+    @staticmethod
+    def create_extractor(bank_type: BankType, pdf_path: str, document: PDFDocument = None,
+                         page_workers: int = 1, backend: str = None) -> BaseExtractor:
+        """Cria extractor específico para o banco
+
+        Sem documento compartilhado e com backend diferente do padrão, o
+        documento é aberto para o extractor e fica com ele: use o extractor
+        num with (ou chame close) para fechá-lo.
+
+            with ExtractorFactory.create_extractor(bank_type, pdf_path) as extractor:
+                df, header_info = extractor.extract_statement()
+        """
+
+        backend = ExtractorFactory.backend_for(bank_type, backend)
+        owned = document is None and backend != DEFAULT_BACKEND
+        if document is not None:
+            document = document.using(backend)
+        elif owned:
+            document = PDFDocument(pdf_path, backend)
+
+        try:
+            extractor = ExtractorFactory.spec_for(bank_type).create(bank_type, pdf_path, document, page_workers)
+        except Exception:
+            if owned:
+                document.close()
+            raise
+
+        extractor.owns_document = owned
+        return extractor
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""Modo watch: processa os PDFs conforme chegam na pasta de entrada
+
+Em vez de rodar o lote inteiro de tempos em tempos, o extrator fica
+observando a pasta. No Linux os eventos vêm do inotify (sem varrer a
+pasta); nos demais sistemas, ou com --polling (ex.: pasta de rede), a pasta
+é comparada a cada intervalo.
+
+Um arquivo só é processado depois que para de crescer: tamanho e data de
+modificação iguais por `settle` segundos (cópias e downloads em andamento
+ficam esperando). Os arquivos prontos passam pelo caminho incremental de
+sempre (manifesto, detecção, factory, --workers processos) e o consolidado
+é remontado com as partições do manifesto.
+
+    python extract_universal.py --watch --workers 4
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import shutil
+import signal
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from core.universal_extractor import UniversalExtractor
+from utils.output_sinks import get_sink
+from utils.run_manifest import RunManifest
+
+# Segundos sem mudança de tamanho/data para o arquivo ser considerado completo
+DEFAULT_SETTLE = 2.0
+
+# Intervalo entre varreduras no modo polling
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# wd, mask, cookie, tamanho do nome
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def _is_pdf(name: str) -> bool:
+    # Mesmo critério do glob("*.pdf") do lote
+    return name.endswith('.pdf')
+
+
+class PollingWatcher:
+    """Detecta mudanças comparando tamanho e data de modificação a cada intervalo"""
+
+    name = 'polling'
+
+    def __init__(self, folder: Path, interval: float = DEFAULT_POLL_INTERVAL):
+        self.folder = folder
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        snapshot = {}
+        for entry in os.scandir(self.folder):
+            if _is_pdf(entry.name):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def changes(self, timeout: float) -> Set[str]:
+        """Nomes de PDFs criados, alterados ou removidos desde a última chamada"""
+
+        time.sleep(min(timeout, self.interval))
+
+        snapshot = self._scan()
+        changed = {name for name in snapshot.keys() | self._snapshot.keys()
+                   if snapshot.get(name) != self._snapshot.get(name)}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Eventos de arquivo do kernel (Linux), lidos via ctypes sem dependências"""
+
+    name = 'inotify'
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+
+        if libc.inotify_add_watch(self._fd, os.fsencode(folder), WATCH_MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, f"inotify_add_watch falhou em {folder}")
+
+    def changes(self, timeout: float) -> Set[str]:
+        """Nomes de PDFs com eventos até timeout segundos (vazio se nenhum)"""
+
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = os.read(self._fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Eventos perdidos: considera todos os PDFs da pasta
+                changed.update(name for name in os.listdir(self.folder) if _is_pdf(name))
+            elif _is_pdf(name):
+                changed.add(name)
+
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def open_watcher(folder: Path, polling: bool = False, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """inotify quando disponível; senão (ou com polling=True) varredura periódica"""
+
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(folder)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify indisponível ({e}); usando varredura a cada {poll_interval}s")
+
+    return PollingWatcher(folder, poll_interval)
+
+
+def _signature(path: Path) -> Optional[tuple]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class FolderWatcher:
+    """Espera os PDFs pararem de mudar e os processa em lotes incrementais"""
+
+    def __init__(self, extractor: UniversalExtractor, output_folder: str = "data/output",
+                 output_format: str = 'xlsx', settle: float = DEFAULT_SETTLE, polling: bool = False,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, trace_file: str = None):
+        self.extractor = extractor
+        self.folder = extractor.input_folder
+        self.output_folder = output_folder
+        self.output_format = output_format
+        self.consolidated_file = Path(output_folder) / f"extratos_consolidados{get_sink(output_format).suffix}"
+        self.settle = settle
+        self.polling = polling
+        self.poll_interval = poll_interval
+        # Trace das etapas (--trace), regravado a cada lote processado
+        self.trace_file = trace_file
+        # Nome -> (tamanho/data vistos por último, desde quando estão assim)
+        self.unsettled: Dict[str, tuple] = {}
+
+        if extractor.manifest is None:
+            extractor.manifest = RunManifest(output_folder, [extractor.backend])
+
+    def track(self, names: Set[str], now: float):
+        """Marca arquivos como alterados; a contagem do settle recomeça"""
+
+        for name in names:
+            self.unsettled[name] = (_signature(self.folder / name), now)
+
+    def settled(self, now: float) -> List[str]:
+        """Arquivos sem mudança há settle segundos (saem da espera)"""
+
+        ready = []
+        for name, (signature, since) in list(self.unsettled.items()):
+            current = _signature(self.folder / name)
+            if current != signature:
+                self.unsettled[name] = (current, now)
+            elif now - since >= self.settle:
+                ready.append(name)
+                del self.unsettled[name]
+        return ready
+
+    def process_ready(self):
+        """Processa os PDFs completos (os ainda em cópia ficam para depois) e remonta o consolidado"""
+
+        pdf_files = [p for p in self.folder.glob("*.pdf") if p.name not in self.unsettled]
+        manifest = self.extractor.manifest
+
+        if not pdf_files:
+            # process_all_pdfs não tem o que fazer: os PDFs removidos saem daqui
+            for name in manifest.prune(pdf_files):
+                print(f"🗑️  Removido da pasta: {name}")
+            manifest.save()
+            self.remove_consolidated()
+            return
+
+        if self.consolidated_file.exists() and manifest.up_to_date(pdf_files):
+            return
+
+        df, summary = self.extractor.process_all_pdfs(pdf_files)
+        if not df.empty:
+            self.extractor.save_results(df, summary, self.output_folder, self.output_format)
+        else:
+            # Sem transações restantes, o consolidado antigo teria linhas de PDFs removidos
+            self.remove_consolidated()
+        if summary:
+            self.extractor.generate_report(summary, self.trace_file)
+
+    def remove_consolidated(self):
+        """Apaga o consolidado (e o resumo do dataset Parquet), se existirem"""
+
+        summary_file = self.consolidated_file.with_name(f"{self.consolidated_file.name}_resumo.parquet")
+        removed = False
+        for path in [self.consolidated_file, summary_file]:
+            if path.is_dir():
+                shutil.rmtree(path)
+                removed = True
+            elif path.exists():
+                path.unlink()
+                removed = True
+
+        if removed:
+            print(f"🗑️  Nenhuma transação restante; consolidado removido: {self.consolidated_file}")
+
+    def run(self):
+        """Observa a pasta até Ctrl+C ou SIGTERM"""
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        watcher = open_watcher(self.folder, self.polling, self.poll_interval)
+        print(f"👀 Observando {self.folder} ({watcher.name}; processa após {self.settle}s sem mudança)")
+
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        # Arquivos que já estão na pasta passam pela mesma espera
+        self.track({p.name for p in self.folder.glob("*.pdf")}, time.monotonic())
+
+        try:
+            while True:
+                # Com arquivos em espera, acorda a tempo de conferir o settle
+                timeout = min(self.poll_interval, self.settle / 2) if self.unsettled else self.poll_interval
+                changed = watcher.changes(timeout)
+
+                now = time.monotonic()
+                self.track(changed, now)
+                ready = self.settled(now)
+
+                if ready:
+                    print(f"\n📥 {len(ready)} arquivo(s) pronto(s): {', '.join(sorted(ready))}")
+                    self.process_ready()
+                    print(f"\n👀 Aguardando novos arquivos em {self.folder}")
+        except KeyboardInterrupt:
+            print("\n🛑 Watch encerrado")
+        finally:
+            watcher.close()
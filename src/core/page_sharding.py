@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Extração paralela por faixas de páginas para extratos muito grandes
+
+O parser de cada banco é dividido em duas partes:
+
+- uma função por página, sem estado entre páginas, que devolve o resultado
+  bruto da página (cabeçalho encontrado, transações etc.);
+- uma função de montagem que percorre esses resultados na ordem das páginas
+  e aplica o estado que atravessa páginas (cabeçalho, data corrente...).
+
+Assim a parte cara (texto e tabelas do pdfplumber) roda em vários processos
+e a montagem, barata, continua sequencial e dá o mesmo resultado do modo
+de uma página por vez.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.pdf_document import PDFDocument
+
+# Abaixo disso o custo de abrir o PDF em cada processo não compensa
+MIN_PAGES_TO_SHARD = 40
+
+# Mais faixas que processos equilibra páginas de custo desigual
+SHARDS_PER_WORKER = 4
+
+
+def split_page_ranges(total_pages: int, shards: int) -> list:
+    """Divide [0, total_pages) em faixas contíguas de tamanho parecido"""
+
+    shards = max(1, min(shards, total_pages))
+    size, extra = divmod(total_pages, shards)
+
+    ranges = []
+    start = 0
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
+
+def parse_page_range(parse_page, pdf_path: str, start: int, end: int) -> list:
+    """Aplica parse_page às páginas [start, end) de um PDF (roda no worker)"""
+
+    with PDFDocument(pdf_path) as pdf:
+        return [
+            parse_page(page, page_num, pdf_path)
+            for page_num, page in enumerate(pdf.iter_pages(start, end), start + 1)
+        ]
+
+
+def count_pages(pdf_path: str, document: PDFDocument = None) -> int:
+    """Número de páginas, reaproveitando o documento aberto se houver"""
+
+    if document is not None:
+        return len(document.pages)
+
+    with PDFDocument(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def parse_pages_sharded(parse_page, pdf_path: str, workers: int, total_pages: int = None) -> list:
+    """Roda parse_page em todas as páginas usando vários processos
+
+    Returns:
+        list: resultados por página, na ordem das páginas
+    """
+
+    if total_pages is None:
+        total_pages = count_pages(pdf_path)
+
+    ranges = split_page_ranges(total_pages, workers * SHARDS_PER_WORKER)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(parse_page_range, parse_page, pdf_path, start, end)
+            for start, end in ranges
+        ]
+
+        # Junta na ordem das faixas, não na ordem em que terminam
+        page_results = []
+        for future in futures:
+            page_results.extend(future.result())
+
+    return page_results
+
+
+def should_shard(workers: int, total_pages: int) -> bool:
+    """Decide se vale a pena dividir o PDF entre processos"""
+
+    return workers > 1 and total_pages >= MIN_PAGES_TO_SHARD
@@ -1,27 +1,315 @@
 #!/usr/bin/env python3
 """Extrator universal para todos os bancos"""
 
-import pandas as pd
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import List, Dict, Any
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.bank_detector import BankDetector, BankType
 from core.extractor_factory import ExtractorFactory
+from parsers.base_extractor import BaseExtractor, looks_degenerate, merge_summaries, summarize_transactions
+from utils.lazy_imports import lazy_import
+from utils.output_sinks import SINKS, get_sink
+from utils.pdf_backends import BACKENDS
+from utils.pdf_document import PageLimits, PDFDocument
+from utils.result_cache import ResultCache
+from utils.run_manifest import RunManifest
+from utils.stage_timer import print_timing_report, recording, timed, write_trace
+
+pd = lazy_import('pandas')
+
+# Como aparece o nível de detecção nas mensagens
+TIER_LABELS = {
+    BankDetector.TIER_FILENAME: 'nome do arquivo',
+    BankDetector.TIER_METADATA: 'metadados do PDF',
+    BankDetector.TIER_CONTENT: 'conteúdo'
+}
+
+# Colunas gravadas no modo streaming (fixas para todos os arquivos)
+STREAM_COLUMNS = BaseExtractor.STANDARD_COLUMNS + ['banco_detectado', 'codigo_banco']
+
+# Colunas da aba de resumo (uma linha por arquivo)
+SUMMARY_COLUMNS = ['arquivo', 'banco', 'status', 'transacoes', 'deteccao', 'total_creditos', 'total_debitos']
+
+def _extraction_entry(bank_info: Dict[str, str], transactions: int, summary: Dict[str, Any],
+                      header_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Entrada do resumo de processamento para uma extração concluída"""
+    
+    if transactions:
+        print(f"✅ {transactions} transações extraídas")
+        print(f"💰 Créditos: R$ {summary.get('total_creditos', 0):,.2f}")
+        print(f"💸 Débitos: R$ {summary.get('total_debitos', 0):,.2f}")
+        return {
+            'banco': bank_info['name'],
+            'status': 'sucesso',
+            'transacoes': transactions,
+            'resumo': summary,
+            'cabecalho': header_info
+        }
+    
+    print("⚠️  Nenhuma transação encontrada")
+    return {
+        'banco': bank_info['name'],
+        'status': 'sem_dados',
+        'transacoes': 0,
+        'cabecalho': header_info
+    }
+
+def extract_with_bank(bank_type: BankType, pdf_file: Path, document: PDFDocument,
+                      page_workers: int = 1, backend: str = None) -> tuple[pd.DataFrame, Dict[str, Any]]:
+    """Extrai um PDF com o extractor do banco informado"""
+    
+    bank_info = BankDetector.get_bank_info(bank_type)
+    df = pd.DataFrame()
+    
+    # 2. Cria extractor específico
+    try:
+        with ExtractorFactory.create_extractor(bank_type, str(pdf_file), document, page_workers, backend) as extractor:
+            # 3. Extrai dados
+            with timed(f"extrator.{type(extractor).__name__}"):
+                df, header_info = extractor.extract_statement()
+        
+        summary = {}
+        if not df.empty:
+            # 4. Adiciona informações do banco
+            df['banco_detectado'] = bank_info['name']
+            df['codigo_banco'] = bank_info['code']
+            
+            # 5. Gera resumo
+            summary = extractor.get_summary(df)
+        
+        entry = _extraction_entry(bank_info, len(df), summary, header_info)
+            
+    except Exception as e:
+        df = pd.DataFrame()
+        entry = {
+            'banco': bank_info['name'],
+            'status': 'erro',
+            'erro': str(e)
+        }
+        print(f"❌ Erro: {e}")
+    
+    return df, entry
+
+def process_pdf(pdf_file: Path, page_workers: int = 1, backend: str = None,
+                limits: PageLimits = None, timings: bool = False) -> tuple[pd.DataFrame, Dict[str, Any]]:
+    """Detecta o banco e extrai um único PDF
+    
+    Com timings, a entrada do resumo leva os tempos de cada etapa ('tempos').
+
+    Returns:
+        tuple: (DataFrame com transações, entrada do resumo de processamento)
+    """
+    
+    print(f"\n📄 Processando: {pdf_file.name}")
+    
+    # Abre o PDF uma única vez para detecção e extração
+    with recording(timings) as times, PDFDocument(pdf_file, backend, limits) as document:
+        # 1. Detecta o banco (nome do arquivo, metadados ou conteúdo)
+        bank_type, tier = BankDetector.detect_bank_with_tier(str(pdf_file), document)
+        bank_info = BankDetector.get_bank_info(bank_type)
+        
+        print(f"🏦 Banco detectado: {bank_info['name']} ({bank_info['code']}) via {TIER_LABELS[tier]}")
+        
+        df, entry = extract_with_bank(bank_type, pdf_file, document, page_workers, backend)
+        
+        # Nome/metadados não bastaram para extrair (ou o resultado veio
+        # degenerado, sinal de layout errado): confirma pelo conteúdo
+        if tier != BankDetector.TIER_CONTENT and (entry['status'] != 'sucesso' or looks_degenerate(df)):
+            content_type = BankDetector.detect_from_content(str(pdf_file), document)
+            if content_type != bank_type:
+                content_info = BankDetector.get_bank_info(content_type)
+                print(f"🔁 Tentando pelo conteúdo: {content_info['name']} ({content_info['code']})")
+                df, entry = extract_with_bank(content_type, pdf_file, document, page_workers, backend)
+            tier = BankDetector.TIER_CONTENT
+        
+        entry['deteccao'] = tier
+    
+    if times is not None:
+        entry['tempos'] = times.as_dict()
+    
+    return df, entry
+
+def stream_with_bank(bank_type: BankType, pdf_file: Path, document: PDFDocument, sink,
+                     page_workers: int = 1, backend: str = None) -> Dict[str, Any]:
+    """Extrai um PDF com o extractor do banco, gravando os lotes direto no destino"""
+    
+    bank_info = BankDetector.get_bank_info(bank_type)
+    transactions = 0
+    summary = {}
+    
+    try:
+        with ExtractorFactory.create_extractor(bank_type, str(pdf_file), document, page_workers, backend) as extractor:
+            # Cada lote (uma página, quando o parser permite) sai da memória ao ser gravado
+            with timed(f"extrator.{type(extractor).__name__}"):
+                for batch in extractor.iter_transaction_batches():
+                    batch['banco_detectado'] = bank_info['name']
+                    batch['codigo_banco'] = bank_info['code']
+                    with timed('saida'):
+                        sink.write(batch)
+                    
+                    transactions += len(batch)
+                    summary = merge_summaries(summary, summarize_transactions(batch))
+        
+        entry = _extraction_entry(bank_info, transactions, summary, extractor.header_info)
+        
+    except Exception as e:
+        entry = {
+            'banco': bank_info['name'],
+            'status': 'erro',
+            'erro': str(e)
+        }
+        # Lotes gravados antes do erro continuam no destino
+        if transactions:
+            entry['transacoes'] = transactions
+        print(f"❌ Erro: {e}")
+    
+    return entry
+
+def stream_pdf(pdf_file: Path, sink, page_workers: int = 1, backend: str = None,
+               limits: PageLimits = None, timings: bool = False) -> Dict[str, Any]:
+    """Detecta o banco e grava as transações de um PDF no destino, lote a lote
+
+    Returns:
+        dict: entrada do resumo de processamento
+    """
+    
+    print(f"\n📄 Processando: {pdf_file.name}")
+    
+    with recording(timings) as times, PDFDocument(pdf_file, backend, limits) as document:
+        bank_type, tier = BankDetector.detect_bank_with_tier(str(pdf_file), document)
+        bank_info = BankDetector.get_bank_info(bank_type)
+        
+        print(f"🏦 Banco detectado: {bank_info['name']} ({bank_info['code']}) via {TIER_LABELS[tier]}")
+        
+        entry = stream_with_bank(bank_type, pdf_file, document, sink, page_workers, backend)
+        
+        # Como em process_pdf; só tenta de novo se nada foi gravado
+        if tier != BankDetector.TIER_CONTENT and entry['status'] != 'sucesso' and not entry.get('transacoes'):
+            content_type = BankDetector.detect_from_content(str(pdf_file), document)
+            if content_type != bank_type:
+                content_info = BankDetector.get_bank_info(content_type)
+                print(f"🔁 Tentando pelo conteúdo: {content_info['name']} ({content_info['code']})")
+                entry = stream_with_bank(content_type, pdf_file, document, sink, page_workers, backend)
+            tier = BankDetector.TIER_CONTENT
+        
+        entry['deteccao'] = tier
+    
+    if times is not None:
+        entry['tempos'] = times.as_dict()
+    
+    return entry
+
+def summary_frame(summary: Dict[str, Any]) -> pd.DataFrame:
+    """Aba de resumo: uma linha por arquivo processado"""
+    
+    return pd.DataFrame([
+        {
+            'arquivo': arquivo,
+            'banco': info.get('banco', ''),
+            'status': info.get('status', ''),
+            'transacoes': info.get('transacoes', 0),
+            'deteccao': info.get('deteccao', ''),
+            'total_creditos': info.get('resumo', {}).get('total_creditos', 0),
+            'total_debitos': info.get('resumo', {}).get('total_debitos', 0)
+        }
+        for arquivo, info in summary.items()
+    ], columns=SUMMARY_COLUMNS)
+
+def bank_totals(summary_df: pd.DataFrame) -> pd.DataFrame:
+    """Arquivos, transações, créditos e débitos por banco, na ordem em que aparecem"""
+    
+    banks = summary_df['banco'].replace('', 'Desconhecido').astype('category')
+    return summary_df.groupby(banks, sort=False, observed=True).agg(
+        arquivos=('arquivo', 'size'),
+        transacoes=('transacoes', 'sum'),
+        total_creditos=('total_creditos', 'sum'),
+        total_debitos=('total_debitos', 'sum')
+    )
+
+def _cache_key(cache: ResultCache, pdf_file: Path, backend: str = None) -> str:
+    """Chave do cache com as entradas da detecção do banco
+    
+    O nome do arquivo indica o banco (confirmado pelo conteúdo) e com ele o
+    extractor: o mesmo PDF renomeado pode dar outro resultado. Entram na
+    chave o banco do nome, o extractor e o backend desse banco.
+    """
+    
+    hint = BankDetector.detect_from_filename(str(pdf_file))
+    spec = ExtractorFactory.spec_for(hint)
+    return cache.key_for(pdf_file, backend, hint.value if hint else '', spec.target,
+                         ExtractorFactory.backend_for(hint, backend))
+
+def _cache_info(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Entrada do resumo como vai para o cache
+    
+    O resumo é recalculado do DataFrame na leitura; tempos são da execução.
+    """
+    
+    return {k: v for k, v in entry.items() if k not in ('resumo', 'tempos')}
+
+def _from_cache(pdf_file: Path, df: pd.DataFrame, info: Dict[str, Any],
+                origin: str = "♻️  Em cache") -> tuple[pd.DataFrame, Dict[str, Any]]:
+    """Reconstrói o resultado de um arquivo a partir do cache (ou do manifesto)"""
+    
+    print(f"\n{origin}: {pdf_file.name} ({info.get('banco')}, {info.get('transacoes', 0)} transações)")
+    
+    entry = dict(info)
+    if entry.get('status') == 'sucesso':
+        entry['resumo'] = summarize_transactions(df)
+    
+    return df, entry
+
+def _worker_failure(pdf_file: Path, error: BaseException) -> tuple[pd.DataFrame, Dict[str, Any]]:
+    """Resultado para um arquivo cujo processo de extração falhou"""
+    
+    if isinstance(error, BrokenProcessPool):
+        error = "processo de extração encerrado inesperadamente"
+    
+    print(f"❌ Erro em {pdf_file.name}: {error}")
+    
+    return pd.DataFrame(), {
+        'banco': BankDetector.get_bank_info(BankType.UNKNOWN)['name'],
+        'status': 'erro',
+        'erro': str(error)
+    }
 
 class UniversalExtractor:
     """Extrator universal que identifica e processa qualquer banco"""
     
-    def __init__(self, input_folder: str = "data/input"):
+    def __init__(self, input_folder: str = "data/input", workers: int = 1, page_workers: int = 1,
+                 cache: ResultCache = None, backend: str = None, limits: PageLimits = None,
+                 manifest: RunManifest = None, timings: bool = False):
         self.input_folder = Path(input_folder)
+        self.workers = max(1, workers)
+        self.page_workers = max(1, page_workers)
+        # Backend de PDF para todos os bancos (None = o preferido de cada banco)
+        self.backend = backend
+        # Limites de memória na leitura página a página (reabrir o PDF, teto de RSS)
+        self.limits = limits
+        # Cache de resultados por conteúdo do PDF (None = desativado)
+        self.cache = cache
+        # Manifesto da execução incremental (None = processa tudo)
+        self.manifest = manifest
+        # Mede o tempo de cada etapa (tabelas no fim do relatório)
+        self.timings = timings
+        # Tempos da gravação do consolidado (fora dos arquivos)
+        self.output_times = None
         self.results = []
         
-    def process_all_pdfs(self) -> tuple[pd.DataFrame, Dict[str, Any]]:
-        """Processa todos os PDFs da pasta automaticamente"""
+    def process_all_pdfs(self, pdf_files: List[Path] = None) -> tuple[pd.DataFrame, Dict[str, Any]]:
+        """Processa todos os PDFs da pasta automaticamente
         
-        pdf_files = list(self.input_folder.glob("*.pdf"))
+        pdf_files: arquivos a considerar (padrão: todos os PDFs da pasta; o
+        modo watch deixa de fora os que ainda estão sendo copiados)
+        """
+        
+        if pdf_files is None:
+            pdf_files = list(self.input_folder.glob("*.pdf"))
         
         if not pdf_files:
             print(f"Nenhum PDF encontrado em: {self.input_folder}")
@@ -30,60 +318,45 @@ class UniversalExtractor:
         print(f"🔍 Encontrados {len(pdf_files)} arquivos PDF")
         print("="*50)
         
+        # Arquivos sem alteração desde a última execução incremental vêm
+        # das partições do manifesto; os demais passam pelo cache
+        results = {}
+        cache_keys = {}
+        pending = pdf_files
+        
+        if self.manifest is not None:
+            pending = self._pending_in_manifest(pdf_files, results)
+        
+        if self.cache is not None:
+            candidates, pending = pending, []
+            for pdf_file in candidates:
+                cache_keys[pdf_file.name] = _cache_key(self.cache, pdf_file, self.backend)
+                cached = self.cache.get(cache_keys[pdf_file.name])
+                if cached is not None:
+                    results[pdf_file.name] = _from_cache(pdf_file, *cached)
+                else:
+                    pending.append(pdf_file)
+        
+        if self.workers > 1 and len(pending) > 1:
+            results.update(self._process_parallel(pending))
+        else:
+            results.update({pdf_file.name: process_pdf(pdf_file, self.page_workers, self.backend, self.limits, self.timings) for pdf_file in pending})
+        
+        if self.cache is not None:
+            self._store_in_cache(pending, results, cache_keys)
+        
+        if self.manifest is not None:
+            self._store_in_manifest(pending, results)
+        
+        # Resultados na ordem dos arquivos, igual ao modo sequencial
         all_transactions = []
         processing_summary = {}
         
         for pdf_file in pdf_files:
-            print(f"\n📄 Processando: {pdf_file.name}")
-            
-            # 1. Detecta o banco
-            bank_type = BankDetector.detect_bank(str(pdf_file))
-            bank_info = BankDetector.get_bank_info(bank_type)
-            
-            print(f"🏦 Banco detectado: {bank_info['name']} ({bank_info['code']})")
-            
-            # 2. Cria extractor específico
-            try:
-                extractor = ExtractorFactory.create_extractor(bank_type, str(pdf_file))
-                
-                # 3. Extrai dados
-                df, header_info = extractor.extract_statement()
-                
-                if not df.empty:
-                    # 4. Adiciona informações do banco
-                    df['banco_detectado'] = bank_info['name']
-                    df['codigo_banco'] = bank_info['code']
-                    
-                    all_transactions.append(df)
-                    
-                    # 5. Gera resumo
-                    summary = extractor.get_summary(df)
-                    processing_summary[pdf_file.name] = {
-                        'banco': bank_info['name'],
-                        'status': 'sucesso',
-                        'transacoes': len(df),
-                        'resumo': summary
-                    }
-                    
-                    print(f"✅ {len(df)} transações extraídas")
-                    print(f"💰 Créditos: R$ {summary.get('total_creditos', 0):,.2f}")
-                    print(f"💸 Débitos: R$ {summary.get('total_debitos', 0):,.2f}")
-                    
-                else:
-                    processing_summary[pdf_file.name] = {
-                        'banco': bank_info['name'],
-                        'status': 'sem_dados',
-                        'transacoes': 0
-                    }
-                    print("⚠️  Nenhuma transação encontrada")
-                    
-            except Exception as e:
-                processing_summary[pdf_file.name] = {
-                    'banco': bank_info['name'],
-                    'status': 'erro',
-                    'erro': str(e)
-                }
-                print(f"❌ Erro: {e}")
+            df, entry = results[pdf_file.name]
+            processing_summary[pdf_file.name] = entry
+            if not df.empty:
+                all_transactions.append(df)
         
         # 6. Consolida resultados
         if all_transactions:
@@ -97,95 +370,333 @@ class UniversalExtractor:
         
         return pd.DataFrame(), processing_summary
     
-    def save_results(self, df: pd.DataFrame, summary: Dict[str, Any], output_folder: str = "data/output"):
-        """Salva resultados consolidados"""
+    def stream_all_pdfs(self, sink) -> Dict[str, Any]:
+        """Processa todos os PDFs gravando as transações no destino conforme são extraídas
+        
+        Nenhum DataFrame consolidado é montado: a memória fica limitada a um
+        lote por vez. As linhas saem na ordem dos arquivos (por nome) e, dentro
+        de cada arquivo, na ordem do extrato. Os arquivos são processados em
+        sequência; o cache é consultado, mas não é gravado (guardar o
+        resultado exigiria manter o extrato inteiro em memória).
+        
+        Returns:
+            dict: resumo de processamento por arquivo
+        """
+        
+        pdf_files = sorted(self.input_folder.glob("*.pdf"))
+        
+        if not pdf_files:
+            print(f"Nenhum PDF encontrado em: {self.input_folder}")
+            return {}
+        
+        print(f"🔍 Encontrados {len(pdf_files)} arquivos PDF")
+        print("="*50)
+        
+        processing_summary = {}
+        
+        for pdf_file in pdf_files:
+            if self.cache is not None:
+                cached = self.cache.get(_cache_key(self.cache, pdf_file, self.backend))
+                if cached is not None:
+                    df, processing_summary[pdf_file.name] = _from_cache(pdf_file, *cached)
+                    sink.write(df)
+                    continue
+            
+            processing_summary[pdf_file.name] = stream_pdf(pdf_file, sink, self.page_workers, self.backend, self.limits, self.timings)
+        
+        return processing_summary
+    
+    def _process_parallel(self, pdf_files: List[Path]) -> Dict[str, tuple]:
+        """Distribui os arquivos entre processos e coleta conforme terminam"""
+        
+        results = {}
+        crashed = []
+        
+        print(f"⚙️  Processando com {self.workers} processos")
+        
+        # Parsers carregados antes do fork: os processos não importam nada
+        # por conta própria (com spawn, o initializer faz o mesmo em cada um)
+        ExtractorFactory.prewarm()
+        
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(pdf_files)),
+                                 initializer=ExtractorFactory.prewarm) as pool:
+            futures = {pool.submit(process_pdf, pdf_file, self.page_workers, self.backend, self.limits, self.timings): pdf_file for pdf_file in pdf_files}
+            
+            for future in as_completed(futures):
+                pdf_file = futures[future]
+                try:
+                    results[pdf_file.name] = future.result()
+                except BrokenProcessPool:
+                    # Um processo morreu (ex.: PDF malformado) e derrubou o pool
+                    crashed.append(pdf_file)
+                    continue
+                except Exception as e:
+                    results[pdf_file.name] = _worker_failure(pdf_file, e)
+                
+                print(f"📦 [{len(results)}/{len(pdf_files)}] Concluído: {pdf_file.name}")
+        
+        # Reprocessa cada arquivo afetado pela queda em um processo próprio,
+        # assim só o PDF problemático fica marcado como erro
+        for pdf_file in crashed:
+            with ProcessPoolExecutor(max_workers=1, initializer=ExtractorFactory.prewarm) as pool:
+                try:
+                    results[pdf_file.name] = pool.submit(process_pdf, pdf_file, self.page_workers, self.backend, self.limits, self.timings).result()
+                except Exception as e:
+                    results[pdf_file.name] = _worker_failure(pdf_file, e)
+        
+        return results
+    
+    def _pending_in_manifest(self, pdf_files: List[Path], results: Dict[str, tuple]) -> List[Path]:
+        """Carrega do manifesto os arquivos sem alteração e devolve os que precisam ser processados"""
+        
+        removed = self.manifest.prune(pdf_files)
+        for name in removed:
+            print(f"🗑️  Removido da pasta: {name}")
+        
+        pending = []
+        for pdf_file in pdf_files:
+            loaded = self.manifest.load(pdf_file) if self.manifest.is_current(pdf_file) else None
+            if loaded is not None:
+                results[pdf_file.name] = _from_cache(pdf_file, *loaded, origin="⏭️  Sem alteração")
+            else:
+                pending.append(pdf_file)
+        
+        if pending or removed:
+            print(f"🔄 {len(pending)} arquivo(s) novo(s) ou alterado(s), {len(removed)} removido(s)")
+        
+        return pending
+    
+    def _store_in_manifest(self, pdf_files: List[Path], results: Dict[str, tuple]):
+        """Registra no manifesto os arquivos processados com sucesso ou sem dados"""
+        
+        for pdf_file in pdf_files:
+            df, entry = results[pdf_file.name]
+            
+            # Arquivos com erro ficam fora do manifesto e são tentados de novo
+            if entry.get('status') not in ('sucesso', 'sem_dados'):
+                self.manifest.forget(pdf_file.name)
+                continue
+            
+            if not self.manifest.record(pdf_file, df, entry):
+                print(f"⚠️  Não foi possível registrar {pdf_file.name} no manifesto")
+        
+        self.manifest.save()
+    
+    def _store_in_cache(self, pdf_files: List[Path], results: Dict[str, tuple], cache_keys: Dict[str, str]):
+        """Grava no cache os arquivos processados com sucesso ou sem dados"""
+        
+        for pdf_file in pdf_files:
+            df, entry = results[pdf_file.name]
+            
+            # Erros podem ser transitórios; não ficam no cache
+            if entry.get('status') not in ('sucesso', 'sem_dados'):
+                continue
+            
+            if not self.cache.put(cache_keys[pdf_file.name], df, _cache_info(entry)):
+                print(f"⚠️  Não foi possível salvar {pdf_file.name} no cache")
+    
+    def save_results(self, df: pd.DataFrame, summary: Dict[str, Any], output_folder: str = "data/output",
+                     output_format: str = 'xlsx'):
+        """Salva resultados consolidados
+        
+        output_format: xlsx (abas por banco e resumo), parquet (dataset
+        particionado por banco e mês) ou csv.
+        """
         
         output_path = Path(output_folder)
         output_path.mkdir(exist_ok=True)
         
         if not df.empty:
             # Salva transações consolidadas
-            consolidated_file = output_path / "extratos_consolidados.xlsx"
+            sink_class = get_sink(output_format)
+            consolidated_file = output_path / f"extratos_consolidados{sink_class.suffix}"
             
-            with pd.ExcelWriter(consolidated_file, engine='openpyxl') as writer:
-                # Aba principal com todas as transações
-                df.to_excel(writer, sheet_name='Todas_Transacoes', index=False)
-                
-                # Aba por banco
-                for banco in df['banco_detectado'].unique():
-                    if pd.notna(banco):
-                        df_banco = df[df['banco_detectado'] == banco]
-                        # Remove caracteres inválidos do Excel
-                        sheet_name = banco.replace(' ', '_').replace('/', '_').replace('\\', '_')
-                        sheet_name = ''.join(c for c in sheet_name if c.isalnum() or c == '_')[:31]
-                        df_banco.to_excel(writer, sheet_name=sheet_name, index=False)
-                
-                # Aba de resumo
-                summary_df = pd.DataFrame([
-                    {
-                        'arquivo': arquivo,
-                        'banco': info.get('banco', ''),
-                        'status': info.get('status', ''),
-                        'transacoes': info.get('transacoes', 0),
-                        'total_creditos': info.get('resumo', {}).get('total_creditos', 0),
-                        'total_debitos': info.get('resumo', {}).get('total_debitos', 0)
-                    }
-                    for arquivo, info in summary.items()
-                ])
-                
-                summary_df.to_excel(writer, sheet_name='Resumo', index=False)
+            # No xlsx, aba principal com todas as transações e aba por banco
+            # na mesma passada, em modo write-only; aba de resumo por último
+            with recording(self.timings) as times, timed('saida'):
+                with sink_class(consolidated_file, list(df.columns)) as sink:
+                    sink.write(df)
+                    sink.write_summary(summary_frame(summary))
+            
+            if times is not None:
+                self.output_times = times.as_dict()
             
             print(f"\n💾 Resultados salvos em: {consolidated_file}")
             return consolidated_file
         
         return None
     
-    def generate_report(self, summary: Dict[str, Any]):
-        """Gera relatório de processamento"""
+    def generate_report(self, summary: Dict[str, Any], trace_file: str = None):
+        """Gera relatório de processamento
+        
+        Com timings, termina com o tempo por arquivo e por etapa; trace_file
+        grava também cada chamada das etapas (Trace Event, JSON).
+        """
         
         print(f"\n📊 RELATÓRIO FINAL")
         print("="*50)
         
-        total_files = len(summary)
-        successful = len([s for s in summary.values() if s.get('status') == 'sucesso'])
-        total_transactions = sum(s.get('transacoes', 0) for s in summary.values())
+        # Mesma tabela da aba de resumo; totais por banco num único groupby
+        summary_df = summary_frame(summary)
+        total_files = len(summary_df)
+        successful = int((summary_df['status'] == 'sucesso').sum())
+        total_transactions = int(summary_df['transacoes'].sum())
         
         print(f"📁 Arquivos processados: {total_files}")
         print(f"✅ Sucessos: {successful}")
         print(f"❌ Erros: {total_files - successful}")
         print(f"📋 Total de transações: {total_transactions}")
         
-        # Resumo por banco
-        banks = {}
-        for info in summary.values():
-            banco = info.get('banco', 'Desconhecido')
-            if banco not in banks:
-                banks[banco] = {'arquivos': 0, 'transacoes': 0}
-            banks[banco]['arquivos'] += 1
-            banks[banco]['transacoes'] += info.get('transacoes', 0)
+        # Quantos arquivos foram identificados por cada nível de detecção
+        tiers = summary_df.loc[summary_df['deteccao'] != '', 'deteccao'].value_counts(sort=False)
+        if len(tiers):
+            print("🔎 Detecção: " + ", ".join(f"{TIER_LABELS.get(t, t)}: {n}" for t, n in tiers.items()))
         
+        # Resumo por banco
         print(f"\n🏦 RESUMO POR BANCO:")
-        for banco, stats in banks.items():
-            print(f"  {banco}: {stats['arquivos']} arquivo(s), {stats['transacoes']} transação(ões)")
+        for stats in bank_totals(summary_df).itertuples():
+            print(f"  {stats.Index}: {stats.arquivos} arquivo(s), {stats.transacoes} transação(ões)")
+        
+        if self.timings:
+            file_times = {name: entry.get('tempos') for name, entry in summary.items()}
+            print_timing_report(file_times, self.output_times)
+            
+            if trace_file:
+                write_trace(trace_file, file_times, self.output_times)
+                print(f"\n🧭 Trace salvo em: {trace_file} (abrir em chrome://tracing ou ui.perfetto.dev)")
 
 def main():
     """Função principal"""
     
+    parser = argparse.ArgumentParser(description="Extrator universal de extratos bancários")
+    parser.add_argument('--input', default="data/input", help="Pasta com os PDFs")
+    parser.add_argument('--output', default="data/output", help="Pasta de saída")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Número de processos para processar arquivos em paralelo")
+    parser.add_argument('--page-workers', type=int, default=1,
+                        help="Número de processos para dividir as páginas de um PDF grande")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=None,
+                        help="Biblioteca de leitura de PDF para todos os bancos "
+                             "(padrão: a preferida de cada banco)")
+    parser.add_argument('--reopen-every', type=int, default=None,
+                        help="Reabre o PDF a cada N páginas para soltar a memória da biblioteca")
+    parser.add_argument('--max-rss-mb', type=float, default=None,
+                        help="Teto de memória do processo (MB): acima dele o PDF é reaberto "
+                             "antes da próxima página")
+    parser.add_argument('--cache-dir', default="data/cache", help="Pasta do cache de resultados")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache (não lê nem grava resultados)")
+    parser.add_argument('--purge-cache', action='store_true',
+                        help="Apaga o cache antes de processar")
+    parser.add_argument('--stream', nargs='?', const='csv', choices=sorted(SINKS), default=None,
+                        help="Grava as transações em lotes conforme são extraídas, sem montar "
+                             "o consolidado em memória (formato padrão: csv)")
+    parser.add_argument('--format', choices=sorted(SINKS), default='xlsx',
+                        help="Formato do consolidado fora do modo streaming (padrão: xlsx; "
+                             "parquet grava um dataset particionado por banco e mês)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Processa só os PDFs novos ou alterados desde a última execução "
+                             "(manifesto na pasta de saída) e remonta o consolidado")
+    parser.add_argument('--timings', action='store_true',
+                        help="Mede o tempo de cada etapa (detecção, leitura das páginas, parsing, "
+                             "normalização, gravação) e mostra as tabelas no fim do relatório")
+    parser.add_argument('--trace', default=None, metavar='ARQUIVO',
+                        help="Com a medição (implica --timings), grava cada chamada das etapas em "
+                             "JSON no formato Trace Event (chrome://tracing, Perfetto)")
+    parser.add_argument('--serve', action='store_true',
+                        help="Sobe o servidor local de extração (um PDF por pedido, processos "
+                             "pré-aquecidos; --workers define quantos) em vez de processar a pasta")
+    parser.add_argument('--host', default="127.0.0.1", help="Endereço do servidor (--serve)")
+    parser.add_argument('--port', type=int, default=8765, help="Porta do servidor (--serve)")
+    parser.add_argument('--max-pending', type=int, default=16,
+                        help="Pedidos em fila além dos que estão em extração (--serve); "
+                             "acima disso o servidor responde 503")
+    parser.add_argument('--watch', action='store_true',
+                        help="Observa a pasta de entrada e processa cada PDF novo ou alterado "
+                             "assim que ele para de mudar, atualizando o consolidado (usa o "
+                             "manifesto do modo incremental)")
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help="Segundos sem mudança de tamanho/data para o PDF ser processado (--watch)")
+    parser.add_argument('--polling', action='store_true',
+                        help="No --watch, varre a pasta periodicamente em vez de usar inotify "
+                             "(ex.: pastas de rede)")
+    args = parser.parse_args()
+    
+    if args.incremental and args.stream:
+        parser.error("--incremental não pode ser usado com --stream")
+    
+    if args.serve and (args.incremental or args.stream or args.watch):
+        parser.error("--serve não pode ser usado com --incremental, --stream ou --watch")
+    
+    if args.watch and args.stream:
+        parser.error("--watch não pode ser usado com --stream")
+    
     print("🚀 EXTRATOR UNIVERSAL DE EXTRATOS BANCÁRIOS")
     print("="*50)
     
-    # Cria extrator universal
-    extractor = UniversalExtractor()
+    cache = ResultCache(args.cache_dir)
+    if args.purge_cache:
+        cache.purge()
+        print(f"🧹 Cache apagado: {args.cache_dir}")
     
-    # Processa todos os PDFs
-    df, summary = extractor.process_all_pdfs()
+    if args.serve:
+        from core.extraction_server import ExtractionServer, serve
+        
+        server = ExtractionServer(args.workers, args.max_pending, backend=args.backend,
+                                  limits=PageLimits(args.reopen_every, args.max_rss_mb),
+                                  cache=None if args.no_cache else cache)
+        serve(server, args.host, args.port)
+        return
+    
+    if args.watch:
+        from core.folder_watcher import FolderWatcher
+        
+        extractor = UniversalExtractor(args.input, workers=args.workers, page_workers=args.page_workers,
+                                       cache=None if args.no_cache else cache, backend=args.backend,
+                                       limits=PageLimits(args.reopen_every, args.max_rss_mb),
+                                       timings=args.timings or args.trace is not None)
+        FolderWatcher(extractor, args.output, args.format, settle=args.settle, polling=args.polling,
+                      trace_file=args.trace).run()
+        return
+    
+    # Nada para processar: encerra antes de carregar pandas e as bibliotecas
+    # de PDF (importadas só no primeiro uso)
+    pdf_files = list(Path(args.input).glob("*.pdf"))
+    if not pdf_files:
+        print(f"Nenhum PDF encontrado em: {args.input}")
+        return
+    
+    manifest = RunManifest(args.output, [args.backend]) if args.incremental else None
+    consolidated_file = Path(args.output) / f"extratos_consolidados{get_sink(args.format).suffix}"
+    if manifest is not None and consolidated_file.exists() and manifest.up_to_date(pdf_files):
+        print(f"\n✔️  Nenhum arquivo novo ou alterado; consolidado mantido: {consolidated_file}")
+        return
     
-    # Salva resultados
-    if not df.empty:
-        output_file = extractor.save_results(df, summary)
+    # Cria extrator universal
+    extractor = UniversalExtractor(args.input, workers=args.workers, page_workers=args.page_workers,
+                                   cache=None if args.no_cache else cache, backend=args.backend,
+                                   limits=PageLimits(args.reopen_every, args.max_rss_mb),
+                                   manifest=manifest, timings=args.timings or args.trace is not None)
+    
+    if args.stream:
+        # Transações vão direto para o arquivo, página a página
+        sink_class = get_sink(args.stream)
+        output_file = Path(args.output) / f"extratos_consolidados{sink_class.suffix}"
+        with sink_class(output_file, STREAM_COLUMNS) as sink:
+            summary = extractor.stream_all_pdfs(sink)
+            sink.write_summary(summary_frame(summary))
+        if sink.rows:
+            print(f"\n💾 {sink.rows} transações salvas em: {output_file}")
+    else:
+        # Processa todos os PDFs
+        df, summary = extractor.process_all_pdfs()
+        
+        # Salva resultados
+        if not df.empty:
+            output_file = extractor.save_results(df, summary, args.output, args.format)
     
     # Gera relatório
-    extractor.generate_report(summary)
+    extractor.generate_report(summary, args.trace)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,15 +1,51 @@
 #!/usr/bin/env python3
 """Interface base para todos os extractors"""
 
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
+from utils.br_format import normalize_transactions
+from utils.lazy_imports import lazy_import
+from utils.pdf_document import PDFDocument
+from utils.stage_timer import timed
+
+pd = lazy_import('pandas')
+
+# Fração das linhas com o mesmo defeito a partir da qual o resultado é descartado
+DEGENERATE_SHARE = 0.9
 
 class BaseExtractor(ABC):
     """Classe base para todos os extractors de banco"""
     
-    def __init__(self, pdf_path: str):
+    # Colunas padrão esperadas na saída
+    STANDARD_COLUMNS = [
+        'arquivo', 'data_movimento', 'historico', 'documento', 
+        'valor', 'saldo', 'tipo', 'conta', 'agencia', 'banco'
+    ]
+    
+    def __init__(self, pdf_path: str, document: PDFDocument = None, page_workers: int = 1):
         self.pdf_path = pdf_path
+        # Documento já aberto (compartilhado com a detecção), se houver
+        self.document = document
+        # True quando o documento foi aberto para este extractor (fechado em close)
+        self.owns_document = False
+        # Processos para dividir as páginas de PDFs grandes (1 = sequencial)
+        self.page_workers = max(1, page_workers)
+        # Cabeçalho do último extrato lido por iter_transaction_batches
+        self.header_info = {}
+    
+    def close(self):
+        """Fecha o documento aberto para o extractor (o compartilhado fica com quem o abriu)"""
+        
+        if self.owns_document and self.document is not None:
+            self.document.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     @abstractmethod
     def extract_statement(self) -> tuple[pd.DataFrame, Dict[str, Any]]:
@@ -21,48 +57,115 @@ class BaseExtractor(ABC):
         """
         pass
     
-    def standardize_output(self, df: pd.DataFrame, header_info: Dict[str, Any]) -> pd.DataFrame:
-        """Padroniza saída para formato comum"""
-        
-        # Colunas padrão esperadas
-        standard_columns = [
-            'arquivo', 'data_movimento', 'historico', 'documento', 
-            'valor', 'saldo', 'tipo', 'conta', 'agencia', 'banco'
-        ]
+    def iter_transaction_batches(self) -> Iterator[pd.DataFrame]:
+        """
+        Gera as transações padronizadas em lotes, na ordem do extrato
         
-        # Adiciona colunas faltantes
-        for col in standard_columns:
-            if col not in df.columns:
-                df[col] = None
+        O padrão extrai tudo de uma vez (um único lote). Adapters cujo parser
+        lê página por página sobrescrevem para gerar um lote por página, sem
+        montar o DataFrame do extrato inteiro. Ao final, self.header_info
+        tem o cabeçalho do extrato.
+        """
         
-        # Padroniza tipos
-        if 'data_movimento' in df.columns:
-            df['data_movimento'] = pd.to_datetime(df['data_movimento'], format='%d/%m/%Y', errors='coerce')
+        df, self.header_info = self.extract_statement()
+        if not df.empty:
+            yield df
+    
+    def iter_transactions(self) -> Iterator[Dict[str, Any]]:
+        """Gera as transações padronizadas uma a uma (dicionários)"""
         
-        if 'valor' in df.columns:
-            df['valor'] = pd.to_numeric(df['valor'], errors='coerce')
+        for batch in self.iter_transaction_batches():
+            yield from batch.to_dict('records')
+    
+    def standardize_output(self, df: pd.DataFrame, header_info: Dict[str, Any]) -> pd.DataFrame:
+        """Padroniza saída para formato comum"""
         
-        if 'saldo' in df.columns:
-            df['saldo'] = pd.to_numeric(df['saldo'], errors='coerce')
+        standard_columns = self.STANDARD_COLUMNS
         
-        # Ordena colunas
-        df = df[standard_columns + [col for col in df.columns if col not in standard_columns]]
+        with timed('normalizacao'):
+            # Adiciona colunas faltantes
+            for col in standard_columns:
+                if col not in df.columns:
+                    df[col] = None
+            
+            # Colunas ainda em texto (formato brasileiro) são convertidas em bloco
+            df = normalize_transactions(df)
+            
+            # Padroniza tipos
+            if 'data_movimento' in df.columns:
+                df['data_movimento'] = pd.to_datetime(df['data_movimento'], format='%d/%m/%Y', errors='coerce')
+            
+            if 'valor' in df.columns:
+                df['valor'] = pd.to_numeric(df['valor'], errors='coerce')
+            
+            if 'saldo' in df.columns:
+                df['saldo'] = pd.to_numeric(df['saldo'], errors='coerce')
+            
+            # Ordena colunas
+            df = df[standard_columns + [col for col in df.columns if col not in standard_columns]]
         
         return df
     
     def get_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Gera resumo das transações"""
         
-        if df.empty:
-            return {}
-        
-        summary = {
-            'total_transacoes': len(df),
-            'periodo_inicio': df['data_movimento'].min() if 'data_movimento' in df.columns else None,
-            'periodo_fim': df['data_movimento'].max() if 'data_movimento' in df.columns else None,
-            'total_creditos': df[df['tipo'] == 'credit']['valor'].sum() if 'valor' in df.columns else 0,
-            'total_debitos': abs(df[df['tipo'] == 'debit']['valor'].sum()) if 'valor' in df.columns else 0,
-            'saldo_final': df['saldo'].iloc[-1] if 'saldo' in df.columns and not df.empty else 0
-        }
-        
-        return summary
\ No newline at end of file
+        return summarize_transactions(df)
+
+
+def summarize_transactions(df: pd.DataFrame) -> Dict[str, Any]:
+    """Resumo de um DataFrame já padronizado (não depende do extractor)"""
+    
+    if df.empty:
+        return {}
+    
+    summary = {
+        'total_transacoes': len(df),
+        'periodo_inicio': df['data_movimento'].min() if 'data_movimento' in df.columns else None,
+        'periodo_fim': df['data_movimento'].max() if 'data_movimento' in df.columns else None,
+        'total_creditos': df[df['tipo'] == 'credit']['valor'].sum() if 'valor' in df.columns else 0,
+        'total_debitos': abs(df[df['tipo'] == 'debit']['valor'].sum()) if 'valor' in df.columns else 0,
+        'saldo_final': df['saldo'].iloc[-1] if 'saldo' in df.columns and not df.empty else 0
+    }
+    
+    return summary
+
+
+def looks_degenerate(df: pd.DataFrame) -> bool:
+    """Transações padronizadas que indicam um extractor lendo o layout errado
+    
+    Quase todas as linhas sem letras no histórico (o histórico pegou a
+    coluna de documento ou de código) ou com saldo igual ao valor (a coluna
+    de saldo repetiu a de valor).
+    """
+    
+    if df.empty:
+        return False
+    
+    if 'historico' in df.columns:
+        without_letters = ~df['historico'].fillna('').astype(str).str.contains('[A-Za-zÀ-ÿ]')
+        if without_letters.mean() >= DEGENERATE_SHARE:
+            return True
+    
+    if 'valor' in df.columns and 'saldo' in df.columns and len(df) > 1:
+        if ((df['saldo'] == df['valor']) & df['saldo'].notna()).mean() >= DEGENERATE_SHARE:
+            return True
+    
+    return False
+
+
+def merge_summaries(summary: Dict[str, Any], batch_summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Acumula o resumo de um lote (em ordem) no resumo do extrato até aqui"""
+    
+    if not summary:
+        return dict(batch_summary)
+    if not batch_summary:
+        return summary
+    
+    return {
+        'total_transacoes': summary['total_transacoes'] + batch_summary['total_transacoes'],
+        'periodo_inicio': pd.Series([summary['periodo_inicio'], batch_summary['periodo_inicio']]).min(),
+        'periodo_fim': pd.Series([summary['periodo_fim'], batch_summary['periodo_fim']]).max(),
+        'total_creditos': summary['total_creditos'] + batch_summary['total_creditos'],
+        'total_debitos': summary['total_debitos'] + batch_summary['total_debitos'],
+        'saldo_final': batch_summary['saldo_final']
+    }
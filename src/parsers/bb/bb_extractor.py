@@ -45,6 +45,8 @@ def extract_bb_statement(pdf_path):
             
             # Processa tabelas
             tables = page.extract_tables()
+            # Texto e tabelas já extraídos: libera os objetos da página
+            page.close()
             for table in tables:
                 if not table or len(table) < 2:
                     continue
@@ -1,17 +1,12 @@
 #!/usr/bin/env python3
 """Adapter para extractor do BB"""
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
 import pandas as pd
 from pathlib import Path
 from parsers.base_extractor import BaseExtractor
 
-# Importa função do extractor existente
-with open('src/parsers/bb/bb_folder_extractor.py', 'r', encoding='utf-8') as f:
-    exec(f.read())
+# Funções do extractor existente
+from parsers.bb.bb_folder_extractor import extract_bb_statement, iter_bb_pages
 
 class BBExtractorAdapter(BaseExtractor):
     """Adapter para integrar extractor do BB com interface padrão"""
@@ -20,7 +15,19 @@ class BBExtractorAdapter(BaseExtractor):
         """Extrai dados usando extractor específico do BB"""
         
         # Usa função existente
-        df, contas_info = extract_bb_statement(self.pdf_path)
+        df, contas_info = extract_bb_statement(self.pdf_path, self.document)
+        
+        return self.prepare_batch(df, contas_info), contas_info
+    
+    def iter_transaction_batches(self):
+        """Um lote padronizado por página do extrato"""
+        
+        for page_transactions, self.header_info in iter_bb_pages(self.pdf_path, self.document):
+            if page_transactions:
+                yield self.prepare_batch(page_transactions.to_frame(), self.header_info)
+    
+    def prepare_batch(self, df: pd.DataFrame, contas_info: dict) -> pd.DataFrame:
+        """Padroniza as transações extraídas (extrato inteiro ou uma página)"""
         
         # Padroniza formato
         if not df.empty:
@@ -43,4 +50,4 @@ class BBExtractorAdapter(BaseExtractor):
             # Padroniza saída
             df = self.standardize_output(df, contas_info)
         
-        return df, contas_info
\ No newline at end of file
+        return df
\ No newline at end of file
@@ -1,21 +1,62 @@
 #!/usr/bin/env python3
 """Extrator para todos os PDFs da pasta input"""
 
-import pdfplumber
 import pandas as pd
 import re
-import os
 from datetime import datetime
 from pathlib import Path
+from utils.pdf_document import open_document
+from utils.row_builder import TransactionColumns
+from utils.table_layout import LayoutTableReader
 
-def extract_bb_statement(pdf_path):
+# Colunas das transações do BB, na ordem de saída
+BB_COLUMNS = [
+    'arquivo', 'data_movimento', 'historico', 'documento', 'valor', 'saldo',
+    'tipo', 'conta', 'nome_conta', 'agencia', 'periodo', 'banco'
+]
+
+# Colunas que vêm do cabeçalho da página (iguais em todas as linhas dela)
+BB_PAGE_COLUMNS = ['conta', 'nome_conta', 'agencia', 'periodo', 'banco']
+
+def extract_bb_statement(pdf_path, document=None):
     """Extrai dados específicos do formato BB"""
     
-    all_transactions = []
+    all_transactions = bb_rows(pdf_path)
     contas_info = {}
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
+    for page_transactions, contas_info in iter_bb_pages(pdf_path, document):
+        all_transactions.extend(page_transactions)
+    
+    return all_transactions.to_frame(), contas_info
+
+def is_bb_header_row(row):
+    """Linha de cabeçalho da tabela de transações do BB"""
+    
+    return any('Dt. movimento' in str(cell) for cell in row if cell)
+
+def bb_rows(pdf_path, page_info=None):
+    """Acumulador colunar das transações do BB (de uma página, se page_info for dado)"""
+    
+    constants = {'arquivo': Path(pdf_path).name}
+    if page_info is not None:
+        constants.update({col: page_info.get(col, '') for col in BB_PAGE_COLUMNS})
+    
+    return TransactionColumns(BB_COLUMNS, constants, numeric=['valor', 'saldo'])
+
+def iter_bb_pages(pdf_path, document=None):
+    """Lê o extrato página por página
+    
+    Gera (transações da página, cabeçalho acumulado até ela), sem guardar
+    as páginas anteriores.
+    """
+    
+    contas_info = {}
+    
+    # Colunas da tabela aprendidas na primeira página com o cabeçalho
+    tables_reader = LayoutTableReader(is_bb_header_row)
+    
+    with open_document(pdf_path, document) as pdf:
+        for page_num, page in enumerate(pdf.iter_pages(), 1):
             text = page.extract_text()
             lines = text.split('\n')
             
@@ -45,8 +86,10 @@ def extract_bb_statement(pdf_path):
             if 'conta' in page_info:
                 contas_info[page_info['conta']] = page_info
             
+            page_transactions = bb_rows(pdf_path, page_info)
+            
             # Processa tabelas
-            tables = page.extract_tables()
+            tables = tables_reader.extract_tables(page)
             for table in tables:
                 if not table or len(table) < 2:
                     continue
@@ -54,7 +97,7 @@ def extract_bb_statement(pdf_path):
                 # Verifica se é tabela de transações
                 header_row = None
                 for i, row in enumerate(table):
-                    if any('Dt. movimento' in str(cell) for cell in row if cell):
+                    if is_bb_header_row(row):
                         header_row = i
                         break
                 
@@ -149,28 +192,15 @@ def extract_bb_statement(pdf_path):
                                 except:
                                     pass
                         
-                        # Adiciona transação com info da página atual
-                        transaction = {
-                            'arquivo': Path(pdf_path).name,
-                            'data_movimento': date_mov.strftime('%d/%m/%Y'),
-                            'historico': historico,
-                            'documento': documento,
-                            'valor': valor,
-                            'saldo': saldo,
-                            'tipo': tipo,
-                            'conta': page_info.get('conta', ''),
-                            'nome_conta': page_info.get('nome_conta', ''),
-                            'agencia': page_info.get('agencia', ''),
-                            'periodo': page_info.get('periodo', ''),
-                            'banco': page_info.get('banco', '')
-                        }
-                        
-                        all_transactions.append(transaction)
+                        # Adiciona transação (info da página atual fica nas constantes)
+                        page_transactions.append(
+                            date_mov.strftime('%d/%m/%Y'), historico, documento, valor, saldo, tipo
+                        )
                         
                     except Exception as e:
                         continue
-    
-    return pd.DataFrame(all_transactions), contas_info
+            
+            yield page_transactions, contas_info
 
 def process_all_pdfs(input_folder):
     """Processa todos os PDFs da pasta"""
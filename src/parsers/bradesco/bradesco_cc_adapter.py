@@ -1,17 +1,13 @@
 #!/usr/bin/env python3
 """Adapter para extractor conta corrente Bradesco"""
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
 import pandas as pd
-from pathlib import Path
 from parsers.base_extractor import BaseExtractor
 
-# Importa função do extractor existente
-with open('src/parsers/bradesco/bradesco_conta_corrente.py', 'r', encoding='utf-8') as f:
-    exec(f.read())
+# Funções do extractor existente
+from parsers.bradesco.bradesco_conta_corrente import (
+    bradesco_cc_frame, extract_bradesco_conta_corrente, iter_bradesco_conta_corrente_pages
+)
 
 class BradescoCCAdapter(BaseExtractor):
     """Adapter para integrar extractor conta corrente Bradesco"""
@@ -20,7 +16,19 @@ class BradescoCCAdapter(BaseExtractor):
         """Extrai dados usando extractor específico do Bradesco"""
         
         # Usa função existente
-        df, header_info = extract_bradesco_conta_corrente(self.pdf_path)
+        df, header_info = extract_bradesco_conta_corrente(self.pdf_path, self.document)
+        
+        return self.prepare_batch(df, header_info), header_info
+    
+    def iter_transaction_batches(self):
+        """Um lote padronizado por página do extrato"""
+        
+        for page_transactions, self.header_info in iter_bradesco_conta_corrente_pages(self.pdf_path, self.document):
+            if page_transactions:
+                yield self.prepare_batch(bradesco_cc_frame(page_transactions), self.header_info)
+    
+    def prepare_batch(self, df: pd.DataFrame, header_info: dict) -> pd.DataFrame:
+        """Padroniza as transações extraídas (extrato inteiro ou uma página)"""
         
         # Padroniza formato
         if not df.empty:
@@ -33,4 +41,4 @@ class BradescoCCAdapter(BaseExtractor):
             # Padroniza saída
             df = self.standardize_output(df, header_info)
         
-        return df, header_info
\ No newline at end of file
+        return df
\ No newline at end of file
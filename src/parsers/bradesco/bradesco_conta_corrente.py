@@ -1,20 +1,191 @@
 #!/usr/bin/env python3
 """Extrator para conta corrente do Bradesco"""
 
-import pdfplumber
 import pandas as pd
 import re
-from datetime import datetime
 from pathlib import Path
+from utils.br_format import normalize_transactions, parse_br_dates
+from utils.pdf_document import open_document
+from utils.row_builder import TransactionColumns
 
-def extract_bradesco_conta_corrente(pdf_path):
+# Colunas das transações, na ordem de saída
+BRADESCO_CC_COLUMNS = [
+    'arquivo', 'data_movimento', 'historico', 'documento', 'credito', 'debito', 'saldo', 'tipo',
+    'cliente', 'cnpj', 'agencia', 'conta', 'periodo_inicio', 'periodo_fim', 'banco'
+]
+
+# Colunas acumuladas na leitura: data, valor e saldo como no extrato,
+# convertidos em bloco por bradesco_cc_frame
+BRADESCO_CC_ROW_COLUMNS = [
+    'arquivo', 'data_movimento', 'historico', 'documento', 'valor', 'saldo', 'tipo',
+    'cliente', 'cnpj', 'agencia', 'conta', 'periodo_inicio', 'periodo_fim', 'banco'
+]
+
+# Campos do cabeçalho repetidos em todas as transações da página
+BRADESCO_CC_HEADER_COLUMNS = ['cliente', 'cnpj', 'agencia', 'conta', 'periodo_inicio', 'periodo_fim']
+
+# Classificação de cada linha: data no início (group 2), com ou sem espaços
+# antes (group 1). Só a data sem espaços antes encerra a transação aberta;
+# com espaços, ela só abre uma transação quando não há nenhuma aberta.
+DATE_LINE_RE = re.compile(r'^(\s*)(\d{2}/\d{2}/\d{4})')
+# split() devolve textos e números intercalados: [texto, número, texto, ...]
+NUMBER_SPLIT_RE = re.compile(r'([\d.,]+)')
+SPACES_RE = re.compile(r'\s+')
+# Números que o float() aceita depois de tirar os pontos de milhar
+AMOUNT_RE = re.compile(r'\d+,?\d*|,\d+')
+
+def extract_bradesco_conta_corrente(pdf_path, document=None):
     """Extrai dados de conta corrente do Bradesco"""
     
-    all_transactions = []
+    all_transactions = bradesco_cc_rows(pdf_path)
     header_info = {}
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
+    for page_transactions, header_info in iter_bradesco_conta_corrente_pages(pdf_path, document):
+        all_transactions.extend(page_transactions)
+    
+    return bradesco_cc_frame(all_transactions), header_info
+
+def bradesco_cc_rows(pdf_path, header_info=None):
+    """Acumulador colunar das transações (arquivo, cabeçalho e banco constantes)"""
+    
+    header_info = header_info or {}
+    constants = {name: header_info.get(name, '') for name in BRADESCO_CC_HEADER_COLUMNS}
+    constants.update({'arquivo': Path(pdf_path).name, 'banco': 'BRADESCO'})
+    
+    return TransactionColumns(BRADESCO_CC_ROW_COLUMNS, constants)
+
+def bradesco_cc_frame(transactions):
+    """DataFrame das transações com datas e valores convertidos em bloco
+    
+    O valor vai para crédito ou débito conforme o tipo.
+    """
+    
+    df = normalize_transactions(transactions.to_frame())
+    if df.empty:
+        return df
+    
+    credit = df['tipo'] == 'credit'
+    df['credito'] = df['valor'].where(credit, 0.0)
+    df['debito'] = df['valor'].where(~credit, 0.0)
+    
+    return df[BRADESCO_CC_COLUMNS]
+
+def iter_bradesco_cc_lines(lines):
+    """Agrupa as linhas de uma página em transações, numa única passada
+    
+    Cada transação é a linha com data mais as seguintes até a próxima data.
+    Os números e o histórico são acumulados linha a linha enquanto a
+    transação está aberta. Gera (data, histórico, documento, valor, saldo,
+    tipo), com data, valor e saldo no texto do extrato.
+    """
+    
+    matches = [DATE_LINE_RE.match(line) for line in lines]
+    valid_dates = _valid_dates(matches)
+    
+    opened = None  # índice da linha com data da transação aberta
+    # Data e linhas acumuladas da transação aberta
+    date, parts, texts, numbers = None, [], [], []
+    i = 0
+    while i < len(lines) or opened is not None:
+        match = matches[i] if i < len(lines) else None
+        
+        if opened is not None:
+            # Continuação: linha sem data no início (espaços antes contam)
+            if i < len(lines) and (match is None or match.group(1)):
+                part = lines[i].strip()
+                if part:
+                    _add_bradesco_cc_part(part, parts, texts, numbers)
+                i += 1
+                continue
+            
+            # Próxima data ou fim da página: fecha a transação
+            try:
+                row = _close_bradesco_cc_transaction(date, parts, texts, numbers)
+            except Exception:
+                # Valor inválido: descarta a transação e relê as linhas dela
+                i = opened + 1
+                opened = None
+                continue
+            
+            opened = None
+            if row:
+                yield row
+            if i >= len(lines):
+                break
+        
+        if match is not None:
+            line = lines[i].strip()
+            date = match.group(2)
+            
+            # Pula saldo anterior (e datas inexistentes)
+            if date in valid_dates and 'SALDO ANTERIOR' not in line.upper():
+                opened = i
+                parts, texts, numbers = [], [], []
+                _add_bradesco_cc_part(line[10:].strip(), parts, texts, numbers)
+        
+        i += 1
+
+def _valid_dates(matches):
+    """Datas da página que existem no calendário, verificadas em bloco"""
+    
+    dates = pd.Series(sorted({match.group(2) for match in matches if match is not None}), dtype=object)
+    if dates.empty:
+        return set()
+    
+    return set(dates[parse_br_dates(dates).notna()])
+
+def _add_bradesco_cc_part(part, parts, texts, numbers):
+    """Acumula uma linha da transação: a linha, o texto sem números e os números"""
+    
+    pieces = NUMBER_SPLIT_RE.split(part)
+    parts.append(part)
+    texts.append(''.join(pieces[::2]))
+    numbers.extend(pieces[1::2])
+
+def _close_bradesco_cc_transaction(date, parts, texts, numbers):
+    """Monta a transação a partir das linhas, textos e números acumulados
+    
+    Retorna None se não houver ao menos valor e saldo.
+    
+    Raises:
+        ValueError: valor ou saldo que não é um número
+    """
+    
+    if len(numbers) < 2:
+        return None
+    
+    # Últimos valores: valor (crédito ou débito) e saldo, convertidos depois em bloco
+    valor, saldo = numbers[-2], numbers[-1]
+    if not (AMOUNT_RE.fullmatch(valor.replace('.', '')) and AMOUNT_RE.fullmatch(saldo.replace('.', ''))):
+        raise ValueError(f"Valor inválido: {valor} {saldo}")
+    
+    # Débito pela presença de sinal negativo ou cheque
+    if any('-' in part for part in parts) or any('CHEQUE' in part.upper() for part in parts):
+        tipo = 'debit'
+    else:
+        tipo = 'credit'
+    
+    # Documento pode ser o primeiro número
+    documento = numbers[0] if len(numbers) >= 3 else ''
+    
+    # Histórico é o texto sem os números, sem espaços extras e sem '-'
+    historico = ' '.join(texts).strip()
+    historico = SPACES_RE.sub(' ', historico)
+    historico = historico.replace('-', '').strip()
+    
+    return (date, historico, documento, valor, saldo, tipo)
+
+def iter_bradesco_conta_corrente_pages(pdf_path, document=None):
+    """Lê o extrato página por página
+    
+    Gera (transações da página, cabeçalho acumulado até ela), sem guardar
+    as páginas anteriores.
+    """
+    
+    header_info = {}
+    
+    with open_document(pdf_path, document) as pdf:
+        for page_num, page in enumerate(pdf.iter_pages(), 1):
             text = page.extract_text()
             lines = text.split('\n')
             
@@ -49,111 +220,13 @@ def extract_bradesco_conta_corrente(pdf_path):
                     if user_match:
                         header_info['usuario'] = user_match.group(1).strip()
             
-            # Processa transações linha por linha
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                # Procura por linha com data no início
-                date_match = re.match(r'^(\d{2}/\d{2}/\d{4})', line)
-                if date_match:
-                    try:
-                        date_str = date_match.group(1)
-                        date_obj = datetime.strptime(date_str, '%d/%m/%Y')
-                        
-                        # Pula saldo anterior
-                        if 'SALDO ANTERIOR' in line.upper():
-                            i += 1
-                            continue
-                        
-                        # Extrai resto da linha após a data
-                        resto_linha = line[10:].strip()  # Remove data
-                        
-                        # Procura por valores na linha atual e próximas
-                        historico_parts = []
-                        documento = ''
-                        credito = 0.0
-                        debito = 0.0
-                        saldo = 0.0
-                        
-                        # Verifica se tem valores na mesma linha
-                        valores_linha = re.findall(r'([\d.,]+)', resto_linha)
-                        
-                        # Se não tem valores suficientes, procura nas próximas linhas
-                        linhas_transacao = [resto_linha]
-                        j = i + 1
-                        
-                        # Coleta linhas até encontrar próxima data ou valores
-                        while j < len(lines) and not re.match(r'^\d{2}/\d{2}/\d{4}', lines[j]):
-                            if lines[j].strip():
-                                linhas_transacao.append(lines[j].strip())
-                            j += 1
-                        
-                        # Junta todas as linhas da transação
-                        texto_completo = ' '.join(linhas_transacao)
-                        
-                        # Procura por padrões de valores
-                        # Formato: documento credito debito saldo ou documento valor saldo
-                        valores = re.findall(r'([\d.,]+)', texto_completo)
-                        
-                        if len(valores) >= 2:
-                            # Últimos valores são saldo
-                            saldo_str = valores[-1].replace('.', '').replace(',', '.')
-                            saldo = float(saldo_str)
-                            
-                            # Penúltimo pode ser crédito ou débito
-                            valor_str = valores[-2].replace('.', '').replace(',', '.')
-                            valor = float(valor_str)
-                            
-                            # Determina se é crédito ou débito pela presença de sinal negativo
-                            if '-' in texto_completo or 'CHEQUE' in texto_completo.upper():
-                                debito = valor
-                                tipo = 'debit'
-                            else:
-                                credito = valor
-                                tipo = 'credit'
-                            
-                            # Documento pode ser o primeiro número
-                            if len(valores) >= 3:
-                                documento = valores[0]
-                            
-                            # Histórico é o texto sem os números
-                            historico = re.sub(r'[\d.,]+', '', texto_completo).strip()
-                            historico = re.sub(r'\s+', ' ', historico)  # Remove espaços extras
-                            
-                            # Remove caracteres especiais do histórico
-                            historico = historico.replace('-', '').strip()
-                            
-                            # Cria transação
-                            transaction = {
-                                'arquivo': Path(pdf_path).name,
-                                'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                                'historico': historico,
-                                'documento': documento,
-                                'credito': credito if tipo == 'credit' else 0.0,
-                                'debito': debito if tipo == 'debit' else 0.0,
-                                'saldo': saldo,
-                                'tipo': tipo,
-                                'cliente': header_info.get('cliente', ''),
-                                'cnpj': header_info.get('cnpj', ''),
-                                'agencia': header_info.get('agencia', ''),
-                                'conta': header_info.get('conta', ''),
-                                'periodo_inicio': header_info.get('periodo_inicio', ''),
-                                'periodo_fim': header_info.get('periodo_fim', ''),
-                                'banco': 'BRADESCO'
-                            }
-                            
-                            all_transactions.append(transaction)
-                        
-                        # Pula para próxima linha após a transação
-                        i = j - 1
-                        
-                    except Exception as e:
-                        pass
-                
-                i += 1
-    
-    return pd.DataFrame(all_transactions), header_info
+            # Cabeçalho da página fica como constante das transações
+            page_transactions = bradesco_cc_rows(pdf_path, header_info)
+            
+            for row in iter_bradesco_cc_lines(lines):
+                page_transactions.append(*row)
+            
+            yield page_transactions, header_info
 
 def main():
     input_folder = "data/input"
@@ -6,10 +6,8 @@ import pandas as pd
 import re
 from datetime import datetime
 from pathlib import Path
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from models.bank_statement import BankHeader, BankTransaction, BankStatement
+from utils.table_layout import LayoutTableReader
 
 class BradescoExtractor:
     def __init__(self, pdf_path: str):
@@ -62,6 +60,12 @@ class BradescoExtractor:
         
         return header
     
+    @staticmethod
+    def is_header_row(row) -> bool:
+        """Linha de cabeçalho da tabela de transações"""
+        return any(keyword in str(cell).upper() for cell in row if cell
+                   for keyword in ['DATA', 'HISTÓRICO', 'VALOR', 'SALDO'])
+    
     def extract_transactions_from_table(self, table, page_info) -> list:
         """Extrai transações de tabela do Bradesco"""
         transactions = []
@@ -72,8 +76,7 @@ class BradescoExtractor:
         # Identifica header da tabela
         header_row = None
         for i, row in enumerate(table):
-            if any(keyword in str(cell).upper() for cell in row if cell 
-                   for keyword in ['DATA', 'HISTÓRICO', 'VALOR', 'SALDO']):
+            if self.is_header_row(row):
                 header_row = i
                 break
         
@@ -199,6 +202,9 @@ class BradescoExtractor:
         """Extrai extrato completo do Bradesco"""
         all_transactions = []
         
+        # Colunas aprendidas na primeira tabela com cabeçalho de transações
+        tables_reader = LayoutTableReader(self.is_header_row)
+        
         with pdfplumber.open(self.pdf_path) as pdf:
             for page_num, page in enumerate(pdf.pages, 1):
                 text = page.extract_text()
@@ -207,7 +213,9 @@ class BradescoExtractor:
                 page_info = self.extract_header_info(text)
                 
                 # Processa tabelas
-                tables = page.extract_tables()
+                tables = tables_reader.extract_tables(page)
+                # Texto e tabelas já extraídos: libera os objetos da página
+                page.close()
                 for table in tables:
                     transactions = self.extract_transactions_from_table(table, page_info)
                     all_transactions.extend(transactions)
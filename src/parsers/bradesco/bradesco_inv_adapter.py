@@ -1,17 +1,11 @@
 #!/usr/bin/env python3
 """Adapter para extractor investimentos Bradesco"""
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
 import pandas as pd
-from pathlib import Path
 from parsers.base_extractor import BaseExtractor
 
-# Importa função do extractor existente
-with open('src/parsers/bradesco/bradesco_investimentos_extractor.py', 'r', encoding='utf-8') as f:
-    exec(f.read())
+# Funções do extractor existente
+from parsers.bradesco.bradesco_investimentos_extractor import extract_bradesco_investments
 
 class BradescoInvAdapter(BaseExtractor):
     """Adapter para integrar extractor investimentos Bradesco"""
@@ -20,7 +14,7 @@ class BradescoInvAdapter(BaseExtractor):
         """Extrai dados usando extractor específico do Bradesco investimentos"""
         
         # Usa função existente
-        df, header_info = extract_bradesco_investments(self.pdf_path)
+        df, header_info = extract_bradesco_investments(self.pdf_path, self.document)
         
         # Padroniza formato
         if not df.empty:
@@ -1,20 +1,20 @@
 #!/usr/bin/env python3
 """Extrator específico para extratos de investimentos do Bradesco"""
 
-import pdfplumber
 import pandas as pd
 import re
 from datetime import datetime
 from pathlib import Path
+from utils.pdf_document import open_document
 
-def extract_bradesco_investments(pdf_path):
+def extract_bradesco_investments(pdf_path, document=None):
     """Extrai dados de investimentos do Bradesco"""
     
     all_data = []
     header_info = {}
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
+    with open_document(pdf_path, document) as pdf:
+        for page_num, page in enumerate(pdf.iter_pages(), 1):
             text = page.extract_text()
             lines = text.split('\n')
             
@@ -1,17 +1,16 @@
 #!/usr/bin/env python3
 """Adapter para extractor da Caixa"""
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
 import pandas as pd
 from pathlib import Path
 from parsers.base_extractor import BaseExtractor
+from core.page_sharding import count_pages, parse_pages_sharded, should_shard
 
-# Importa função do extractor existente
-with open('src/parsers/caixa/caixa_govconta_extractor.py', 'r', encoding='utf-8') as f:
-    exec(f.read())
+# Funções do extractor existente
+from parsers.caixa.caixa_govconta_extractor import (
+    caixa_govconta_frame, extract_caixa_govconta, extract_caixa_govconta_sharded,
+    iter_caixa_govconta, iter_caixa_govconta_pages, parse_caixa_govconta_page
+)
 
 class CaixaAdapter(BaseExtractor):
     """Adapter para integrar extractor da Caixa com interface padrão"""
@@ -19,8 +18,33 @@ class CaixaAdapter(BaseExtractor):
     def extract_statement(self) -> tuple[pd.DataFrame, dict]:
         """Extrai dados usando extractor específico da Caixa"""
         
-        # Usa função existente
-        df, header_info = extract_caixa_govconta(self.pdf_path)
+        # Usa função existente; PDFs grandes são divididos entre processos
+        total_pages = count_pages(self.pdf_path, self.document)
+        if should_shard(self.page_workers, total_pages):
+            df, header_info = extract_caixa_govconta_sharded(self.pdf_path, self.page_workers, total_pages)
+        else:
+            df, header_info = extract_caixa_govconta(self.pdf_path, self.document)
+        
+        return self.prepare_batch(df, header_info), header_info
+    
+    def iter_transaction_batches(self):
+        """Um lote padronizado por página do extrato"""
+        
+        total_pages = count_pages(self.pdf_path, self.document)
+        if should_shard(self.page_workers, total_pages):
+            page_results = parse_pages_sharded(parse_caixa_govconta_page, self.pdf_path,
+                                               self.page_workers, total_pages)
+            pages = iter_caixa_govconta(page_results)
+        else:
+            pages = iter_caixa_govconta_pages(self.pdf_path, self.document)
+        
+        for page_transactions, self.header_info in pages:
+            batch = caixa_govconta_frame(page_transactions)
+            if not batch.empty:
+                yield self.prepare_batch(batch, self.header_info)
+    
+    def prepare_batch(self, df: pd.DataFrame, header_info: dict) -> pd.DataFrame:
+        """Padroniza as transações extraídas (extrato inteiro ou uma página)"""
         
         # Padroniza formato
         if not df.empty:
@@ -29,4 +53,4 @@ class CaixaAdapter(BaseExtractor):
             # Padroniza saída
             df = self.standardize_output(df, header_info)
         
-        return df, header_info
\ No newline at end of file
+        return df
\ No newline at end of file
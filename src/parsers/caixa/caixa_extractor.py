@@ -1,188 +1,275 @@
 #!/usr/bin/env python3
 """Extrator específico para extratos da Caixa Econômica Federal"""
 
-import pdfplumber
-import pandas as pd
 import re
 from datetime import datetime
 from pathlib import Path
+from functools import partial
+from utils.pdf_document import open_document
+from utils.row_builder import TransactionColumns
+from utils.table_layout import LayoutTableReader
+from core.page_sharding import parse_pages_sharded
 
-def extract_caixa_statement(pdf_path):
+# Colunas das transações da Caixa, na ordem de saída
+CAIXA_COLUMNS = [
+    'arquivo', 'data_movimento', 'historico', 'documento', 'valor', 'saldo',
+    'tipo', 'conta', 'agencia', 'operacao', 'banco'
+]
+
+# Dados do cabeçalho, preenchidos na montagem para a página inteira
+CAIXA_HEADER_COLUMNS = ['conta', 'agencia', 'operacao']
+
+def extract_caixa_statement(pdf_path, document=None):
     """Extrai dados específicos do formato Caixa"""
     
-    all_transactions = []
-    header_info = {}
+    tables_reader = LayoutTableReader(is_caixa_header_row)
+    
+    with open_document(pdf_path, document) as pdf:
+        page_results = [
+            parse_caixa_page(page, page_num, pdf_path, tables_reader)
+            for page_num, page in enumerate(pdf.iter_pages(), 1)
+        ]
+    
+    return assemble_caixa_statement(page_results)
+
+def iter_caixa_pages(pdf_path, document=None):
+    """Lê o extrato página por página, sem guardar as páginas anteriores"""
+    
+    tables_reader = LayoutTableReader(is_caixa_header_row)
+    
+    with open_document(pdf_path, document) as pdf:
+        yield from iter_caixa_statement(
+            parse_caixa_page(page, page_num, pdf_path, tables_reader)
+            for page_num, page in enumerate(pdf.iter_pages(), 1)
+        )
+
+def extract_caixa_statement_sharded(pdf_path, workers, total_pages=None):
+    """Extrai dados da Caixa dividindo as páginas entre processos"""
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
-            text = page.extract_text()
-            lines = text.split('\n')
+    # Cada faixa de páginas recebe uma cópia do leitor e aprende as colunas nela
+    parse_page = partial(parse_caixa_page, tables_reader=LayoutTableReader(is_caixa_header_row))
+    page_results = parse_pages_sharded(parse_page, pdf_path, workers, total_pages)
+    return assemble_caixa_statement(page_results)
+
+def is_caixa_header_row(row):
+    """Linha de cabeçalho da tabela de transações da Caixa"""
+    
+    return any(keyword in str(cell).upper() for cell in row if cell
+               for keyword in ['DATA', 'HISTÓRICO', 'VALOR', 'SALDO'])
+
+def parse_caixa_page(page, page_num, pdf_path, tables_reader=None):
+    """Processa uma página isolada (sem depender das anteriores)
+    
+    tables_reader (LayoutTableReader) reaproveita as colunas aprendidas nas
+    páginas anteriores; sem ele, as tabelas são detectadas a cada página.
+    """
+    
+    text = page.extract_text()
+    lines = text.split('\n')
+    
+    page_header = {}
+    transactions = caixa_rows(pdf_path)
+    
+    # Extrai info do cabeçalho
+    for line in lines[:20]:
+        if any(x in line.upper() for x in ['CAIXA', 'CEF']):
+            page_header['banco'] = 'CAIXA ECONÔMICA FEDERAL'
+        elif 'Agência' in line and 'Op' in line:
+            # Formato: Agência: 1234 Op: 013 Conta: 12345-6
+            ag_match = re.search(r'Agência[:\s]*(\d+)', line)
+            op_match = re.search(r'Op[:\s]*(\d+)', line)
+            conta_match = re.search(r'Conta[:\s]*([\d-]+)', line)
             
-            # Extrai info do cabeçalho
-            for line in lines[:20]:
-                if any(x in line.upper() for x in ['CAIXA', 'CEF']):
-                    header_info['banco'] = 'CAIXA ECONÔMICA FEDERAL'
-                elif 'Agência' in line and 'Op' in line:
-                    # Formato: Agência: 1234 Op: 013 Conta: 12345-6
-                    ag_match = re.search(r'Agência[:\s]*(\d+)', line)
-                    op_match = re.search(r'Op[:\s]*(\d+)', line)
-                    conta_match = re.search(r'Conta[:\s]*([\d-]+)', line)
-                    
-                    if ag_match:
-                        header_info['agencia'] = ag_match.group(1)
-                    if op_match:
-                        header_info['operacao'] = op_match.group(1)
-                    if conta_match:
-                        header_info['conta'] = conta_match.group(1)
-                
-                elif 'Período:' in line or 'PERÍODO:' in line:
-                    dates = re.findall(r'\d{2}/\d{2}/\d{4}', line)
-                    if len(dates) >= 2:
-                        header_info['periodo_inicio'] = dates[0]
-                        header_info['periodo_fim'] = dates[1]
+            if ag_match:
+                page_header['agencia'] = ag_match.group(1)
+            if op_match:
+                page_header['operacao'] = op_match.group(1)
+            if conta_match:
+                page_header['conta'] = conta_match.group(1)
+        
+        elif 'Período:' in line or 'PERÍODO:' in line:
+            dates = re.findall(r'\d{2}/\d{2}/\d{4}', line)
+            if len(dates) >= 2:
+                page_header['periodo_inicio'] = dates[0]
+                page_header['periodo_fim'] = dates[1]
+    
+    # Processa tabelas
+    tables = tables_reader.extract_tables(page) if tables_reader else page.extract_tables()
+    for table in tables:
+        if not table or len(table) < 2:
+            continue
+        
+        # Procura header de transações
+        header_row = None
+        for i, row in enumerate(table):
+            if is_caixa_header_row(row):
+                header_row = i
+                break
+        
+        if header_row is None:
+            continue
+        
+        # Mapeia colunas
+        header = table[header_row]
+        col_map = {}
+        
+        for j, col in enumerate(header):
+            if not col:
+                continue
+            col_upper = str(col).upper()
+            
+            if 'DATA' in col_upper:
+                col_map['data'] = j
+            elif any(x in col_upper for x in ['HISTÓRICO', 'HISTORICO', 'DESCRIÇÃO']):
+                col_map['historico'] = j
+            elif 'DOCUMENTO' in col_upper or 'DOC' in col_upper:
+                col_map['documento'] = j
+            elif 'VALOR' in col_upper:
+                col_map['valor'] = j
+            elif 'SALDO' in col_upper:
+                col_map['saldo'] = j
+        
+        # Processa transações
+        for row in table[header_row + 1:]:
+            if not row or len(row) < 3:
+                continue
             
-            # Processa tabelas
-            tables = page.extract_tables()
-            for table in tables:
-                if not table or len(table) < 2:
+            try:
+                # Data
+                if 'data' not in col_map:
                     continue
                 
-                # Procura header de transações
-                header_row = None
-                for i, row in enumerate(table):
-                    if any(keyword in str(cell).upper() for cell in row if cell
-                           for keyword in ['DATA', 'HISTÓRICO', 'VALOR', 'SALDO']):
-                        header_row = i
-                        break
+                date_str = str(row[col_map['data']] or '').strip()
+                if not re.match(r'\d{2}/\d{2}/\d{4}', date_str):
+                    continue
                 
-                if header_row is None:
+                date_obj = datetime.strptime(date_str, '%d/%m/%Y')
+                
+                # Histórico
+                historico = ''
+                if 'historico' in col_map:
+                    historico = str(row[col_map['historico']] or '').strip()
+                
+                # Pula saldos
+                if any(x in historico.upper() for x in ['SALDO ANTERIOR', 'SALDO ATUAL']):
                     continue
                 
-                # Mapeia colunas
-                header = table[header_row]
-                col_map = {}
+                # Documento
+                documento = ''
+                if 'documento' in col_map:
+                    documento = str(row[col_map['documento']] or '').strip()
                 
-                for j, col in enumerate(header):
-                    if not col:
-                        continue
-                    col_upper = str(col).upper()
-                    
-                    if 'DATA' in col_upper:
-                        col_map['data'] = j
-                    elif any(x in col_upper for x in ['HISTÓRICO', 'HISTORICO', 'DESCRIÇÃO']):
-                        col_map['historico'] = j
-                    elif 'DOCUMENTO' in col_upper or 'DOC' in col_upper:
-                        col_map['documento'] = j
-                    elif 'VALOR' in col_upper:
-                        col_map['valor'] = j
-                    elif 'SALDO' in col_upper:
-                        col_map['saldo'] = j
+                # Valor
+                valor = 0.0
+                tipo = 'debit'
                 
-                # Processa transações
-                for row in table[header_row + 1:]:
-                    if not row or len(row) < 3:
-                        continue
+                if 'valor' in col_map and row[col_map['valor']]:
+                    valor_str = str(row[col_map['valor']]).strip()
                     
-                    try:
-                        # Data
-                        if 'data' not in col_map:
-                            continue
-                        
-                        date_str = str(row[col_map['data']] or '').strip()
-                        if not re.match(r'\d{2}/\d{2}/\d{4}', date_str):
-                            continue
-                        
-                        date_obj = datetime.strptime(date_str, '%d/%m/%Y')
-                        
-                        # Histórico
-                        historico = ''
-                        if 'historico' in col_map:
-                            historico = str(row[col_map['historico']] or '').strip()
-                        
-                        # Pula saldos
-                        if any(x in historico.upper() for x in ['SALDO ANTERIOR', 'SALDO ATUAL']):
-                            continue
-                        
-                        # Documento
-                        documento = ''
-                        if 'documento' in col_map:
-                            documento = str(row[col_map['documento']] or '').strip()
-                        
-                        # Valor
-                        valor = 0.0
+                    # Remove caracteres especiais
+                    valor_clean = re.sub(r'[^\d.,-]', '', valor_str)
+                    
+                    # Detecta tipo
+                    if '-' in valor_str or 'D' in valor_str.upper():
                         tipo = 'debit'
+                    else:
+                        tipo = 'credit'
+                    
+                    # Converte valor
+                    try:
+                        if ',' in valor_clean and '.' in valor_clean:
+                            valor_clean = valor_clean.replace('.', '').replace(',', '.')
+                        elif ',' in valor_clean:
+                            valor_clean = valor_clean.replace(',', '.')
                         
-                        if 'valor' in col_map and row[col_map['valor']]:
-                            valor_str = str(row[col_map['valor']]).strip()
-                            
-                            # Remove caracteres especiais
-                            valor_clean = re.sub(r'[^\d.,-]', '', valor_str)
-                            
-                            # Detecta tipo
-                            if '-' in valor_str or 'D' in valor_str.upper():
-                                tipo = 'debit'
-                            else:
-                                tipo = 'credit'
-                            
-                            # Converte valor
-                            try:
-                                if ',' in valor_clean and '.' in valor_clean:
-                                    valor_clean = valor_clean.replace('.', '').replace(',', '.')
-                                elif ',' in valor_clean:
-                                    valor_clean = valor_clean.replace(',', '.')
-                                
-                                valor = float(valor_clean.replace('-', ''))
-                                if tipo == 'debit':
-                                    valor = -valor
-                            except:
-                                continue
-                        
-                        # Saldo
-                        saldo = None
-                        if 'saldo' in col_map and row[col_map['saldo']]:
-                            saldo_str = str(row[col_map['saldo']]).strip()
-                            try:
-                                saldo_clean = re.sub(r'[^\d.,-]', '', saldo_str)
-                                if ',' in saldo_clean and '.' in saldo_clean:
-                                    saldo_clean = saldo_clean.replace('.', '').replace(',', '.')
-                                elif ',' in saldo_clean:
-                                    saldo_clean = saldo_clean.replace(',', '.')
-                                saldo = float(saldo_clean.replace('-', ''))
-                            except:
-                                pass
-                        
-                        # Cria transação
-                        transaction = {
-                            'arquivo': Path(pdf_path).name,
-                            'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                            'historico': historico,
-                            'documento': documento,
-                            'valor': valor,
-                            'saldo': saldo,
-                            'tipo': tipo,
-                            'conta': header_info.get('conta', ''),
-                            'agencia': header_info.get('agencia', ''),
-                            'operacao': header_info.get('operacao', ''),
-                            'banco': 'CAIXA ECONÔMICA FEDERAL'
-                        }
-                        
-                        all_transactions.append(transaction)
-                        
-                    except Exception as e:
+                        valor = float(valor_clean.replace('-', ''))
+                        if tipo == 'debit':
+                            valor = -valor
+                    except:
                         continue
-            
-            # Fallback: processa linha por linha se não encontrou tabelas
-            if not all_transactions:
-                for line in lines:
-                    if re.match(r'^\d{2}/\d{2}/\d{4}', line):
-                        transaction = parse_caixa_line(line, header_info, pdf_path)
-                        if transaction:
-                            all_transactions.append(transaction)
+                
+                # Saldo
+                saldo = None
+                if 'saldo' in col_map and row[col_map['saldo']]:
+                    saldo_str = str(row[col_map['saldo']]).strip()
+                    try:
+                        saldo_clean = re.sub(r'[^\d.,-]', '', saldo_str)
+                        if ',' in saldo_clean and '.' in saldo_clean:
+                            saldo_clean = saldo_clean.replace('.', '').replace(',', '.')
+                        elif ',' in saldo_clean:
+                            saldo_clean = saldo_clean.replace(',', '.')
+                        saldo = float(saldo_clean.replace('-', ''))
+                    except:
+                        pass
+                
+                # Registra transação (dados do cabeçalho entram na montagem)
+                transactions.append(date_obj.strftime('%d/%m/%Y'), historico, documento, valor, saldo, tipo)
+                
+            except Exception as e:
+                continue
     
-    return pd.DataFrame(all_transactions), header_info
+    # Candidatas do fallback linha por linha; a montagem decide se entram
+    line_transactions = caixa_rows(pdf_path)
+    if not transactions:
+        for line in lines:
+            if re.match(r'^\d{2}/\d{2}/\d{4}', line):
+                transaction = parse_caixa_line(line)
+                if transaction:
+                    line_transactions.append(*transaction)
+    
+    return {'header': page_header, 'transactions': transactions, 'line_transactions': line_transactions}
 
-def parse_caixa_line(line, header_info, pdf_path):
-    """Parseia linha individual da Caixa"""
+def assemble_caixa_statement(page_results):
+    """Monta o resultado final percorrendo as páginas em ordem"""
+    
+    all_transactions = caixa_rows()
+    header_info = {}
+    
+    for page_transactions, header_info in iter_caixa_statement(page_results):
+        all_transactions.extend(page_transactions)
+    
+    return all_transactions.to_frame(), header_info
+
+def caixa_rows(pdf_path=None):
+    """Acumulador colunar das transações (de um arquivo, se pdf_path for dado)
+    
+    Os dados do cabeçalho começam vazios e são constantes por página.
+    """
+    
+    constants = {col: '' for col in CAIXA_HEADER_COLUMNS}
+    constants['banco'] = 'CAIXA ECONÔMICA FEDERAL'
+    if pdf_path is not None:
+        constants['arquivo'] = Path(pdf_path).name
+    
+    return TransactionColumns(CAIXA_COLUMNS, constants, numeric=['valor', 'saldo'])
+
+def iter_caixa_statement(page_results):
+    """Completa as páginas em ordem: gera (transações da página, cabeçalho acumulado)"""
+    
+    header_info = {}
+    found_transactions = False
+    
+    for page_result in page_results:
+        header_info.update(page_result['header'])
+        
+        page_transactions = page_result['transactions']
+        
+        # Fallback: processa linha por linha se não encontrou tabelas
+        if not found_transactions and not page_transactions:
+            page_transactions = page_result['line_transactions']
+        
+        for col in CAIXA_HEADER_COLUMNS:
+            page_transactions.set_constant(col, header_info.get(col, ''))
+        
+        found_transactions = found_transactions or bool(page_transactions)
+        yield page_transactions, header_info
+
+def parse_caixa_line(line):
+    """Parseia linha individual da Caixa
+    
+    Devolve os valores da transação na ordem das colunas de caixa_rows
+    (data, histórico, documento, valor, saldo, tipo) ou None.
+    """
     try:
         # Padrão: DD/MM/AAAA DESCRIÇÃO VALOR SALDO
         match = re.match(r'^(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d.,-]+)\s+([\d.,-]+)$', line)
@@ -202,19 +289,7 @@ def parse_caixa_line(line, header_info, pdf_path):
             # Determina tipo
             tipo = 'credit' if valor > 0 else 'debit'
             
-            return {
-                'arquivo': Path(pdf_path).name,
-                'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                'historico': desc,
-                'documento': '',
-                'valor': valor,
-                'saldo': saldo,
-                'tipo': tipo,
-                'conta': header_info.get('conta', ''),
-                'agencia': header_info.get('agencia', ''),
-                'operacao': header_info.get('operacao', ''),
-                'banco': 'CAIXA ECONÔMICA FEDERAL'
-            }
+            return (date_obj.strftime('%d/%m/%Y'), desc, '', valor, saldo, tipo)
     except:
         pass
     
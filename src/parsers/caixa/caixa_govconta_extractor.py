@@ -1,103 +1,154 @@
 #!/usr/bin/env python3
 """Extrator específico para GovConta Caixa"""
 
-import pdfplumber
-import pandas as pd
 import re
-from datetime import datetime
 from pathlib import Path
+from utils.br_format import normalize_transactions
+from utils.pdf_document import open_document
+from utils.row_builder import TransactionColumns
+from core.page_sharding import parse_pages_sharded
 
-def extract_caixa_govconta(pdf_path):
+# Colunas das transações do GovConta, na ordem de saída
+GOVCONTA_COLUMNS = [
+    'arquivo', 'data_movimento', 'historico', 'documento', 'valor', 'saldo',
+    'tipo', 'govconta', 'conta_referencia', 'nome', 'banco'
+]
+
+# Dados do cabeçalho, preenchidos na montagem para a página inteira
+GOVCONTA_HEADER_COLUMNS = ['govconta', 'conta_referencia', 'nome']
+
+def extract_caixa_govconta(pdf_path, document=None):
     """Extrai dados do formato GovConta Caixa"""
     
-    all_transactions = []
-    header_info = {}
+    with open_document(pdf_path, document) as pdf:
+        page_results = [
+            parse_caixa_govconta_page(page, page_num, pdf_path)
+            for page_num, page in enumerate(pdf.iter_pages(), 1)
+        ]
+    
+    return assemble_caixa_govconta(page_results)
+
+def iter_caixa_govconta_pages(pdf_path, document=None):
+    """Lê o extrato página por página, sem guardar as páginas anteriores"""
+    
+    with open_document(pdf_path, document) as pdf:
+        yield from iter_caixa_govconta(
+            parse_caixa_govconta_page(page, page_num, pdf_path)
+            for page_num, page in enumerate(pdf.iter_pages(), 1)
+        )
+
+def extract_caixa_govconta_sharded(pdf_path, workers, total_pages=None):
+    """Extrai dados do GovConta Caixa dividindo as páginas entre processos"""
+    
+    page_results = parse_pages_sharded(parse_caixa_govconta_page, pdf_path, workers, total_pages)
+    return assemble_caixa_govconta(page_results)
+
+def parse_caixa_govconta_page(page, page_num, pdf_path):
+    """Processa uma página isolada (sem depender das anteriores)"""
+    
+    text = page.extract_text()
+    lines = text.split('\n')
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
-            text = page.extract_text()
-            lines = text.split('\n')
+    page_header = {}
+    transactions = caixa_govconta_rows(pdf_path)
+    
+    # Extrai cabeçalho (só primeira página)
+    if page_num == 1:
+        for line in lines[:10]:
+            if 'GovConta CAIXA:' in line:
+                match = re.search(r'GovConta CAIXA:\s*(\d+)', line)
+                if match:
+                    page_header['govconta'] = match.group(1)
             
-            # Extrai cabeçalho (só primeira página)
-            if page_num == 1:
-                for line in lines[:10]:
-                    if 'GovConta CAIXA:' in line:
-                        match = re.search(r'GovConta CAIXA:\s*(\d+)', line)
-                        if match:
-                            header_info['govconta'] = match.group(1)
-                    
-                    elif 'Conta Referência:' in line:
-                        match = re.search(r'Conta Referência:\s*([\d/\-]+)', line)
-                        if match:
-                            header_info['conta_referencia'] = match.group(1)
-                    
-                    elif 'Nome:' in line:
-                        match = re.search(r'Nome:\s*(.+)', line)
-                        if match:
-                            header_info['nome'] = match.group(1).strip()
-                    
-                    elif 'Período:' in line:
-                        dates = re.findall(r'\d{2}/\d{2}/\d{4}', line)
-                        if len(dates) >= 2:
-                            header_info['periodo_inicio'] = dates[0]
-                            header_info['periodo_fim'] = dates[1]
+            elif 'Conta Referência:' in line:
+                match = re.search(r'Conta Referência:\s*([\d/\-]+)', line)
+                if match:
+                    page_header['conta_referencia'] = match.group(1)
             
-            # Processa transações linha por linha
-            for line in lines:
-                # Padrão: DD/MM/AAAA NNNNNN DESCRIÇÃO VALOR SALDO
-                match = re.match(r'^(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+([\d.,]+[CD])\s+([\d.,]+[CD])$', line)
-                
+            elif 'Nome:' in line:
+                match = re.search(r'Nome:\s*(.+)', line)
                 if match:
-                    try:
-                        date_str = match.group(1)
-                        documento = match.group(2)
-                        historico = match.group(3).strip()
-                        valor_str = match.group(4)
-                        saldo_str = match.group(5)
-                        
-                        # Pula saldo atualizado
-                        if 'Saldo Atualizado' in historico:
-                            continue
-                        
-                        # Converte data
-                        date_obj = datetime.strptime(date_str, '%d/%m/%Y')
-                        
-                        # Processa valor
-                        valor_num = re.sub(r'[^\d.,]', '', valor_str)
-                        valor = float(valor_num.replace('.', '').replace(',', '.'))
-                        
-                        # Determina tipo (D=débito, C=crédito)
-                        if valor_str.endswith('D'):
-                            tipo = 'debit'
-                            valor = -valor
-                        else:
-                            tipo = 'credit'
-                        
-                        # Processa saldo
-                        saldo_num = re.sub(r'[^\d.,]', '', saldo_str)
-                        saldo = float(saldo_num.replace('.', '').replace(',', '.'))
-                        
-                        # Cria transação
-                        transaction = {
-                            'arquivo': Path(pdf_path).name,
-                            'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                            'historico': historico,
-                            'documento': documento,
-                            'valor': valor,
-                            'saldo': saldo,
-                            'tipo': tipo,
-                            'govconta': header_info.get('govconta', ''),
-                            'conta_referencia': header_info.get('conta_referencia', ''),
-                            'nome': header_info.get('nome', ''),
-                            'banco': 'CAIXA ECONÔMICA FEDERAL'
-                        }
-                        
-                        all_transactions.append(transaction)
-                        
-                    except Exception as e:
-                        continue
-    
-    return pd.DataFrame(all_transactions), header_info
+                    page_header['nome'] = match.group(1).strip()
+            
+            elif 'Período:' in line:
+                dates = re.findall(r'\d{2}/\d{2}/\d{4}', line)
+                if len(dates) >= 2:
+                    page_header['periodo_inicio'] = dates[0]
+                    page_header['periodo_fim'] = dates[1]
+    
+    # Processa transações linha por linha
+    for line in lines:
+        # Padrão: DD/MM/AAAA NNNNNN DESCRIÇÃO VALOR SALDO
+        match = re.match(r'^(\d{2}/\d{2}/\d{4})\s+(\d+)\s+(.+?)\s+([\d.,]+[CD])\s+([\d.,]+[CD])$', line)
+        
+        if match:
+            try:
+                date_str = match.group(1)
+                documento = match.group(2)
+                historico = match.group(3).strip()
+                valor_str = match.group(4)
+                saldo_str = match.group(5)
+                
+                # Pula saldo atualizado
+                if 'Saldo Atualizado' in historico:
+                    continue
+                
+                # Determina tipo (D=débito, C=crédito)
+                tipo = 'debit' if valor_str.endswith('D') else 'credit'
+                
+                # Registra transação (dados do cabeçalho entram na montagem;
+                # data, valor e saldo são convertidos em caixa_govconta_frame)
+                transactions.append(date_str, historico, documento, valor_str, saldo_str, tipo)
+                
+            except Exception as e:
+                continue
+    
+    return {'header': page_header, 'transactions': transactions}
+
+def assemble_caixa_govconta(page_results):
+    """Monta o resultado final percorrendo as páginas em ordem"""
+    
+    all_transactions = caixa_govconta_rows()
+    header_info = {}
+    
+    for page_transactions, header_info in iter_caixa_govconta(page_results):
+        all_transactions.extend(page_transactions)
+    
+    return caixa_govconta_frame(all_transactions), header_info
+
+def caixa_govconta_rows(pdf_path=None):
+    """Acumulador colunar das transações (de um arquivo, se pdf_path for dado)
+    
+    Os dados do cabeçalho começam vazios e são constantes por página.
+    """
+    
+    constants = {col: '' for col in GOVCONTA_HEADER_COLUMNS}
+    constants['banco'] = 'CAIXA ECONÔMICA FEDERAL'
+    if pdf_path is not None:
+        constants['arquivo'] = Path(pdf_path).name
+    
+    return TransactionColumns(GOVCONTA_COLUMNS, constants)
+
+def caixa_govconta_frame(transactions):
+    """DataFrame das transações com datas e valores convertidos em bloco"""
+    
+    # Valor com D é negativo; o saldo fica sempre positivo. Linhas com data,
+    # valor ou saldo inválidos são descartadas
+    return normalize_transactions(transactions.to_frame(), unsigned=['saldo'],
+                                  required=['data_movimento', 'valor', 'saldo'])
+
+def iter_caixa_govconta(page_results):
+    """Completa as páginas em ordem: gera (transações da página, cabeçalho acumulado)"""
+    
+    header_info = {}
+    
+    for page_result in page_results:
+        header_info.update(page_result['header'])
+        
+        for col in GOVCONTA_HEADER_COLUMNS:
+            page_result['transactions'].set_constant(col, header_info.get(col, ''))
+        
+        yield page_result['transactions'], header_info
 
 def main():
     input_folder = "data/input"
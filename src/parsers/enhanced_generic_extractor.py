@@ -1,423 +1,383 @@
 #!/usr/bin/env python3
 """Extrator genérico aprimorado para bancos específicos"""
 
-import pdfplumber
 import pandas as pd
 import re
 from datetime import datetime
 from pathlib import Path
 from parsers.base_extractor import BaseExtractor
+from utils.layout_profiles import LayoutProfile
+from utils.pdf_document import PDFDocument, open_document
+from utils.row_builder import TransactionColumns
+from utils.stage_timer import timed
+
+# Colunas das estratégias específicas de banco, na ordem de saída
+BANK_COLUMNS = ['arquivo', 'data_movimento', 'historico', 'documento', 'valor', 'saldo', 'tipo', 'banco']
+
+# Colunas das estratégias genéricas (tabela e linha)
+GENERIC_COLUMNS = ['arquivo', 'data_movimento', 'historico', 'valor', 'tipo', 'banco']
 
 class EnhancedGenericExtractor(BaseExtractor):
     """Extrator genérico com estratégias específicas para Safra, Daycoval, BV, Citi"""
     
-    def __init__(self, pdf_path: str, bank_name: str = "GENÉRICO"):
-        super().__init__(pdf_path)
+    def __init__(self, pdf_path: str, bank_name: str = "GENÉRICO", document: PDFDocument = None,
+                 page_workers: int = 1, layout_profile: LayoutProfile = None):
+        super().__init__(pdf_path, document, page_workers)
         self.bank_name = bank_name
+        # Regiões fixas do layout do banco (None = página inteira)
+        self.layout_profile = layout_profile
         
     def extract_statement(self) -> tuple[pd.DataFrame, dict]:
         """Extração inteligente baseada no banco"""
         
+        # Estratégias por página, na ordem de preferência, cada uma com o
+        # acumulador das suas transações (campos fixos ficam como constantes)
+        no_saldo = {'documento': '', 'saldo': None}
         strategies = [
-            self._extract_safra_format,
-            self._extract_daycoval_format,
-            self._extract_bv_format,
-            self._extract_citi_format,
-            self._extract_table_based,
-            self._extract_line_based
+            (self._parse_safra_page, self._new_rows('BANCO SAFRA', no_saldo)),
+            (self._parse_daycoval_page, self._new_rows('BANCO DAYCOVAL', no_saldo)),
+            (self._parse_bv_page, self._new_rows('BANCO BV', no_saldo)),
+            (self._parse_citi_page, self._new_rows('CITIBANK', {'documento': ''})),
+            (self._parse_table_page, self._new_rows(self.bank_name, columns=GENERIC_COLUMNS)),
+            (self._parse_line_page, self._new_rows(self.bank_name, columns=GENERIC_COLUMNS))
         ]
         
-        best_result = pd.DataFrame()
+        results = [(rows, {}) for _, rows in strategies]
+        failed = set()
+        stages = [f"estrategia.{strategy.__name__.lstrip('_')}" for strategy, _ in strategies]
+        
+        # Uma única passada: texto e tabelas de cada página são extraídos
+        # uma vez e consumidos por todas as estratégias
+        try:
+            with open_document(self.pdf_path, self.document) as pdf:
+                for page in pdf.iter_pages():
+                    # Só cabeçalho e corpo: rodapés e títulos repetidos ficam de fora
+                    text = self.layout_profile.extract_text(page) if self.layout_profile is not None else None
+                    if text is not None:
+                        with timed('pdf.tabelas'):
+                            tables = self.layout_profile.body_of(page).extract_tables()
+                    else:
+                        text = page.extract_text()
+                        tables = page.extract_tables()
+                    lines = text.split('\n') if text else None
+                    
+                    for idx, (strategy, _) in enumerate(strategies):
+                        if idx in failed:
+                            continue
+                        
+                        transactions, info = results[idx]
+                        try:
+                            with timed(stages[idx]):
+                                strategy(lines, tables, transactions, info)
+                        except Exception:
+                            # Estratégia com erro é descartada por inteiro
+                            failed.add(idx)
+        except Exception:
+            # Falha na leitura do PDF invalida todas as estratégias
+            failed.update(range(len(strategies)))
+        
+        best_rows = None
         header_info = {'banco': self.bank_name}
         
-        for strategy in strategies:
-            try:
-                df, info = strategy()
-                if len(df) > len(best_result):
-                    best_result = df
-                    header_info.update(info)
-            except Exception as e:
+        for idx, (transactions, info) in enumerate(results):
+            if idx in failed:
                 continue
+            if len(transactions) > (len(best_rows) if best_rows is not None else 0):
+                best_rows = transactions
+                header_info.update(info)
+        
+        best_result = best_rows.to_frame() if best_rows is not None else pd.DataFrame()
         
         if not best_result.empty:
             best_result = self.standardize_output(best_result, header_info)
         
         return best_result, header_info
     
-    def _extract_safra_format(self) -> tuple[pd.DataFrame, dict]:
+    def _new_rows(self, banco: str, constants: dict = None, columns: list = BANK_COLUMNS) -> TransactionColumns:
+        """Acumulador colunar de uma estratégia (arquivo e banco constantes)"""
+        
+        fixed = {'arquivo': Path(self.pdf_path).name, 'banco': banco}
+        fixed.update(constants or {})
+        return TransactionColumns(columns, fixed, numeric=['valor', 'saldo'])
+    
+    def _parse_safra_page(self, lines, tables, transactions, header_info):
         """Estratégia específica para Safra"""
-        transactions = []
-        header_info = {}
+        if lines is None:
+            return
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text:
-                    continue
-                
-                lines = text.split('\n')
-                
-                # Extrai cabeçalho Safra
-                for line in lines[:10]:
-                    if 'SAFRA' in line.upper():
-                        header_info['banco'] = 'BANCO SAFRA'
-                    elif 'CONTA' in line.upper() and re.search(r'\d+', line):
-                        header_info['conta'] = re.search(r'(\d+[-.]?\d*)', line).group(1)
-                
-                # Processa transações formato Safra: DD/MM DESCRIÇÃO VALOR
-                for line in lines:
-                    # Pula linhas de saldo
-                    if any(x in line.upper() for x in ['SALDO INICIAL', 'SALDO DISP', 'SALDO ANTERIOR', 'SALDO CONTA']):
+        # Extrai cabeçalho Safra
+        for line in lines[:10]:
+            if 'SAFRA' in line.upper():
+                header_info['banco'] = 'BANCO SAFRA'
+            elif 'CONTA' in line.upper() and re.search(r'\d+', line):
+                header_info['conta'] = re.search(r'(\d+[-.]?\d*)', line).group(1)
+        
+        # Processa transações formato Safra: DD/MM DESCRIÇÃO VALOR
+        for line in lines:
+            # Pula linhas de saldo
+            if any(x in line.upper() for x in ['SALDO INICIAL', 'SALDO DISP', 'SALDO ANTERIOR', 'SALDO CONTA']):
+                continue
+            
+            # Padrão Safra: DD/MM + descrição + valor
+            match = re.match(r'^(\d{2}/\d{2})\s+(.+?)\s+(\d+,\d{2})$', line.strip())
+            
+            if match:
+                try:
+                    date_str = f"{match.group(1)}/{datetime.now().year}"
+                    desc = match.group(2).strip()
+                    value_str = match.group(3)
+                    
+                    # Pula se descrição contém palavras de saldo
+                    if any(x in desc.upper() for x in ['SALDO', 'DISPONIVEL']):
                         continue
                     
-                    # Padrão Safra: DD/MM + descrição + valor
-                    match = re.match(r'^(\d{2}/\d{2})\s+(.+?)\s+(\d+,\d{2})$', line.strip())
+                    date_obj = datetime.strptime(date_str, '%d/%m/%Y')
+                    value = float(value_str.replace(',', '.'))
                     
-                    if match:
-                        try:
-                            date_str = f"{match.group(1)}/{datetime.now().year}"
-                            desc = match.group(2).strip()
-                            value_str = match.group(3)
-                            
-                            # Pula se descrição contém palavras de saldo
-                            if any(x in desc.upper() for x in ['SALDO', 'DISPONIVEL']):
-                                continue
-                            
-                            date_obj = datetime.strptime(date_str, '%d/%m/%Y')
-                            value = float(value_str.replace(',', '.'))
-                            
-                            transaction = {
-                                'arquivo': Path(self.pdf_path).name,
-                                'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                                'historico': desc,
-                                'documento': '',
-                                'valor': value,
-                                'saldo': None,
-                                'tipo': 'credit' if value > 0 else 'debit',
-                                'banco': 'BANCO SAFRA'
-                            }
-                            
-                            transactions.append(transaction)
-                            
-                        except:
-                            continue
-        
-        return pd.DataFrame(transactions), header_info
+                    transactions.append(
+                        date_obj.strftime('%d/%m/%Y'), desc, value, 'credit' if value > 0 else 'debit'
+                    )
+                    
+                except:
+                    continue
     
-    def _extract_daycoval_format(self) -> tuple[pd.DataFrame, dict]:
+    def _parse_daycoval_page(self, lines, tables, transactions, header_info):
         """Estratégia específica para Daycoval"""
-        transactions = []
-        header_info = {}
+        if lines is None:
+            return
+        
+        # Extrai cabeçalho Daycoval
+        for line in lines[:15]:
+            if 'DAYCOVAL' in line.upper():
+                header_info['banco'] = 'BANCO DAYCOVAL'
+            elif 'AGÊNCIA' in line.upper() or 'AG.' in line.upper():
+                match = re.search(r'(\d+)', line)
+                if match:
+                    header_info['agencia'] = match.group(1)
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text:
+        # Processa tabelas
+        for table in tables:
+            if not table or len(table) < 2:
+                continue
+            
+            # Procura header
+            header_row = None
+            for i, row in enumerate(table):
+                if any('DATA' in str(cell).upper() for cell in row if cell):
+                    header_row = i
+                    break
+            
+            if header_row is None:
+                continue
+            
+            # Processa linhas
+            for row in table[header_row + 1:]:
+                if not row or len(row) < 3:
                     continue
                 
-                lines = text.split('\n')
-                
-                # Extrai cabeçalho Daycoval
-                for line in lines[:15]:
-                    if 'DAYCOVAL' in line.upper():
-                        header_info['banco'] = 'BANCO DAYCOVAL'
-                    elif 'AGÊNCIA' in line.upper() or 'AG.' in line.upper():
-                        match = re.search(r'(\d+)', line)
-                        if match:
-                            header_info['agencia'] = match.group(1)
-                
-                # Processa tabelas
-                tables = page.extract_tables()
-                for table in tables:
-                    if not table or len(table) < 2:
+                try:
+                    # Data na primeira coluna
+                    date_str = str(row[0] or '').strip()
+                    if not re.match(r'\d{2}/\d{2}/\d{4}', date_str):
                         continue
                     
-                    # Procura header
-                    header_row = None
-                    for i, row in enumerate(table):
-                        if any('DATA' in str(cell).upper() for cell in row if cell):
-                            header_row = i
-                            break
+                    # Descrição e valor nas outras colunas
+                    desc_parts = []
+                    value = 0.0
                     
-                    if header_row is None:
-                        continue
+                    for cell in row[1:]:
+                        if cell and str(cell).strip():
+                            cell_str = str(cell).strip()
+                            
+                            # Se parece com valor
+                            if re.match(r'[\d.,]+$', cell_str):
+                                try:
+                                    value = float(cell_str.replace('.', '').replace(',', '.'))
+                                except:
+                                    desc_parts.append(cell_str)
+                            else:
+                                desc_parts.append(cell_str)
                     
-                    # Processa linhas
-                    for row in table[header_row + 1:]:
-                        if not row or len(row) < 3:
-                            continue
+                    if value != 0.0:
+                        date_obj = datetime.strptime(date_str, '%d/%m/%Y')
+                        desc = ' '.join(desc_parts)
                         
-                        try:
-                            # Data na primeira coluna
-                            date_str = str(row[0] or '').strip()
-                            if not re.match(r'\d{2}/\d{2}/\d{4}', date_str):
-                                continue
-                            
-                            # Descrição e valor nas outras colunas
-                            desc_parts = []
-                            value = 0.0
-                            
-                            for cell in row[1:]:
-                                if cell and str(cell).strip():
-                                    cell_str = str(cell).strip()
-                                    
-                                    # Se parece com valor
-                                    if re.match(r'[\d.,]+$', cell_str):
-                                        try:
-                                            value = float(cell_str.replace('.', '').replace(',', '.'))
-                                        except:
-                                            desc_parts.append(cell_str)
-                                    else:
-                                        desc_parts.append(cell_str)
-                            
-                            if value != 0.0:
-                                date_obj = datetime.strptime(date_str, '%d/%m/%Y')
-                                desc = ' '.join(desc_parts)
-                                
-                                transaction = {
-                                    'arquivo': Path(self.pdf_path).name,
-                                    'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                                    'historico': desc,
-                                    'documento': '',
-                                    'valor': value,
-                                    'saldo': None,
-                                    'tipo': 'credit' if value > 0 else 'debit',
-                                    'banco': 'BANCO DAYCOVAL'
-                                }
-                                
-                                transactions.append(transaction)
-                                
-                        except:
-                            continue
-        
-        return pd.DataFrame(transactions), header_info
+                        transactions.append(
+                            date_obj.strftime('%d/%m/%Y'), desc, value, 'credit' if value > 0 else 'debit'
+                        )
+                        
+                except:
+                    continue
     
-    def _extract_bv_format(self) -> tuple[pd.DataFrame, dict]:
+    def _parse_bv_page(self, lines, tables, transactions, header_info):
         """Estratégia específica para BV (ex-Votorantim)"""
-        transactions = []
-        header_info = {}
+        if lines is None:
+            return
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text:
-                    continue
-                
-                lines = text.split('\n')
-                
-                # Extrai cabeçalho BV
-                for line in lines[:15]:
-                    if any(x in line.upper() for x in ['BANCO BV', 'BV S/A', 'VOTORANTIM']):
-                        header_info['banco'] = 'BANCO BV'
-                
-                # Processa linha por linha - formato BV
-                for line in lines:
-                    # Padrão BV: DD/MM/AAAA ou DD/MM + descrição + valor
-                    patterns = [
-                        r'^(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d.,]+)$',
-                        r'^(\d{2}/\d{2})\s+(.+?)\s+([\d.,]+)$'
-                    ]
-                    
-                    for pattern in patterns:
-                        match = re.match(pattern, line.strip())
-                        if match:
-                            try:
-                                date_str = match.group(1)
-                                desc = match.group(2).strip()
-                                value_str = match.group(3)
-                                
-                                # Pula saldos
-                                if any(x in desc.upper() for x in ['SALDO', 'DISPONIVEL']):
-                                    continue
-                                
-                                # Normaliza data
-                                if len(date_str) == 5:
-                                    date_str = f"{date_str}/{datetime.now().year}"
-                                
-                                date_obj = datetime.strptime(date_str, '%d/%m/%Y')
-                                
-                                # Converte valor
-                                value_clean = value_str.replace('.', '').replace(',', '.')
-                                value = float(value_clean)
-                                
-                                transaction = {
-                                    'arquivo': Path(self.pdf_path).name,
-                                    'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                                    'historico': desc,
-                                    'documento': '',
-                                    'valor': value,
-                                    'saldo': None,
-                                    'tipo': 'credit' if value > 0 else 'debit',
-                                    'banco': 'BANCO BV'
-                                }
-                                
-                                transactions.append(transaction)
-                                break
-                                
-                            except:
-                                continue
+        # Extrai cabeçalho BV
+        for line in lines[:15]:
+            if any(x in line.upper() for x in ['BANCO BV', 'BV S/A', 'VOTORANTIM']):
+                header_info['banco'] = 'BANCO BV'
         
-        return pd.DataFrame(transactions), header_info
+        # Processa linha por linha - formato BV
+        for line in lines:
+            # Padrão BV: DD/MM/AAAA ou DD/MM + descrição + valor
+            patterns = [
+                r'^(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d.,]+)$',
+                r'^(\d{2}/\d{2})\s+(.+?)\s+([\d.,]+)$'
+            ]
+            
+            for pattern in patterns:
+                match = re.match(pattern, line.strip())
+                if match:
+                    try:
+                        date_str = match.group(1)
+                        desc = match.group(2).strip()
+                        value_str = match.group(3)
+                        
+                        # Pula saldos
+                        if any(x in desc.upper() for x in ['SALDO', 'DISPONIVEL']):
+                            continue
+                        
+                        # Normaliza data
+                        if len(date_str) == 5:
+                            date_str = f"{date_str}/{datetime.now().year}"
+                        
+                        date_obj = datetime.strptime(date_str, '%d/%m/%Y')
+                        
+                        # Converte valor
+                        value_clean = value_str.replace('.', '').replace(',', '.')
+                        value = float(value_clean)
+                        
+                        transactions.append(
+                            date_obj.strftime('%d/%m/%Y'), desc, value, 'credit' if value > 0 else 'debit'
+                        )
+                        break
+                        
+                    except:
+                        continue
     
-    def _extract_citi_format(self) -> tuple[pd.DataFrame, dict]:
+    def _parse_citi_page(self, lines, tables, transactions, header_info):
         """Estratégia específica para Citibank"""
-        transactions = []
-        header_info = {}
+        if lines is None:
+            return
+        
+        # Extrai cabeçalho Citi
+        for line in lines[:15]:
+            if any(x in line.upper() for x in ['CITIBANK', 'CITI']):
+                header_info['banco'] = 'CITIBANK'
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text:
+        # Processa tabelas (Citi geralmente usa tabelas)
+        for table in tables:
+            if not table or len(table) < 2:
+                continue
+            
+            # Procura header com padrões Citi
+            header_row = None
+            for i, row in enumerate(table):
+                if any(keyword in str(cell).upper() for cell in row if cell
+                       for keyword in ['DATE', 'DESCRIPTION', 'AMOUNT', 'BALANCE']):
+                    header_row = i
+                    break
+            
+            if header_row is None:
+                continue
+            
+            # Mapeia colunas
+            header = table[header_row]
+            col_map = {}
+            
+            for j, col in enumerate(header):
+                if not col:
                     continue
+                col_upper = str(col).upper()
                 
-                lines = text.split('\n')
-                
-                # Extrai cabeçalho Citi
-                for line in lines[:15]:
-                    if any(x in line.upper() for x in ['CITIBANK', 'CITI']):
-                        header_info['banco'] = 'CITIBANK'
+                if 'DATE' in col_upper:
+                    col_map['data'] = j
+                elif any(x in col_upper for x in ['DESCRIPTION', 'TRANSACTION']):
+                    col_map['historico'] = j
+                elif 'AMOUNT' in col_upper:
+                    col_map['valor'] = j
+                elif 'BALANCE' in col_upper:
+                    col_map['saldo'] = j
+            
+            # Processa transações
+            for row in table[header_row + 1:]:
+                if not row or len(row) < 3:
+                    continue
                 
-                # Processa tabelas (Citi geralmente usa tabelas)
-                tables = page.extract_tables()
-                for table in tables:
-                    if not table or len(table) < 2:
+                try:
+                    if 'data' not in col_map or 'valor' not in col_map:
                         continue
                     
-                    # Procura header com padrões Citi
-                    header_row = None
-                    for i, row in enumerate(table):
-                        if any(keyword in str(cell).upper() for cell in row if cell
-                               for keyword in ['DATE', 'DESCRIPTION', 'AMOUNT', 'BALANCE']):
-                            header_row = i
-                            break
-                    
-                    if header_row is None:
+                    # Data
+                    date_str = str(row[col_map['data']] or '').strip()
+                    if not re.match(r'\d{2}/\d{2}/\d{4}', date_str):
                         continue
                     
-                    # Mapeia colunas
-                    header = table[header_row]
-                    col_map = {}
+                    date_obj = datetime.strptime(date_str, '%d/%m/%Y')
                     
-                    for j, col in enumerate(header):
-                        if not col:
-                            continue
-                        col_upper = str(col).upper()
-                        
-                        if 'DATE' in col_upper:
-                            col_map['data'] = j
-                        elif any(x in col_upper for x in ['DESCRIPTION', 'TRANSACTION']):
-                            col_map['historico'] = j
-                        elif 'AMOUNT' in col_upper:
-                            col_map['valor'] = j
-                        elif 'BALANCE' in col_upper:
-                            col_map['saldo'] = j
+                    # Histórico
+                    historico = ''
+                    if 'historico' in col_map:
+                        historico = str(row[col_map['historico']] or '').strip()
                     
-                    # Processa transações
-                    for row in table[header_row + 1:]:
-                        if not row or len(row) < 3:
-                            continue
-                        
+                    # Valor
+                    value_str = str(row[col_map['valor']] or '').strip()
+                    value = float(re.sub(r'[^\d.,-]', '', value_str).replace(',', '.'))
+                    
+                    # Saldo
+                    saldo = None
+                    if 'saldo' in col_map and row[col_map['saldo']]:
+                        saldo_str = str(row[col_map['saldo']]).strip()
                         try:
-                            if 'data' not in col_map or 'valor' not in col_map:
-                                continue
-                            
-                            # Data
-                            date_str = str(row[col_map['data']] or '').strip()
-                            if not re.match(r'\d{2}/\d{2}/\d{4}', date_str):
-                                continue
-                            
-                            date_obj = datetime.strptime(date_str, '%d/%m/%Y')
-                            
-                            # Histórico
-                            historico = ''
-                            if 'historico' in col_map:
-                                historico = str(row[col_map['historico']] or '').strip()
-                            
-                            # Valor
-                            value_str = str(row[col_map['valor']] or '').strip()
-                            value = float(re.sub(r'[^\d.,-]', '', value_str).replace(',', '.'))
-                            
-                            # Saldo
-                            saldo = None
-                            if 'saldo' in col_map and row[col_map['saldo']]:
-                                saldo_str = str(row[col_map['saldo']]).strip()
-                                try:
-                                    saldo = float(re.sub(r'[^\d.,-]', '', saldo_str).replace(',', '.'))
-                                except:
-                                    pass
-                            
-                            transaction = {
-                                'arquivo': Path(self.pdf_path).name,
-                                'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                                'historico': historico,
-                                'documento': '',
-                                'valor': value,
-                                'saldo': saldo,
-                                'tipo': 'credit' if value > 0 else 'debit',
-                                'banco': 'CITIBANK'
-                            }
-                            
-                            transactions.append(transaction)
-                            
+                            saldo = float(re.sub(r'[^\d.,-]', '', saldo_str).replace(',', '.'))
                         except:
-                            continue
-        
-        return pd.DataFrame(transactions), header_info
-    
-    def _extract_table_based(self) -> tuple[pd.DataFrame, dict]:
-        """Estratégia genérica baseada em tabelas"""
-        transactions = []
-        header_info = {}
-        
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                tables = page.extract_tables()
-                
-                for table in tables:
-                    if not table or len(table) < 2:
-                        continue
-                    
-                    # Procura header
-                    header_row = None
-                    for i, row in enumerate(table):
-                        if any(keyword in str(cell).upper() for cell in row if cell
-                               for keyword in ['DATA', 'VALOR', 'HISTÓRICO', 'SALDO']):
-                            header_row = i
-                            break
+                            pass
                     
-                    if header_row is None:
-                        continue
-                    
-                    # Mapeia e processa
-                    col_map = self._map_columns(table[header_row])
+                    transactions.append(
+                        date_obj.strftime('%d/%m/%Y'), historico, value, saldo,
+                        'credit' if value > 0 else 'debit'
+                    )
                     
-                    for row in table[header_row + 1:]:
-                        transaction = self._extract_transaction_from_row(row, col_map)
-                        if transaction:
-                            transactions.append(transaction)
-        
-        return pd.DataFrame(transactions), header_info
+                except:
+                    continue
+    
+    def _parse_table_page(self, lines, tables, transactions, header_info):
+        """Estratégia genérica baseada em tabelas"""
+        for table in tables:
+            if not table or len(table) < 2:
+                continue
+            
+            # Procura header
+            header_row = None
+            for i, row in enumerate(table):
+                if any(keyword in str(cell).upper() for cell in row if cell
+                       for keyword in ['DATA', 'VALOR', 'HISTÓRICO', 'SALDO']):
+                    header_row = i
+                    break
+            
+            if header_row is None:
+                continue
+            
+            # Mapeia e processa
+            col_map = self._map_columns(table[header_row])
+            
+            for row in table[header_row + 1:]:
+                transaction = self._extract_transaction_from_row(row, col_map)
+                if transaction:
+                    transactions.append(*transaction)
     
-    def _extract_line_based(self) -> tuple[pd.DataFrame, dict]:
+    def _parse_line_page(self, lines, tables, transactions, header_info):
         """Estratégia genérica linha por linha"""
-        transactions = []
-        header_info = {}
-        
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text:
-                    continue
-                
-                lines = text.split('\n')
-                
-                for line in lines:
-                    if re.match(r'^\d{2}[/-]\d{2}', line):
-                        transaction = self._parse_line_transaction(line)
-                        if transaction:
-                            transactions.append(transaction)
+        if lines is None:
+            return
         
-        return pd.DataFrame(transactions), header_info
+        for line in lines:
+            if re.match(r'^\d{2}[/-]\d{2}', line):
+                transaction = self._parse_line_transaction(line)
+                if transaction:
+                    transactions.append(*transaction)
     
     def _map_columns(self, header):
         """Mapeia colunas automaticamente"""
@@ -442,7 +402,7 @@ class EnhancedGenericExtractor(BaseExtractor):
         return col_map
     
     def _extract_transaction_from_row(self, row, col_map):
-        """Extrai transação de uma linha da tabela"""
+        """Extrai transação de uma linha da tabela: (data, histórico, valor, tipo) ou None"""
         try:
             if 'data' not in col_map or 'valor' not in col_map:
                 return None
@@ -470,20 +430,13 @@ class EnhancedGenericExtractor(BaseExtractor):
             if any(x in historico.upper() for x in ['SALDO INICIAL', 'SALDO ANTERIOR']):
                 return None
             
-            return {
-                'arquivo': Path(self.pdf_path).name,
-                'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                'historico': historico,
-                'valor': value,
-                'tipo': 'credit' if value > 0 else 'debit',
-                'banco': self.bank_name
-            }
+            return (date_obj.strftime('%d/%m/%Y'), historico, value, 'credit' if value > 0 else 'debit')
             
         except:
             return None
     
     def _parse_line_transaction(self, line):
-        """Extrai transação de uma linha de texto"""
+        """Extrai transação de uma linha de texto: (data, histórico, valor, tipo) ou None"""
         try:
             # Pula saldos
             if any(x in line.upper() for x in ['SALDO INICIAL', 'SALDO ANTERIOR']):
@@ -509,14 +462,7 @@ class EnhancedGenericExtractor(BaseExtractor):
                     date_obj = datetime.strptime(date_str, '%d/%m/%Y')
                     value = float(value_str.replace('.', '').replace(',', '.'))
                     
-                    return {
-                        'arquivo': Path(self.pdf_path).name,
-                        'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                        'historico': desc,
-                        'valor': value,
-                        'tipo': 'credit' if value > 0 else 'debit',
-                        'banco': self.bank_name
-                    }
+                    return (date_obj.strftime('%d/%m/%Y'), desc, value, 'credit' if value > 0 else 'debit')
         except:
             pass
         
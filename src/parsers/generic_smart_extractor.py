@@ -1,83 +1,123 @@
 #!/usr/bin/env python3
 """Extractor genérico inteligente para bancos não implementados"""
 
-import pdfplumber
 import pandas as pd
 import re
 from datetime import datetime
 from pathlib import Path
 from parsers.base_extractor import BaseExtractor
+from utils.pdf_document import open_document
+from utils.row_builder import TransactionColumns
+from utils.stage_timer import timed
+
+# Colunas das transações do extractor genérico, na ordem de saída
+GENERIC_COLUMNS = ['arquivo', 'data_movimento', 'historico', 'valor', 'tipo', 'banco']
 
 class GenericSmartExtractor(BaseExtractor):
     """Extractor genérico com múltiplas estratégias"""
     
+    def _new_rows(self) -> TransactionColumns:
+        """Acumulador colunar de uma estratégia (arquivo e banco constantes)"""
+        
+        return TransactionColumns(
+            GENERIC_COLUMNS,
+            constants={'arquivo': Path(self.pdf_path).name, 'banco': 'GENÉRICO'},
+            numeric=['valor']
+        )
+    
     def extract_statement(self) -> tuple[pd.DataFrame, dict]:
-        """Extração inteligente com múltiplas estratégias"""
+        """Extração inteligente com múltiplas estratégias
         
-        strategies = [
-            self._extract_table_based,
-            self._extract_pattern_based,
-            self._extract_line_based
-        ]
+        Uma única passada pelas páginas: tabelas e texto de cada página são
+        lidos uma vez e consumidos pelas três estratégias (tabelas, padrões
+        e linhas). Estratégia com erro é descartada por inteiro; fica a que
+        encontrou mais transações (a primeira, no empate).
+        """
+        
+        strategies = ['extract_table_based', 'extract_pattern_based', 'extract_line_based']
+        results = {name: self._new_rows() for name in strategies}
+        failed = set()
+        # Texto das páginas: a estratégia de padrões roda sobre o extrato inteiro
+        texts = []
         
-        best_result = pd.DataFrame()
+        try:
+            with open_document(self.pdf_path, self.document) as pdf:
+                for page in pdf.iter_pages():
+                    if 'extract_table_based' not in failed:
+                        try:
+                            with timed('estrategia.extract_table_based'):
+                                self._parse_table_page(page.extract_tables(), results['extract_table_based'])
+                        except Exception:
+                            failed.add('extract_table_based')
+                    
+                    try:
+                        text = page.extract_text()
+                    except Exception:
+                        failed.update(strategies)
+                        break
+                    
+                    if text is None:
+                        # Página sem texto: padrões e linhas falhavam nela
+                        failed.update(['extract_pattern_based', 'extract_line_based'])
+                        continue
+                    
+                    texts.append(text)
+                    if 'extract_line_based' not in failed:
+                        with timed('estrategia.extract_line_based'):
+                            self._parse_line_page(text, results['extract_line_based'])
+        except Exception:
+            failed.update(strategies)
+        
+        if 'extract_pattern_based' not in failed:
+            with timed('estrategia.extract_pattern_based'):
+                self._parse_pattern_text(''.join(text + "\n" for text in texts), results['extract_pattern_based'])
+        
+        best_rows = None
         header_info = {'banco': 'GENÉRICO'}
         
-        # Tenta cada estratégia
-        for strategy in strategies:
-            try:
-                df, info = strategy()
-                if len(df) > len(best_result):
-                    best_result = df
-                    header_info.update(info)
-            except:
+        for name in strategies:
+            if name in failed:
                 continue
+            if len(results[name]) > (len(best_rows) if best_rows is not None else 0):
+                best_rows = results[name]
+        
+        best_result = best_rows.to_frame() if best_rows is not None else pd.DataFrame()
         
         if not best_result.empty:
             best_result = self.standardize_output(best_result, header_info)
         
         return best_result, header_info
     
-    def _extract_table_based(self) -> tuple[pd.DataFrame, dict]:
-        """Estratégia baseada em tabelas"""
-        transactions = []
-        header_info = {}
-        
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                tables = page.extract_tables()
-                
-                for table in tables:
-                    if not table or len(table) < 2:
-                        continue
-                    
-                    # Procura header com palavras-chave
-                    header_row = None
-                    for i, row in enumerate(table):
-                        if any(keyword in str(cell).upper() for cell in row if cell
-                               for keyword in ['DATA', 'VALOR', 'HISTÓRICO', 'SALDO']):
-                            header_row = i
-                            break
-                    
-                    if header_row is None:
-                        continue
-                    
-                    # Mapeia colunas automaticamente
-                    header = table[header_row]
-                    col_map = self._map_columns(header)
-                    
-                    # Extrai transações
-                    for row in table[header_row + 1:]:
-                        transaction = self._extract_transaction_from_row(row, col_map)
-                        if transaction:
-                            transactions.append(transaction)
+    def _parse_table_page(self, tables, transactions):
+        """Estratégia baseada em tabelas (uma página)"""
         
-        return pd.DataFrame(transactions), header_info
+        for table in tables:
+            if not table or len(table) < 2:
+                continue
+            
+            # Procura header com palavras-chave
+            header_row = None
+            for i, row in enumerate(table):
+                if any(keyword in str(cell).upper() for cell in row if cell
+                       for keyword in ['DATA', 'VALOR', 'HISTÓRICO', 'SALDO']):
+                    header_row = i
+                    break
+            
+            if header_row is None:
+                continue
+            
+            # Mapeia colunas automaticamente
+            header = table[header_row]
+            col_map = self._map_columns(header)
+            
+            # Extrai transações
+            for row in table[header_row + 1:]:
+                transaction = self._extract_transaction_from_row(row, col_map)
+                if transaction:
+                    transactions.append(*transaction)
     
-    def _extract_pattern_based(self) -> tuple[pd.DataFrame, dict]:
-        """Estratégia baseada em padrões regex"""
-        transactions = []
-        header_info = {}
+    def _parse_pattern_text(self, text, transactions):
+        """Estratégia baseada em padrões regex (texto do extrato inteiro)"""
         
         # Padrões comuns de extratos
         patterns = [
@@ -87,64 +127,42 @@ class GenericSmartExtractor(BaseExtractor):
             r'(\d{2}-\d{2}-\d{4})\s+(.+?)\s+([\d.,]+)',  # Data-Desc-Valor
         ]
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
+        for pattern in patterns:
+            matches = re.findall(pattern, text, re.MULTILINE)
             
-            for pattern in patterns:
-                matches = re.findall(pattern, text, re.MULTILINE)
-                
-                for match in matches:
-                    try:
-                        if len(match) >= 3:
-                            date_str = match[0]
-                            desc = match[1].strip()
-                            value_str = match[2]
-                            
-                            # Normaliza data
-                            if len(date_str) == 5:  # DD/MM
-                                date_str = f"{date_str}/{datetime.now().year}"
-                            
-                            date_obj = datetime.strptime(date_str.replace('-', '/'), '%d/%m/%Y')
-                            value = float(value_str.replace('.', '').replace(',', '.'))
-                            
-                            transaction = {
-                                'arquivo': Path(self.pdf_path).name,
-                                'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                                'historico': desc,
-                                'valor': value,
-                                'tipo': 'credit' if value > 0 else 'debit',
-                                'banco': 'GENÉRICO'
-                            }
-                            
-                            transactions.append(transaction)
-                    except:
-                        continue
-                
-                if transactions:  # Se encontrou com este padrão, para
-                    break
-        
-        return pd.DataFrame(transactions), header_info
+            for match in matches:
+                try:
+                    if len(match) >= 3:
+                        date_str = match[0]
+                        desc = match[1].strip()
+                        value_str = match[2]
+                        
+                        # Normaliza data
+                        if len(date_str) == 5:  # DD/MM
+                            date_str = f"{date_str}/{datetime.now().year}"
+                        
+                        date_obj = datetime.strptime(date_str.replace('-', '/'), '%d/%m/%Y')
+                        value = float(value_str.replace('.', '').replace(',', '.'))
+                        
+                        transactions.append(
+                            date_obj.strftime('%d/%m/%Y'), desc, value,
+                            'credit' if value > 0 else 'debit'
+                        )
+                except:
+                    continue
+            
+            if transactions:  # Se encontrou com este padrão, para
+                break
     
-    def _extract_line_based(self) -> tuple[pd.DataFrame, dict]:
-        """Estratégia linha por linha"""
-        transactions = []
-        header_info = {}
-        
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                lines = text.split('\n')
-                
-                for line in lines:
-                    # Procura linhas com data no início
-                    if re.match(r'^\d{2}[/-]\d{2}', line):
-                        transaction = self._parse_line_transaction(line)
-                        if transaction:
-                            transactions.append(transaction)
+    def _parse_line_page(self, text, transactions):
+        """Estratégia linha por linha (uma página)"""
         
-        return pd.DataFrame(transactions), header_info
+        for line in text.split('\n'):
+            # Procura linhas com data no início
+            if re.match(r'^\d{2}[/-]\d{2}', line):
+                transaction = self._parse_line_transaction(line)
+                if transaction:
+                    transactions.append(*transaction)
     
     def _map_columns(self, header):
         """Mapeia colunas automaticamente"""
@@ -169,7 +187,7 @@ class GenericSmartExtractor(BaseExtractor):
         return col_map
     
     def _extract_transaction_from_row(self, row, col_map):
-        """Extrai transação de uma linha da tabela"""
+        """Extrai transação de uma linha da tabela: (data, histórico, valor, tipo) ou None"""
         try:
             if 'data' not in col_map or 'valor' not in col_map:
                 return None
@@ -197,20 +215,13 @@ class GenericSmartExtractor(BaseExtractor):
             if any(x in historico.upper() for x in ['SALDO INICIAL', 'SALDO DISP', 'SALDO ANTERIOR', 'SALDO CONTA']):
                 return None
             
-            return {
-                'arquivo': Path(self.pdf_path).name,
-                'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                'historico': historico,
-                'valor': value,
-                'tipo': 'credit' if value > 0 else 'debit',
-                'banco': 'GENÉRICO'
-            }
+            return (date_obj.strftime('%d/%m/%Y'), historico, value, 'credit' if value > 0 else 'debit')
             
         except:
             return None
     
     def _parse_line_transaction(self, line):
-        """Extrai transação de uma linha de texto"""
+        """Extrai transação de uma linha de texto: (data, histórico, valor, tipo) ou None"""
         try:
             # Pula linhas de saldo
             if any(x in line.upper() for x in ['SALDO INICIAL', 'SALDO DISP', 'SALDO ANTERIOR']):
@@ -230,14 +241,7 @@ class GenericSmartExtractor(BaseExtractor):
                 date_obj = datetime.strptime(date_str, '%d/%m/%Y')
                 value = float(value_str.replace(',', '.'))
                 
-                return {
-                    'arquivo': Path(self.pdf_path).name,
-                    'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                    'historico': desc,
-                    'valor': value,
-                    'tipo': 'credit' if value > 0 else 'debit',
-                    'banco': 'GENÉRICO'
-                }
+                return (date_obj.strftime('%d/%m/%Y'), desc, value, 'credit' if value > 0 else 'debit')
             
             # Padrão geral: data + descrição + valor
             match = re.match(r'^(\d{2}[/-]\d{2}(?:[/-]\d{4})?)\s+(.+?)\s+([\d.,]+)(?:\s|$)', line)
@@ -254,14 +258,7 @@ class GenericSmartExtractor(BaseExtractor):
                 date_obj = datetime.strptime(date_str.replace('-', '/'), '%d/%m/%Y')
                 value = float(value_str.replace('.', '').replace(',', '.'))
                 
-                return {
-                    'arquivo': Path(self.pdf_path).name,
-                    'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                    'historico': desc,
-                    'valor': value,
-                    'tipo': 'credit' if value > 0 else 'debit',
-                    'banco': 'GENÉRICO'
-                }
+                return (date_obj.strftime('%d/%m/%Y'), desc, value, 'credit' if value > 0 else 'debit')
         except:
             pass
         
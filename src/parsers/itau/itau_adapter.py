@@ -1,17 +1,12 @@
 #!/usr/bin/env python3
 """Adapter para extractor do Itaú"""
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
 import pandas as pd
 from pathlib import Path
 from parsers.base_extractor import BaseExtractor
 
-# Importa função do extractor existente
-with open('src/parsers/itau/itau_extractor.py', 'r', encoding='utf-8') as f:
-    exec(f.read())
+# Funções do extractor existente
+from parsers.itau.itau_extractor import extract_itau_statement, iter_itau_pages, itau_frame
 
 class ItauAdapter(BaseExtractor):
     """Adapter para integrar extractor do Itaú com interface padrão"""
@@ -20,7 +15,20 @@ class ItauAdapter(BaseExtractor):
         """Extrai dados usando extractor específico do Itaú"""
         
         # Usa função existente
-        df, header_info = extract_itau_statement(self.pdf_path)
+        df, header_info = extract_itau_statement(self.pdf_path, self.document)
+        
+        return self.prepare_batch(df, header_info), header_info
+    
+    def iter_transaction_batches(self):
+        """Um lote padronizado por página do extrato"""
+        
+        for page_transactions, self.header_info in iter_itau_pages(self.pdf_path, self.document):
+            batch = itau_frame(page_transactions)
+            if not batch.empty:
+                yield self.prepare_batch(batch, self.header_info)
+    
+    def prepare_batch(self, df: pd.DataFrame, header_info: dict) -> pd.DataFrame:
+        """Padroniza as transações extraídas (extrato inteiro ou uma página)"""
         
         # Padroniza formato
         if not df.empty:
@@ -29,4 +37,4 @@ class ItauAdapter(BaseExtractor):
             # Padroniza saída
             df = self.standardize_output(df, header_info)
         
-        return df, header_info
\ No newline at end of file
+        return df
\ No newline at end of file
@@ -1,20 +1,60 @@
 #!/usr/bin/env python3
 """Extrator específico para extratos do Itaú"""
 
-import pdfplumber
 import pandas as pd
 import re
 from datetime import datetime
 from pathlib import Path
+from utils.br_format import normalize_transactions
+from utils.pdf_document import open_document
+from utils.row_builder import TransactionColumns
 
-def extract_itau_statement(pdf_path):
+# Colunas das transações do Itaú, na ordem de saída
+ITAU_COLUMNS = [
+    'arquivo', 'data_movimento', 'historico', 'documento', 'valor', 'saldo',
+    'tipo', 'conta', 'agencia', 'banco', 'periodo'
+]
+
+def extract_itau_statement(pdf_path, document=None):
     """Extrai dados específicos do formato Itaú"""
     
-    all_transactions = []
+    all_transactions = itau_rows(pdf_path)
     header_info = {}
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
+    for page_transactions, header_info in iter_itau_pages(pdf_path, document):
+        all_transactions.extend(page_transactions)
+    
+    return itau_frame(all_transactions), header_info
+
+def itau_rows(pdf_path):
+    """Acumulador colunar das transações de um arquivo do Itaú"""
+    
+    return TransactionColumns(ITAU_COLUMNS, constants={'arquivo': Path(pdf_path).name, 'banco': 'ITAÚ'})
+
+def itau_frame(transactions):
+    """DataFrame das transações com datas e valores convertidos em bloco"""
+    
+    # Linhas com data ou valor inválidos são descartadas
+    df = normalize_transactions(transactions.to_frame(), required=['data_movimento', 'valor'])
+    
+    if not df.empty:
+        df.loc[df['tipo'] == 'debit', 'valor'] *= -1
+    
+    return df
+
+def iter_itau_pages(pdf_path, document=None):
+    """Lê o extrato página por página
+    
+    Gera (transações da página, cabeçalho acumulado até ela), sem guardar
+    as páginas anteriores.
+    """
+    
+    header_info = {}
+    
+    with open_document(pdf_path, document) as pdf:
+        for page_num, page in enumerate(pdf.iter_pages(), 1):
+            page_transactions = itau_rows(pdf_path)
+            
             text = page.extract_text()
             lines = text.split('\n')
             
@@ -47,9 +87,8 @@ def extract_itau_statement(pdf_path):
                         if any(x in line.upper() for x in ['SALDO ANTERIOR', 'S A L D O']):
                             continue
                         
-                        # Adiciona ano atual
+                        # Adiciona ano atual (a conversão é feita em itau_frame)
                         full_date = f"{date_str}/{current_year}"
-                        date_obj = datetime.strptime(full_date, '%d/%m/%Y')
                         
                         # Remove data da linha
                         resto_linha = line[5:].strip()
@@ -77,21 +116,10 @@ def extract_itau_statement(pdf_path):
                                 documento = doc_match.group(1)
                                 historico = historico.replace(documento, '').strip()
                             
-                            # Converte valor
-                            try:
-                                valor_clean = valor_str.replace('.', '').replace(',', '.')
-                                valor = float(valor_clean)
-                                
-                                # Determina tipo baseado no contexto
-                                tipo = 'debit'  # Itaú geralmente mostra débitos
-                                if any(x in historico.upper() for x in ['CREDITO', 'DEPOSITO', 'VENDA']):
-                                    tipo = 'credit'
-                                
-                                if tipo == 'debit':
-                                    valor = -valor
-                                
-                            except:
-                                continue
+                            # Determina tipo baseado no contexto (débitos ficam negativos em itau_frame)
+                            tipo = 'debit'  # Itaú geralmente mostra débitos
+                            if any(x in historico.upper() for x in ['CREDITO', 'DEPOSITO', 'VENDA']):
+                                tipo = 'credit'
                             
                             # Procura saldo na próxima linha ou mesma linha
                             saldo = None
@@ -99,33 +127,19 @@ def extract_itau_statement(pdf_path):
                                 next_line = lines[i + 1].strip()
                                 saldo_match = re.search(r'([\d.,]+)$', next_line)
                                 if saldo_match:
-                                    try:
-                                        saldo_str = saldo_match.group(1).replace('.', '').replace(',', '.')
-                                        saldo = float(saldo_str)
-                                    except:
-                                        pass
-                            
-                            # Cria transação
-                            transaction = {
-                                'arquivo': Path(pdf_path).name,
-                                'data_movimento': date_obj.strftime('%d/%m/%Y'),
-                                'historico': historico,
-                                'documento': documento,
-                                'valor': valor,
-                                'saldo': saldo,
-                                'tipo': tipo,
-                                'conta': header_info.get('conta', ''),
-                                'agencia': header_info.get('agencia', ''),
-                                'banco': 'ITAÚ',
-                                'periodo': f"{date_str}/{current_year}"
-                            }
+                                    saldo = saldo_match.group(1)
                             
-                            all_transactions.append(transaction)
+                            # Registra transação (colunas de ITAU_COLUMNS)
+                            page_transactions.append(
+                                full_date, historico, documento, valor_str, saldo, tipo,
+                                header_info.get('conta', ''), header_info.get('agencia', ''),
+                                f"{date_str}/{current_year}"
+                            )
                             
                     except Exception as e:
                         continue
-    
-    return pd.DataFrame(all_transactions), header_info
+            
+            yield page_transactions, header_info
 
 def main():
     input_folder = "data/input"
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Conversão vetorizada de valores e datas no formato brasileiro
+
+Os parsers guardam os textos como aparecem no extrato ('1.234,56',
+'1.234,56D', '15/03' ...) e a conversão é feita de uma vez, na coluna
+inteira, em vez de float()/strptime() linha a linha:
+
+- valores: '.' de milhar e ',' decimal; 'D', '-' no início ou no fim
+  indicam valor negativo
+- datas: dd/mm/aaaa, dd-mm-aaaa ou dd/mm (completada com o ano informado)
+
+Textos que não podem ser convertidos viram NaN/NaT.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from utils.lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+
+def _as_text(values: pd.Series) -> pd.Series:
+    return values.astype(object).where(values.notna(), '').astype(str).str.strip()
+
+
+def is_text_column(values: pd.Series) -> bool:
+    """Indica se a coluna ainda tem os textos do extrato (não convertida)"""
+
+    return pd.api.types.infer_dtype(values, skipna=True) == 'string'
+
+
+def parse_br_amounts(values: pd.Series, signed: bool = True) -> pd.Series:
+    """Converte textos como '1.234,56', '1.234,56D' ou '-1.234,56' em float
+
+    signed=False ignora os indicadores de sinal (ex.: saldo sempre positivo).
+    """
+
+    text = _as_text(values).str.upper()
+    digits = (text.str.replace(r'[^\d.,]', '', regex=True)
+                  .str.replace('.', '', regex=False)
+                  .str.replace(',', '.', regex=False))
+    amounts = pd.to_numeric(digits, errors='coerce').astype(float)
+
+    if signed:
+        negative = text.str.endswith('D') | text.str.startswith('-') | text.str.endswith('-')
+        amounts = amounts.where(~negative, -amounts)
+
+    return amounts
+
+
+def parse_br_dates(values: pd.Series, year: int = None) -> pd.Series:
+    """Converte textos dd/mm/aaaa, dd-mm-aaaa ou dd/mm (com year) em datetime"""
+
+    text = _as_text(values).str.replace('-', '/', regex=False)
+
+    if year is not None:
+        short = text.str.len() == 5
+        text = text.where(~short, text + f"/{year}")
+
+    return pd.to_datetime(text, format='%d/%m/%Y', errors='coerce')
+
+
+def normalize_transactions(df: pd.DataFrame, dates: Iterable[str] = ('data_movimento',),
+                           amounts: Iterable[str] = ('valor', 'saldo'), unsigned: Iterable[str] = (),
+                           required: Iterable[str] = (), year: int = None) -> pd.DataFrame:
+    """Converte as colunas de texto do DataFrame em bloco
+
+    Colunas já convertidas (ou ausentes) são mantidas. Linhas em que alguma
+    coluna de required não pôde ser convertida são descartadas, como os
+    parsers faziam ao pular a linha quando float()/strptime() falhava.
+    """
+
+    if df.empty:
+        return df
+
+    unsigned = set(unsigned)
+
+    for col in dates:
+        if col in df.columns and is_text_column(df[col]):
+            df[col] = parse_br_dates(df[col], year)
+
+    for col in amounts:
+        if col in df.columns and is_text_column(df[col]):
+            df[col] = parse_br_amounts(df[col], signed=col not in unsigned)
+
+    required = [col for col in required if col in df.columns]
+    if required:
+        df = df[df[required].notna().all(axis=1)].reset_index(drop=True)
+
+    return df
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Regiões fixas da página de cada layout de extrato
+
+Cada perfil declara, em frações da página (x0, topo, x1, base), a caixa do
+corpo com as transações e, se houver, a caixa do cabeçalho com os dados da
+conta. Os parsers recortam a página (page.crop) antes de extrair texto e
+tabelas, assim rodapés, avisos e títulos de coluna repetidos em todas as
+páginas não chegam aos laços de regex. O recorte só vale nas páginas cujo
+cabeçalho traz a âncora do layout (o texto impresso no topo de todas as
+páginas): outro extrato do mesmo banco, com outras faixas, é lido inteiro.
+
+Só têm perfil os layouts com faixas fixas conferidas nos extratos de
+exemplo e lidos pelo PyMuPDF, em que o recorte (clip) sai de graça. No
+pdfplumber a página é interpretada inteira de qualquer jeito e o crop ainda
+recorta cada objeto de novo: nos extratos de exemplo (Caixa, Citi) ficou
+mais lento que ler a página inteira. Por isso get_layout_profile só
+devolve perfil para o PyMuPDF; para os demais layouts e backends devolve
+None e a página é lida inteira.
+
+    profile = get_layout_profile('safra', 'pymupdf')
+    text = profile.extract_text(page)   # None: página fora do layout
+    body = profile.body_of(page)
+"""
+
+from typing import Optional, Tuple
+
+from utils.stage_timer import timed
+
+# Backend em que o recorte sai de graça
+PROFILE_BACKEND = 'pymupdf'
+
+Box = Tuple[float, float, float, float]
+
+
+class LayoutProfile:
+    """Caixas do corpo e do cabeçalho de um layout, em frações da página"""
+
+    def __init__(self, body: Box, header: Optional[Box] = None, anchor: str = None):
+        self.body = body
+        self.header = header
+        self.anchor = anchor
+
+    def body_of(self, page):
+        """Recorte da página com as transações"""
+        return crop_fraction(page, self.body)
+
+    def header_of(self, page):
+        """Recorte da página com o cabeçalho (None se o layout não declarar)"""
+        return crop_fraction(page, self.header) if self.header else None
+
+    def extract_text(self, page) -> Optional[str]:
+        """Texto do cabeçalho seguido do texto do corpo
+
+        As linhas do cabeçalho vêm primeiro, assim as buscas de dados da
+        conta nas primeiras linhas (lines[:10]) continuam funcionando.
+        Devolve None se o cabeçalho não tiver a âncora do layout: a página
+        deve ser lida inteira.
+        """
+
+        header = self.header_of(page)
+        with timed('pdf.texto'):
+            header_text = header.extract_text() if header is not None else None
+            if self.anchor and self.anchor not in (header_text or ''):
+                return None
+            body_text = self.body_of(page).extract_text()
+        return '\n'.join(text for text in [header_text, body_text] if text)
+
+
+def crop_fraction(page, box: Box):
+    """page.crop() com a caixa em frações da página (pdfplumber ou PyMuPDF)"""
+
+    x0, top, x1, bottom = page.bbox
+    width, height = x1 - x0, bottom - top
+    return page.crop((
+        x0 + box[0] * width, top + box[1] * height,
+        x0 + box[2] * width, top + box[3] * height
+    ))
+
+
+# Perfis pelo identificador de extrator (BankDetector.get_bank_info()['extractor'])
+LAYOUT_PROFILES = {
+    # Nome do banco, CNPJ e conta no topo de todas as páginas; título
+    # "Data Lançamento ..." logo abaixo; central de atendimento no rodapé
+    'safra': LayoutProfile(body=(0, 0.17, 1, 0.9), header=(0, 0, 1, 0.155), anchor='Banco Safra S/A')
+}
+
+
+def get_layout_profile(name: str, backend: str = PROFILE_BACKEND) -> Optional[LayoutProfile]:
+    """Perfil do layout pelo identificador (None = página inteira)"""
+
+    if backend != PROFILE_BACKEND:
+        return None
+    return LAYOUT_PROFILES.get(name)
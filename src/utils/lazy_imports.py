@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Importação adiada de bibliotecas pesadas
+
+pandas, numpy e pyarrow levam centenas de milissegundos para importar. Nos
+módulos carregados na inicialização do extrator universal elas são
+declaradas com lazy_import e só são importadas no primeiro acesso a um
+atributo; uma execução que não encontra nada para processar não paga esse
+custo.
+
+    pd = lazy_import('pandas')
+    ...
+    df = pd.DataFrame()   # pandas é importado aqui
+
+Módulos que citam essas bibliotecas em anotações de tipo usam
+`from __future__ import annotations`, assim as anotações não são avaliadas
+na importação.
+"""
+
+import importlib
+
+
+class LazyModule:
+    """Módulo importado no primeiro acesso a um atributo"""
+
+    def __init__(self, name: str):
+        self._lazy_name = name
+
+    def __getattr__(self, attr):
+        # Só é chamado para atributos que ainda não estão no objeto
+        module = importlib.import_module(self._lazy_name)
+        self.__dict__.update(vars(module))
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        return f"<módulo adiado '{self._lazy_name}'>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Referência ao módulo que só o importa quando for usado"""
+
+    return LazyModule(name)
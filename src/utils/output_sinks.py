@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""Destinos de saída que recebem as transações em lotes
+
+Usados pelo modo streaming do extrator universal: cada lote (normalmente
+uma página de extrato) é gravado assim que é extraído, então a memória não
+cresce com o número de arquivos ou de páginas.
+
+Todo destino tem a mesma interface:
+
+- write(df): grava um lote de transações padronizadas
+- write_summary(df): grava o resumo por arquivo, se o formato comportar
+- close(): finaliza o arquivo (também chamado ao sair do bloco with)
+
+As bibliotecas de cada formato (openpyxl, pyarrow) só são importadas
+quando o destino é usado.
+"""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import List
+
+from utils.lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+pa = lazy_import('pyarrow')
+pq = lazy_import('pyarrow.parquet')
+
+
+def excel_sheet_name(name: str) -> str:
+    """Nome de aba válido no Excel (sem caracteres inválidos, até 31 caracteres)"""
+
+    sheet_name = name.replace(' ', '_').replace('/', '_').replace('\\', '_')
+    return ''.join(c for c in sheet_name if c.isalnum() or c == '_')[:31]
+
+
+class CSVSink:
+    """CSV no padrão brasileiro (';' e vírgula decimal), gravado por append
+
+    As colunas são fixas: as informadas na criação ou, se nenhuma for
+    informada, as do primeiro lote. Colunas extras de lotes seguintes são
+    descartadas e as ausentes ficam vazias.
+    """
+
+    name = 'csv'
+    suffix = '.csv'
+
+    def __init__(self, output_file, columns: List[str] = None):
+        self.output_file = Path(output_file)
+        self.columns = list(columns) if columns else None
+        self.rows = 0
+        self._file = None
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+
+        if self._file is None:
+            if self.columns is None:
+                self.columns = list(df.columns)
+            self.output_file.parent.mkdir(parents=True, exist_ok=True)
+            # utf-8-sig para o Excel reconhecer a acentuação
+            self._file = open(self.output_file, 'w', encoding='utf-8-sig', newline='')
+            header = True
+        else:
+            header = False
+
+        df.reindex(columns=self.columns).to_csv(
+            self._file, sep=';', decimal=',', date_format='%d/%m/%Y', index=False, header=header
+        )
+        self.rows += len(df)
+
+    def write_summary(self, df: pd.DataFrame):
+        # O CSV tem uma tabela só; o resumo fica no relatório do terminal
+        pass
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ExcelSink:
+    """Planilha xlsx gravada em modo write-only (memória constante)
+
+    Cada lote vai para a aba principal e, na mesma passada, para a aba do
+    seu banco (coluna split_by), criada quando o banco aparece pela
+    primeira vez. O openpyxl em modo write-only despeja as linhas de cada
+    aba em arquivo temporário conforme chegam; nada da planilha fica em
+    memória até o save. A aba de resumo (write_summary) é a última.
+
+    Colunas fixas como no CSVSink. Os valores saem como no
+    DataFrame.to_excel: vazios (None/NaN/NaT) ficam em branco e o
+    cabeçalho vai em negrito com borda.
+    """
+
+    name = 'xlsx'
+    suffix = '.xlsx'
+
+    # Linhas convertidas para valores Python de cada vez
+    CHUNK_ROWS = 10000
+
+    def __init__(self, output_file, columns: List[str] = None,
+                 main_sheet: str = 'Todas_Transacoes', split_by: str = 'banco_detectado'):
+        self.output_file = Path(output_file)
+        self.columns = list(columns) if columns else None
+        self.main_sheet = main_sheet
+        self.split_by = split_by
+        self.rows = 0
+        self._workbook = None
+        self._sheets = {}
+
+    def _sheet(self, name: str, columns: List[str]):
+        """Aba pelo nome, criada com o cabeçalho na primeira vez"""
+
+        if name not in self._sheets:
+            if self._workbook is None:
+                from openpyxl import Workbook
+                self._workbook = Workbook(write_only=True)
+            sheet = self._workbook.create_sheet(name)
+            sheet.append([self._header_cell(sheet, column) for column in columns])
+            self._sheets[name] = sheet
+        return self._sheets[name]
+
+    def _header_cell(self, sheet, value):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Border, Font, Side
+
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.font = Font(bold=True)
+        cell.border = Border(*(Side(style='thin'),) * 4)
+        cell.alignment = Alignment(horizontal='center', vertical='top')
+        return cell
+
+    @staticmethod
+    def _values(df: pd.DataFrame) -> list:
+        """Linhas do DataFrame como listas de valores Python (vazios como None)"""
+
+        return df.astype(object).where(df.notna(), None).values.tolist()
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+
+        if self.columns is None:
+            self.columns = list(df.columns)
+
+        df = df.reindex(columns=self.columns)
+        main = self._sheet(self.main_sheet, self.columns)
+
+        # Banco de cada linha como código inteiro da categoria (-1 = vazio);
+        # as abas são criadas na ordem em que os bancos aparecem
+        codes = None
+        if self.split_by in df.columns:
+            banks = df[self.split_by].astype('category')
+            codes = banks.cat.codes.to_numpy()
+            bank_sheets = {code: self._sheet(excel_sheet_name(banks.cat.categories[code]), self.columns)
+                           for code in pd.unique(codes) if code >= 0}
+
+        # Lotes grandes (o consolidado inteiro) vão em fatias, para que só
+        # uma fatia exista como listas Python de cada vez
+        for start in range(0, len(df), self.CHUNK_ROWS):
+            chunk = df.iloc[start:start + self.CHUNK_ROWS]
+            rows = self._values(chunk)
+
+            for row in rows:
+                main.append(row)
+
+            if codes is not None:
+                # Uma ordenação estável pelo código separa as linhas de cada
+                # banco, mantendo a ordem original dentro de cada um
+                chunk_codes = codes[start:start + self.CHUNK_ROWS]
+                order = np.argsort(chunk_codes, kind='stable')
+                for positions in np.split(order, np.flatnonzero(np.diff(chunk_codes[order])) + 1):
+                    if chunk_codes[positions[0]] < 0:
+                        continue
+                    sheet = bank_sheets[chunk_codes[positions[0]]]
+                    for position in positions:
+                        sheet.append(rows[position])
+
+        self.rows += len(df)
+
+    def write_summary(self, df: pd.DataFrame, sheet_name: str = 'Resumo'):
+        if df.empty:
+            return
+
+        sheet = self._sheet(sheet_name, list(df.columns))
+        for row in self._values(df):
+            sheet.append(row)
+
+    def close(self):
+        if self._workbook is not None:
+            self.output_file.parent.mkdir(parents=True, exist_ok=True)
+            self._workbook.save(self.output_file)
+            self._workbook = None
+            self._sheets = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ParquetSink:
+    """Dataset Parquet particionado por banco e mês, no formato Hive
+
+        extratos_consolidados/banco_detectado=Banco Bradesco S%2FA/ano_mes=2024-01/part-0.parquet
+
+    Nos valores das partições, os caracteres que quebram o caminho vão
+    codificados como URL (o pyarrow decodifica na leitura); linhas sem banco ou sem data ficam em
+    __HIVE_DEFAULT_PARTITION__. Cada partição tem um único arquivo, aberto
+    quando a partição aparece e fechado no close; as linhas de cada uma são
+    acumuladas até ROW_GROUP_ROWS e gravadas como um row group.
+
+    Tipos fixos na criação: data_movimento como date32, valor e saldo como
+    decimal(18, 2), colunas de poucos valores como dictionary (category no
+    pandas) e as demais como string. Colunas fixas como no CSVSink.
+
+        df = pd.read_parquet('data/output/extratos_consolidados',
+                             filters=[('ano_mes', '=', '2024-01')])
+    """
+
+    name = 'parquet'
+    suffix = ''
+
+    PARTITIONS = ['banco_detectado', 'ano_mes']
+    DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+    ROW_GROUP_ROWS = 50000
+
+    DATE_COLUMNS = ['data_movimento']
+    DECIMAL_COLUMNS = ['valor', 'saldo']
+    CATEGORY_COLUMNS = ['arquivo', 'tipo', 'banco', 'codigo_banco']
+    DECIMAL_PRECISION = (18, 2)
+
+    # Caracteres escapados no nome da pasta da partição
+    PATH_ESCAPES = str.maketrans({c: f"%{ord(c):02X}" for c in '%/\\=:'})
+
+    def __init__(self, output_file, columns: List[str] = None):
+        self.output_file = Path(output_file)
+        self.columns = list(columns) if columns else None
+        self.rows = 0
+        self._schema = None
+        self._writers = {}
+        self._pending = {}
+
+    def _type_of(self, column: str) -> pa.DataType:
+        if column in self.DATE_COLUMNS:
+            return pa.date32()
+        if column in self.DECIMAL_COLUMNS:
+            return pa.decimal128(*self.DECIMAL_PRECISION)
+        if column in self.CATEGORY_COLUMNS:
+            return pa.dictionary(pa.int32(), pa.string())
+        return pa.string()
+
+    def _array(self, column: str, values: pd.Series) -> pa.Array:
+        """Coluna do lote convertida para o tipo do esquema"""
+
+        if column in self.DATE_COLUMNS:
+            dates = pd.to_datetime(values, errors='coerce', dayfirst=True)
+            return pa.array(dates.dt.date, type=pa.date32())
+
+        if column in self.DECIMAL_COLUMNS:
+            # Via texto com 2 casas: o float 1234.56 vira exatamente 1234.56
+            numbers = pd.to_numeric(values, errors='coerce')
+            text = numbers.map('{:.2f}'.format, na_action='ignore')
+            return pa.array(text, type=pa.string()).cast(pa.decimal128(*self.DECIMAL_PRECISION))
+
+        text = pa.array(values.astype('string'), type=pa.string())
+        if column in self.CATEGORY_COLUMNS:
+            return text.dictionary_encode().cast(pa.dictionary(pa.int32(), pa.string()))
+        return text
+
+    def _partition_dir(self, key: tuple) -> Path:
+        path = self.output_file
+        for name, value in zip(self.PARTITIONS, key):
+            path = path / f"{name}={value.translate(self.PATH_ESCAPES)}"
+        return path
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+
+        if self._schema is None:
+            if self.columns is None:
+                self.columns = list(df.columns)
+            data_columns = [c for c in self.columns if c not in self.PARTITIONS]
+            self._schema = pa.schema([(c, self._type_of(c)) for c in data_columns])
+            # Sobrescreve o dataset anterior inteiro (partições antigas não se misturam)
+            shutil.rmtree(self.output_file, ignore_errors=True)
+            self.output_file.mkdir(parents=True)
+
+        df = df.reindex(columns=self.columns)
+        dates = pd.to_datetime(df['data_movimento'], errors='coerce', dayfirst=True) \
+            if 'data_movimento' in df.columns else pd.Series(pd.NaT, index=df.index)
+        keys = pd.DataFrame({
+            'banco_detectado': df['banco_detectado'].astype('string') if 'banco_detectado' in df.columns
+                               else pd.Series(pd.NA, index=df.index, dtype='string'),
+            'ano_mes': dates.dt.strftime('%Y-%m').astype('string')
+        }).fillna(self.DEFAULT_PARTITION)
+
+        table = pa.table([self._array(c, df[c]) for c in self._schema.names], schema=self._schema)
+
+        for key, positions in keys.groupby(self.PARTITIONS, sort=False).indices.items():
+            pending = self._pending.setdefault(key, [])
+            pending.append(table.take(positions))
+            if sum(len(t) for t in pending) >= self.ROW_GROUP_ROWS:
+                self._flush(key)
+
+        self.rows += len(df)
+
+    def _flush(self, key: tuple):
+        pending = self._pending.pop(key, None)
+        if not pending:
+            return
+
+        if key not in self._writers:
+            partition_dir = self._partition_dir(key)
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            self._writers[key] = pq.ParquetWriter(partition_dir / 'part-0.parquet', self._schema)
+
+        # Dicionários de lotes diferentes são unificados no row group
+        self._writers[key].write_table(pa.concat_tables(pending).unify_dictionaries())
+
+    def write_summary(self, df: pd.DataFrame):
+        # Fora da pasta do dataset, para não entrar na leitura das transações
+        if df.empty:
+            return
+
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(self.output_file.with_name(f"{self.output_file.name}_resumo.parquet"), index=False)
+
+    def close(self):
+        for key in list(self._pending):
+            self._flush(key)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+SINKS = {
+    CSVSink.name: CSVSink,
+    ExcelSink.name: ExcelSink,
+    ParquetSink.name: ParquetSink
+}
+
+
+def get_sink(name: str):
+    """Classe do destino de saída pelo nome"""
+
+    if name not in SINKS:
+        raise ValueError(f"Formato de saída desconhecido: {name} (opções: {', '.join(SINKS)})")
+    return SINKS[name]
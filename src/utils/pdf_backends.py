@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Bibliotecas de leitura de PDF intercambiáveis
+
+Cada backend abre o arquivo e devolve páginas com a mesma interface usada
+pelos parsers (a do pdfplumber):
+
+- extract_text(): texto da página, linha por linha
+- extract_words(): palavras com coordenadas (x0, x1, top, bottom, text)
+- extract_tables(): tabelas como listas de linhas
+- bbox / width / height / crop(bbox)
+
+pdfplumber é o padrão e o mais fiel para tabelas; PyMuPDF é bem mais
+rápido para texto e serve para os parsers que leem linha por linha.
+"""
+
+import importlib.util
+
+DEFAULT_BACKEND = 'pdfplumber'
+
+# Mesma tolerância vertical que o pdfplumber usa para montar linhas
+LINE_TOLERANCE = 3
+
+# Nomes dos metadados no padrão do pdfplumber (dicionário de informações)
+_PYMUPDF_METADATA_KEYS = {
+    'title': 'Title',
+    'author': 'Author',
+    'subject': 'Subject',
+    'keywords': 'Keywords',
+    'creator': 'Creator',
+    'producer': 'Producer',
+    'creationDate': 'CreationDate',
+    'modDate': 'ModDate'
+}
+
+
+class PdfplumberBackend:
+    """Leitura com pdfplumber (padrão)"""
+
+    name = 'pdfplumber'
+
+    def __init__(self, pdf_path: str):
+        import pdfplumber
+        self._pdf = pdfplumber.open(pdf_path)
+
+    @property
+    def pages(self) -> list:
+        return self._pdf.pages
+
+    @property
+    def metadata(self) -> dict:
+        return self._pdf.metadata or {}
+
+    def close(self):
+        self._pdf.close()
+
+
+class PyMuPDFPage:
+    """Página do PyMuPDF com a interface de página do pdfplumber"""
+
+    def __init__(self, page, bbox=None):
+        self._page = page
+        rect = page.rect
+        self.bbox = tuple(bbox) if bbox else (rect.x0, rect.y0, rect.x1, rect.y1)
+        self.page_number = page.number + 1
+
+    @property
+    def width(self) -> float:
+        return self.bbox[2] - self.bbox[0]
+
+    @property
+    def height(self) -> float:
+        return self.bbox[3] - self.bbox[1]
+
+    def crop(self, bbox):
+        return PyMuPDFPage(self._page, bbox)
+
+    def extract_words(self, **kwargs) -> list:
+        words = self._page.get_text("words", clip=self.bbox, sort=False)
+        return [
+            {'text': w[4], 'x0': w[0], 'x1': w[2], 'top': w[1], 'bottom': w[3]}
+            for w in words
+        ]
+
+    def extract_text(self, **kwargs) -> str:
+        # Agrupa as palavras em linhas pela posição vertical, como o pdfplumber
+        words = sorted(self.extract_words(), key=lambda w: w['top'])
+
+        lines = []
+        current = []
+        last_top = None
+        for word in words:
+            if current and word['top'] - last_top > LINE_TOLERANCE:
+                lines.append(current)
+                current = []
+            current.append(word)
+            last_top = word['top']
+        if current:
+            lines.append(current)
+
+        return '\n'.join(
+            ' '.join(w['text'] for w in sorted(line, key=lambda w: w['x0']))
+            for line in lines
+        )
+
+    def extract_tables(self, **kwargs) -> list:
+        return [table.extract() for table in self._page.find_tables(clip=self.bbox).tables]
+
+
+class PyMuPDFBackend:
+    """Leitura com PyMuPDF (texto rápido)"""
+
+    name = 'pymupdf'
+
+    def __init__(self, pdf_path: str):
+        import pymupdf
+        # Evita a mensagem sugerindo o pacote pymupdf_layout (versões novas)
+        if hasattr(pymupdf, 'no_recommend_layout'):
+            pymupdf.no_recommend_layout()
+        self._doc = pymupdf.open(pdf_path)
+
+    @property
+    def pages(self) -> list:
+        return [PyMuPDFPage(page) for page in self._doc]
+
+    @property
+    def metadata(self) -> dict:
+        return {
+            _PYMUPDF_METADATA_KEYS.get(key, key): value
+            for key, value in (self._doc.metadata or {}).items()
+            if value and key in _PYMUPDF_METADATA_KEYS
+        }
+
+    def close(self):
+        self._doc.close()
+
+
+BACKENDS = {
+    PdfplumberBackend.name: PdfplumberBackend,
+    PyMuPDFBackend.name: PyMuPDFBackend
+}
+
+
+def backend_available(name: str) -> bool:
+    """Indica se a biblioteca do backend está instalada"""
+
+    if name == PyMuPDFBackend.name:
+        return importlib.util.find_spec('pymupdf') is not None
+    return name in BACKENDS
+
+
+def get_backend(name: str = None):
+    """Classe do backend pelo nome (None = padrão)"""
+
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Backend de PDF desconhecido: {name} (opções: {', '.join(BACKENDS)})")
+    return BACKENDS[name]
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Documento PDF compartilhado entre detecção e extração"""
+
+import gc
+import os
+from contextlib import contextmanager
+
+from utils.pdf_backends import DEFAULT_BACKEND, get_backend
+from utils.stage_timer import timed
+
+# Etapa (medição com --timings) de cada leitura da página
+PAGE_STAGES = {'text': 'pdf.texto', 'words': 'pdf.palavras', 'tables': 'pdf.tabelas'}
+
+
+def current_rss_mb():
+    """Memória residente do processo em MB (None fora do Linux)"""
+
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PageLimits:
+    """Limites de memória na leitura página a página (PDFDocument.iter_pages)
+
+    reopen_every: reabre o arquivo a cada N páginas (None = nunca)
+    max_rss_mb: teto de memória do processo; acima dele o arquivo é
+        reaberto antes da próxima página (None = sem teto)
+    """
+
+    def __init__(self, reopen_every: int = None, max_rss_mb: float = None):
+        self.reopen_every = reopen_every if reopen_every and reopen_every > 0 else None
+        self.max_rss_mb = max_rss_mb if max_rss_mb and max_rss_mb > 0 else None
+
+    def should_reopen(self, pages_read: int, check_rss: bool = True) -> bool:
+        """Indica se o arquivo deve ser reaberto depois de pages_read páginas"""
+
+        if self.reopen_every and pages_read % self.reopen_every == 0:
+            return True
+        if self.max_rss_mb and check_rss:
+            rss = current_rss_mb()
+            return rss is not None and rss > self.max_rss_mb
+        return False
+
+
+class CachedPage:
+    """Página (de qualquer backend) com cache de texto, palavras e tabelas"""
+
+    def __init__(self, page):
+        self._page = page
+        self._cache = {}
+
+    def _cached(self, key, func, kwargs):
+        # Só usa cache na chamada padrão (sem parâmetros)
+        if kwargs:
+            with timed(PAGE_STAGES[key]):
+                return func(**kwargs)
+
+        if key not in self._cache:
+            with timed(PAGE_STAGES[key]):
+                self._cache[key] = func()
+        return self._cache[key]
+
+    def extract_text(self, **kwargs):
+        return self._cached('text', self._page.extract_text, kwargs)
+
+    def extract_words(self, **kwargs):
+        return self._cached('words', self._page.extract_words, kwargs)
+
+    def extract_tables(self, **kwargs):
+        return self._cached('tables', self._page.extract_tables, kwargs)
+
+    def release(self):
+        """Descarta os objetos da página (caracteres, linhas, layout) e o cache
+
+        Um novo acesso volta a interpretar a página.
+        """
+
+        # pdfplumber: close() nas versões novas, flush_cache() nas antigas
+        close = getattr(self._page, 'close', None) or getattr(self._page, 'flush_cache', None)
+        if close is not None:
+            close()
+        self._cache = {}
+
+    def replace_page(self, page):
+        """Troca a página original (arquivo reaberto), mantendo o cache"""
+        self._page = page
+
+    def __getattr__(self, name):
+        # Demais atributos (crop, width, chars...) vêm da página original
+        return getattr(self._page, name)
+
+
+class PDFDocument:
+    """PDF aberto uma única vez, com cache por página
+
+    O arquivo só é aberto no primeiro acesso às páginas, assim erros de
+    leitura aparecem no mesmo ponto em que apareciam antes (detecção ou
+    extração).
+    """
+
+    def __init__(self, pdf_path: str, backend: str = None, limits: PageLimits = None):
+        self.pdf_path = str(pdf_path)
+        self.backend = backend or DEFAULT_BACKEND
+        # Limites de memória da leitura página a página
+        self.limits = limits or PageLimits()
+        # Teto de memória estourado mesmo após reabrir (não adianta reabrir de novo)
+        self._over_rss = False
+        self._backend_class = get_backend(self.backend)
+        self._pdf = None
+        self._pages = None
+        # Mesmo arquivo aberto com outros backends (fechados junto com este)
+        self._siblings = {}
+
+    def _open(self):
+        if self._pdf is None:
+            with timed('pdf.abrir'):
+                self._pdf = self._backend_class(self.pdf_path)
+        return self._pdf
+
+    def using(self, backend: str = None) -> 'PDFDocument':
+        """O mesmo PDF lido por outro backend (reaproveitado entre chamadas)"""
+
+        backend = backend or DEFAULT_BACKEND
+        if backend == self.backend:
+            return self
+
+        if backend not in self._siblings:
+            self._siblings[backend] = PDFDocument(self.pdf_path, backend, self.limits)
+        return self._siblings[backend]
+
+    @property
+    def pages(self) -> list:
+        if self._pages is None:
+            pdf = self._open()
+            with timed('pdf.abrir'):
+                self._pages = [CachedPage(page) for page in pdf.pages]
+        return self._pages
+
+    def iter_pages(self, start: int = 0, end: int = None):
+        """Páginas [start, end) uma a uma, liberando cada uma depois de usada
+
+        Os parsers percorrem o extrato em sequência: assim que pedem a
+        próxima página, os objetos e o cache (texto, palavras, tabelas) da
+        anterior são descartados e a memória não cresce com o número de
+        páginas. Conforme self.limits, o arquivo também é reaberto para soltar
+        os objetos internos do PDF guardados pela biblioteca.
+        """
+
+        pages = self.pages
+        end = len(pages) if end is None else min(end, len(pages))
+
+        for index in range(start, end):
+            page = pages[index]
+            try:
+                yield page
+            finally:
+                page.release()
+
+            if index + 1 < end and self.limits.should_reopen(index + 1 - start, not self._over_rss):
+                self._reopen()
+
+    def _reopen(self):
+        """Reabre o arquivo, mantendo o cache de cada página"""
+
+        if self._pdf is None:
+            return
+
+        with timed('pdf.reabrir'):
+            self._pdf.close()
+            self._pdf = self._backend_class(self.pdf_path)
+            for cached, page in zip(self._pages or [], self._pdf.pages):
+                cached.replace_page(page)
+            gc.collect()
+
+        # Reabrir não bastou: o resto da memória não é das páginas
+        rss = current_rss_mb() if self.limits.max_rss_mb else None
+        if rss is not None and rss > self.limits.max_rss_mb and not self._over_rss:
+            self._over_rss = True
+            print(f"⚠️  Memória em {rss:.0f} MB, acima do teto de {self.limits.max_rss_mb:.0f} MB, "
+                  f"mesmo após reabrir {os.path.basename(self.pdf_path)}")
+
+    @property
+    def metadata(self) -> dict:
+        return self._open().metadata or {}
+
+    def close(self):
+        """Fecha o arquivo e descarta os caches"""
+        if self._pdf is not None:
+            self._pdf.close()
+        self._pdf = None
+        self._pages = None
+
+        for sibling in self._siblings.values():
+            sibling.close()
+        self._siblings = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+@contextmanager
+def open_document(pdf_path: str, document: PDFDocument = None, backend: str = None,
+                  limits: PageLimits = None):
+    """Usa o documento compartilhado se houver, senão abre (e fecha) um novo"""
+
+    if document is not None:
+        yield document if backend is None else document.using(backend)
+        return
+
+    with PDFDocument(pdf_path, backend, limits) as doc:
+        yield doc
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Cache em disco dos resultados de extração
+
+Cada entrada é identificada pelo hash do conteúdo do PDF junto com a
+identidade do código de extração (hash dos fontes em src/) e as opções
+que mudam o resultado (backend, banco indicado pelo nome do arquivo...).
+Se o PDF, o nome ou qualquer parser mudar, a chave muda e o arquivo é
+processado de novo.
+
+Estrutura de uma entrada:
+
+    data/cache/<chave>/transacoes.parquet   # DataFrame extraído
+    data/cache/<chave>/info.json            # banco, status, cabeçalho...
+
+O tamanho total é limitado; quando passa do limite as entradas usadas há
+mais tempo são removidas (LRU pela data de modificação da pasta).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from utils.lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+# Incrementar quando o formato das entradas ou da chave mudar
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = "data/cache"
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+DATA_FILE = "transacoes.parquet"
+INFO_FILE = "info.json"
+
+_SRC_DIR = Path(__file__).resolve().parent.parent
+_extractor_identity = None
+
+
+def extractor_identity() -> str:
+    """Hash dos fontes de extração (calculado uma vez por processo)"""
+
+    global _extractor_identity
+
+    if _extractor_identity is None:
+        digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+        for source in sorted(_SRC_DIR.rglob("*.py")):
+            digest.update(str(source.relative_to(_SRC_DIR)).encode())
+            digest.update(source.read_bytes())
+        _extractor_identity = digest.hexdigest()
+
+    return _extractor_identity
+
+
+def file_hash(pdf_path) -> str:
+    """SHA-256 do conteúdo do arquivo"""
+
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Cache de resultados por conteúdo do PDF, com despejo LRU"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key_for(self, pdf_path, *options) -> str:
+        """Chave da entrada: conteúdo do PDF + identidade do extrator
+
+        options entra na chave para separar execuções com configurações que
+        mudam o resultado (ex.: backend de leitura do PDF, banco indicado
+        pelo nome do arquivo).
+        """
+
+        return hashlib.sha256(
+            ":".join([file_hash(pdf_path), extractor_identity()] + [str(o) for o in options]).encode()
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Devolve (DataFrame, info) da entrada ou None se não existir"""
+
+        entry_dir = self.cache_dir / key
+        info_file = entry_dir / INFO_FILE
+
+        if not info_file.exists():
+            return None
+
+        try:
+            with open(info_file, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+
+            data_file = entry_dir / DATA_FILE
+            df = pd.read_parquet(data_file) if data_file.exists() else pd.DataFrame()
+        except Exception:
+            # Entrada corrompida: descarta e reprocessa
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        # Marca como usada recentemente
+        now = time.time()
+        os.utime(entry_dir, (now, now))
+
+        return df, info
+
+    def put(self, key: str, df: pd.DataFrame, info: Dict[str, Any]) -> bool:
+        """Grava a entrada; devolve False se o DataFrame não puder ser salvo"""
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        entry_dir = self.cache_dir / key
+        tmp_dir = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+
+        try:
+            if not df.empty:
+                df.to_parquet(tmp_dir / DATA_FILE)
+
+            with open(tmp_dir / INFO_FILE, 'w', encoding='utf-8') as f:
+                json.dump(info, f, ensure_ascii=False, default=str)
+
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except Exception:
+            # Ex.: coluna com tipos misturados que o Parquet não aceita
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self):
+        """Remove as entradas menos usadas até caber no limite de tamanho"""
+
+        entries = []
+        total = 0
+
+        for entry_dir in self.cache_dir.iterdir():
+            if not entry_dir.is_dir() or entry_dir.name.startswith('.'):
+                continue
+            size = sum(f.stat().st_size for f in entry_dir.iterdir())
+            entries.append((entry_dir.stat().st_mtime, size, entry_dir))
+            total += size
+
+        for _, size, entry_dir in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+
+    def purge(self):
+        """Apaga todo o cache"""
+
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
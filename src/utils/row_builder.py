@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Montagem colunar das transações extraídas
+
+Em vez de um dicionário por transação (repetindo arquivo, banco, conta...
+em todas as linhas), cada coluna é acumulada numa lista própria, ou num
+array de float nas colunas numéricas. Os campos que não mudam (constantes)
+são guardados uma vez só e repetidos apenas ao montar o DataFrame.
+
+    rows = TransactionColumns(
+        ['arquivo', 'data_movimento', 'historico', 'valor', 'banco'],
+        constants={'arquivo': 'extrato.pdf', 'banco': 'ITAÚ'},
+        numeric=['valor']
+    )
+    rows.append('01/02/2024', 'PIX RECEBIDO', 150.0)
+    df = rows.to_frame()
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterable, List
+
+from utils.lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+
+class TransactionColumns:
+    """Transações acumuladas por coluna, com constantes guardadas uma vez"""
+
+    def __init__(self, columns: List[str], constants: Dict[str, Any] = None, numeric: Iterable[str] = ()):
+        # Ordem das colunas no DataFrame final (constantes incluídas)
+        self.columns = list(columns)
+        self.constants = dict(constants or {})
+        self.numeric = set(numeric)
+        self._size = 0
+        self._values = {}
+        # Constantes que viraram colunas em extend(): valor das novas linhas
+        self._fill = {}
+
+        for name in self.columns:
+            if name not in self.constants:
+                self._values[name] = self._new_column(name)
+
+        # Ordem dos valores recebidos em append()
+        self.row_columns = list(self._values)
+
+    def _new_column(self, name: str):
+        return array('d') if name in self.numeric else []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, *values):
+        """Adiciona uma transação (valores das colunas não constantes, em ordem)"""
+
+        for name, value in zip(self.row_columns, values):
+            self._append_value(name, value)
+        for name, value in self._fill.items():
+            self._append_value(name, value)
+        self._size += 1
+
+    def _append_value(self, name: str, value: Any):
+        column = self._values[name]
+        if isinstance(column, array):
+            column.append(np.nan if value is None else value)
+        else:
+            column.append(value)
+
+    def set_constant(self, name: str, value: Any):
+        """Altera o valor de uma coluna constante (vale para todas as linhas)"""
+
+        if name not in self.constants:
+            raise KeyError(f"Coluna não é constante: {name}")
+        self.constants[name] = value
+
+    def _materialize(self, name: str):
+        """Transforma a constante em coluna com um valor por linha"""
+
+        value = self.constants.pop(name)
+        self._fill[name] = value
+        self._values[name] = self._new_column(name)
+        self._values[name].extend([np.nan if value is None and name in self.numeric else value] * self._size)
+
+    def _column_values(self, name: str) -> list:
+        if name in self.constants:
+            value = self.constants[name]
+            if value is None and name in self.numeric:
+                value = np.nan
+            return [value] * self._size
+        return self._values[name]
+
+    def extend(self, other: 'TransactionColumns'):
+        """Acrescenta as transações de outro acumulador com as mesmas colunas"""
+
+        if not len(other):
+            return
+
+        for name in self.columns:
+            same_constant = (name in self.constants and name in other.constants
+                             and self.constants[name] == other.constants[name])
+            if same_constant:
+                continue
+            if name in self.constants:
+                self._materialize(name)
+            self._values[name].extend(other._column_values(name))
+
+        self._size += len(other)
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame das transações (vazio e sem colunas se não houver nenhuma)"""
+
+        if not self._size:
+            return pd.DataFrame()
+
+        data = {}
+        for name in self.columns:
+            if name in self.constants:
+                data[name] = self.constants[name]
+            elif isinstance(self._values[name], array):
+                data[name] = np.array(self._values[name], dtype=float)
+            else:
+                data[name] = self._values[name]
+
+        return pd.DataFrame(data, index=pd.RangeIndex(self._size))
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Manifesto das execuções incrementais do extrator universal
+
+Guarda, para cada PDF da pasta de entrada, o que foi extraído na última
+execução: caminho, tamanho, data de modificação, hash do conteúdo, banco
+detectado, versão do extrator e onde ficaram as transações. Na execução
+seguinte só os arquivos novos ou alterados são processados; as linhas dos
+demais vêm das partições já gravadas e o consolidado é remontado.
+
+    data/output/manifest.json                            # um registro por PDF
+    data/output/transacoes_por_arquivo/<arquivo>.parquet # linhas de cada PDF
+
+Um arquivo é considerado sem alteração quando tamanho e data de modificação
+batem; se só a data mudou (ex.: cópia), o hash do conteúdo decide. Mudança
+em qualquer fonte de src/ (versão do extrator) ou nas opções de leitura
+invalida todos os registros.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.lazy_imports import lazy_import
+from utils.result_cache import extractor_identity, file_hash
+
+pd = lazy_import('pandas')
+
+# Incrementar quando o formato do manifesto mudar
+MANIFEST_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+ROWS_DIR = "transacoes_por_arquivo"
+
+
+class RunManifest:
+    """Registro dos PDFs já extraídos e das partições com as suas linhas"""
+
+    def __init__(self, output_folder: str = "data/output", options: Iterable[Any] = ()):
+        self.output_path = Path(output_folder)
+        self.path = self.output_path / MANIFEST_FILE
+        self.rows_path = self.output_path / ROWS_DIR
+        # Opções que mudam o resultado (ex.: backend de leitura do PDF)
+        self.options = [str(o) for o in options]
+        self.records = self._load()
+        # Datas de modificação atualizadas por is_current (conteúdo igual)
+        self._refreshed = False
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            # Manifesto corrompido: tudo é processado de novo
+            return {}
+
+        if data.get('versao') != MANIFEST_VERSION:
+            return {}
+
+        return data.get('arquivos', {})
+
+    def is_current(self, pdf_file: Path) -> bool:
+        """Indica se o PDF não mudou desde o registro (e a partição ainda existe)"""
+
+        record = self.records.get(pdf_file.name)
+        if record is None:
+            return False
+
+        if record['versao_extrator'] != extractor_identity() or record['opcoes'] != self.options:
+            return False
+
+        if not Path(record['saida']).exists():
+            return False
+
+        stat = pdf_file.stat()
+        if stat.st_size != record['tamanho']:
+            return False
+
+        if stat.st_mtime != record['mtime']:
+            # Só a data mudou: confere o conteúdo
+            if file_hash(pdf_file) != record['hash']:
+                return False
+            record['mtime'] = stat.st_mtime
+            self._refreshed = True
+
+        return True
+
+    def up_to_date(self, pdf_files: List[Path]) -> bool:
+        """Indica se nenhum PDF foi adicionado, alterado ou removido desde o registro
+
+        Só consulta o disco e o manifesto (sem pandas); grava as datas
+        atualizadas de arquivos com o mesmo conteúdo.
+        """
+
+        if {pdf_file.name for pdf_file in pdf_files} != set(self.records):
+            return False
+
+        if not all(self.is_current(pdf_file) for pdf_file in pdf_files):
+            return False
+
+        if self._refreshed:
+            self.save()
+        return True
+
+    def load(self, pdf_file: Path) -> Optional[tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Devolve (DataFrame, entrada do resumo) registrados ou None se a partição falhar"""
+
+        record = self.records[pdf_file.name]
+
+        try:
+            df = pd.read_parquet(record['saida'])
+        except Exception:
+            return None
+
+        return df, dict(record['resultado'])
+
+    def record(self, pdf_file: Path, df: pd.DataFrame, entry: Dict[str, Any]) -> bool:
+        """Grava a partição do PDF e o seu registro; False se o DataFrame não puder ser salvo"""
+
+        self.rows_path.mkdir(parents=True, exist_ok=True)
+
+        output_file = self.rows_path / f"{pdf_file.stem}.parquet"
+        tmp_file = output_file.with_name(f".{output_file.name}.{os.getpid()}.tmp")
+
+        try:
+            df.to_parquet(tmp_file)
+            os.replace(tmp_file, output_file)
+        except Exception:
+            # Ex.: coluna com tipos misturados que o Parquet não aceita
+            tmp_file.unlink(missing_ok=True)
+            self.forget(pdf_file.name)
+            return False
+
+        stat = pdf_file.stat()
+        self.records[pdf_file.name] = {
+            'caminho': str(pdf_file),
+            'tamanho': stat.st_size,
+            'mtime': stat.st_mtime,
+            'hash': file_hash(pdf_file),
+            'banco': entry.get('banco'),
+            'versao_extrator': extractor_identity(),
+            'opcoes': self.options,
+            'saida': str(output_file),
+            # O resumo é recalculado do DataFrame na leitura; tempos são da execução
+            'resultado': {k: v for k, v in entry.items() if k not in ('resumo', 'tempos')}
+        }
+        return True
+
+    def forget(self, name: str):
+        """Remove o registro e a partição de um PDF"""
+
+        record = self.records.pop(name, None)
+        if record is not None:
+            Path(record['saida']).unlink(missing_ok=True)
+
+    def prune(self, pdf_files: List[Path]) -> List[str]:
+        """Esquece os PDFs que saíram da pasta de entrada; devolve os nomes removidos"""
+
+        present = {pdf_file.name for pdf_file in pdf_files}
+        removed = [name for name in self.records if name not in present]
+        for name in removed:
+            self.forget(name)
+        return removed
+
+    def save(self):
+        """Grava o manifesto (substituição atômica)"""
+
+        self.output_path.mkdir(parents=True, exist_ok=True)
+
+        tmp_file = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'versao': MANIFEST_VERSION, 'arquivos': self.records}, f,
+                      ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_file, self.path)
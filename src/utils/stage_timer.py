@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Medição do tempo de cada etapa da extração
+
+Com --timings, cada PDF é processado dentro de recording() e os pontos do
+pipeline marcam suas etapas com timed():
+
+    with timed('pdf.tabelas'):
+        tables = page.extract_tables()
+
+O tempo de cada etapa é o próprio: etapas internas (ex.: texto das páginas
+lido durante a detecção) são descontadas da etapa externa, assim a soma das
+etapas fecha com o total do arquivo e o que sobra para 'extrator.<Classe>'
+é o parsing do próprio parser (regex, montagem das linhas).
+
+Etapas:
+    deteccao                  BankDetector (nome, metadados, conteúdo)
+    pdf.abrir / pdf.reabrir   abertura do arquivo e da lista de páginas
+    pdf.texto / pdf.palavras / pdf.tabelas   leitura de cada página
+    extrator.<Classe>         parsing do extractor do banco
+    estrategia.<nome>         estratégias dos extractors genéricos
+    normalizacao              standardize_output
+    saida                     gravação no destino (Excel, CSV, Parquet)
+
+Sem recording() ativo, timed() devolve um contexto vazio compartilhado (o
+custo é uma comparação). A medição vale para o processo atual; os
+processos do pool devolvem os tempos junto com o resultado de cada arquivo.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Optional
+
+# Agrupamento das etapas nas colunas da tabela por arquivo
+STAGE_GROUPS = {
+    'deteccao': 'detecção',
+    'pdf': 'pdf',
+    'extrator': 'parsing',
+    'estrategia': 'parsing',
+    'normalizacao': 'normaliz.',
+    'saida': 'saída'
+}
+GROUP_COLUMNS = ['detecção', 'pdf', 'parsing', 'normaliz.', 'saída']
+
+_NO_SPAN = nullcontext()
+
+# Medição do processo atual (None = desativada)
+_active = None
+
+
+class StageTimes:
+    """Tempo próprio e número de chamadas de cada etapa, com os eventos para o trace"""
+
+    def __init__(self):
+        self.stages: Dict[str, list] = {}
+        # (etapa, início relativo, duração) de cada chamada
+        self.events = []
+        self.total = None
+        # Tempo das etapas internas de cada etapa aberta
+        self._inner = []
+        self._wall_start = time.time()
+        self._start = time.perf_counter()
+
+    def add(self, stage: str, start: float, end: float):
+        elapsed = end - start
+        inner = self._inner.pop()
+        if self._inner:
+            self._inner[-1] += elapsed
+
+        totals = self.stages.get(stage)
+        if totals is None:
+            totals = self.stages[stage] = [0.0, 0]
+        totals[0] += elapsed - inner
+        totals[1] += 1
+        self.events.append((stage, start - self._start, elapsed))
+
+    def finish(self):
+        self.total = time.perf_counter() - self._start
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'etapas': self.stages,
+            'eventos': self.events,
+            'inicio': self._wall_start,
+            'pid': os.getpid()
+        }
+
+
+class _Span:
+    __slots__ = ('times', 'stage', 'start')
+
+    def __init__(self, times: StageTimes, stage: str):
+        self.times = times
+        self.stage = stage
+
+    def __enter__(self):
+        self.times._inner.append(0.0)
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.times.add(self.stage, self.start, time.perf_counter())
+
+
+def timed(stage: str):
+    """Contexto que soma o tempo do bloco à etapa (nada, sem medição ativa)"""
+
+    if _active is None:
+        return _NO_SPAN
+    return _Span(_active, stage)
+
+
+@contextmanager
+def recording(enabled: bool = True):
+    """Mede as etapas do bloco; devolve o StageTimes (ou None se desativado)"""
+
+    global _active
+
+    if not enabled:
+        yield None
+        return
+
+    previous, _active = _active, StageTimes()
+    times = _active
+    try:
+        yield times
+    finally:
+        times.finish()
+        _active = previous
+
+
+def _group_of(stage: str) -> str:
+    return STAGE_GROUPS.get(stage.split('.')[0], 'outros')
+
+
+def print_timing_report(file_times: Dict[str, Optional[Dict[str, Any]]], run_times: Dict[str, Any] = None):
+    """Tabelas de tempo por arquivo (etapas agrupadas) e por etapa
+
+    file_times: tempos de cada arquivo (None para os que vieram do cache ou
+    do manifesto); run_times: etapas fora dos arquivos (gravação do
+    consolidado).
+    """
+
+    measured = {name: times for name, times in file_times.items() if times}
+    if not measured and not run_times:
+        return
+
+    print("\n⏱️  TEMPO POR ARQUIVO (s):")
+    header = ''.join(f"{column:>10}" for column in ['total'] + GROUP_COLUMNS + ['outros'])
+    print(f"  {'arquivo':<40}{header}")
+
+    stage_totals = {}
+    grand_total = 0.0
+    for name, times in measured.items():
+        groups = dict.fromkeys(GROUP_COLUMNS, 0.0)
+        for stage, (seconds, calls) in times['etapas'].items():
+            groups[_group_of(stage)] = groups.get(_group_of(stage), 0.0) + seconds
+            totals = stage_totals.setdefault(stage, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+        # Etapas sem grupo e tempo fora das etapas (ex.: fechar o arquivo)
+        other = times['total'] - sum(groups[column] for column in GROUP_COLUMNS)
+        grand_total += times['total']
+
+        values = ''.join(f"{groups[column]:>10.2f}" for column in GROUP_COLUMNS)
+        print(f"  {name[:40]:<40}{times['total']:>10.2f}{values}{other:>10.2f}")
+
+    if run_times:
+        for stage, (seconds, calls) in run_times['etapas'].items():
+            totals = stage_totals.setdefault(stage, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+        grand_total += run_times['total']
+        print(f"  {'(consolidado)':<40}{run_times['total']:>10.2f}")
+
+    skipped = len(file_times) - len(measured)
+    if skipped:
+        print(f"  ♻️  {skipped} arquivo(s) do cache/manifesto, sem medição")
+
+    print("\n⏱️  TEMPO POR ETAPA (s):")
+    print(f"  {'etapa':<40}{'tempo':>10}{'chamadas':>10}{'%':>8}")
+    for stage, (seconds, calls) in sorted(stage_totals.items(), key=lambda item: -item[1][0]):
+        share = seconds / grand_total * 100 if grand_total else 0.0
+        print(f"  {stage[:40]:<40}{seconds:>10.2f}{calls:>10}{share:>7.1f}%")
+
+
+def write_trace(trace_file, file_times: Dict[str, Optional[Dict[str, Any]]], run_times: Dict[str, Any] = None):
+    """Grava as chamadas de cada etapa no formato Trace Event (chrome://tracing, Perfetto)"""
+
+    events = []
+    measured = [(name, times) for name, times in file_times.items() if times]
+    if run_times:
+        measured.append(('(consolidado)', run_times))
+
+    for tid, (name, times) in enumerate(measured):
+        # Um "thread" por arquivo dentro do processo que o extraiu
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': times['pid'], 'tid': tid,
+                       'args': {'name': name}})
+        start_us = times['inicio'] * 1e6
+        events.append({'name': name, 'ph': 'X', 'pid': times['pid'], 'tid': tid,
+                       'ts': start_us, 'dur': times['total'] * 1e6})
+        for stage, offset, elapsed in times['eventos']:
+            events.append({'name': stage, 'ph': 'X', 'pid': times['pid'], 'tid': tid,
+                           'ts': start_us + offset * 1e6, 'dur': elapsed * 1e6,
+                           'args': {'arquivo': name}})
+
+    other_data = {name: {'total': times['total'], 'etapas': times['etapas']} for name, times in measured}
+
+    with open(trace_file, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': other_data},
+                  f, ensure_ascii=False)
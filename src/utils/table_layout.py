@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Tabelas de extrato com colunas aprendidas uma vez por documento
+
+page.extract_tables() é a operação mais cara do pdfplumber: a cada página ele
+junta as linhas do desenho, calcula interseções e monta as células. Nos
+extratos as colunas ficam na mesma posição do começo ao fim, então:
+
+- na primeira página com a tabela de transações (reconhecida pelo mesmo
+  critério de cabeçalho do parser), as tabelas são detectadas normalmente e
+  as bordas x das colunas são guardadas;
+- nas páginas seguintes, os caracteres são distribuídos nas células numa
+  passada vetorizada com NumPy: colunas pelas bordas aprendidas, linhas pelas
+  linhas horizontais do desenho, mesclas pelas linhas verticais que cobrem
+  cada linha da tabela; o texto de cada célula sai como no extract_tables;
+- se as linhas verticais da página não baterem com as bordas aprendidas
+  (outro layout), a página volta para extract_tables.
+
+Páginas sem caracteres ou sem linhas de desenho (e backends sem .chars,
+como o PyMuPDF) usam sempre extract_tables.
+
+    reader = LayoutTableReader(lambda row: any('Dt. movimento' in str(c) for c in row if c))
+    for page in pdf.pages:
+        for table in reader.extract_tables(page):
+            ...
+"""
+
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from utils.stage_timer import timed
+
+# Mesmas tolerâncias padrão do pdfplumber (pontos)
+LINE_TOLERANCE = 3
+WORD_TOLERANCE = 3
+EDGE_TOLERANCE = 3
+
+
+class ColumnLayout:
+    """Bordas x das colunas de uma tabela (esquerda de cada coluna + direita da última)"""
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = np.asarray(bounds, dtype=float)
+
+    @property
+    def columns(self) -> int:
+        return len(self.bounds) - 1
+
+    @classmethod
+    def from_table(cls, table) -> 'ColumnLayout':
+        """Bordas a partir de uma tabela do pdfplumber (page.find_tables())"""
+
+        # Mesmas colunas do Table.extract(): cada x0 distinto de célula
+        lefts = sorted(set(cell[0] for cell in table.cells))
+        return cls(lefts + [table.bbox[2]])
+
+    def _edges(self, page):
+        """Linhas do desenho da página dentro da largura da tabela
+
+        Retorna (verticais: x, topo, base), (horizontais: y, x0, x1) ou None se não houver.
+        """
+
+        vertical = getattr(page, 'vertical_edges', None)
+        horizontal = getattr(page, 'horizontal_edges', None)
+        if not vertical or not horizontal:
+            return None
+
+        left, right = self.bounds[0] - EDGE_TOLERANCE, self.bounds[-1] + EDGE_TOLERANCE
+
+        vx = np.fromiter((edge['x0'] for edge in vertical), float, len(vertical))
+        vtop = np.fromiter((edge['top'] for edge in vertical), float, len(vertical))
+        vbottom = np.fromiter((edge['bottom'] for edge in vertical), float, len(vertical))
+        inside = (vx > left) & (vx < right)
+
+        hy = np.fromiter((edge['top'] for edge in horizontal), float, len(horizontal))
+        hx0 = np.fromiter((edge['x0'] for edge in horizontal), float, len(horizontal))
+        hx1 = np.fromiter((edge['x1'] for edge in horizontal), float, len(horizontal))
+        across = (hx1 > left) & (hx0 < right)
+
+        if not inside.any() or not across.any():
+            return None
+
+        return (vx[inside], vtop[inside], vbottom[inside]), (hy[across], hx0[across], hx1[across])
+
+    def matches(self, vx: np.ndarray) -> bool:
+        """Indica se as linhas verticais da página batem com as bordas aprendidas"""
+
+        # Toda borda tem linha na página e toda linha dentro da tabela é borda
+        distance = np.abs(np.unique(vx)[:, None] - self.bounds[None, :])
+        return bool((distance.min(axis=0) <= EDGE_TOLERANCE).all()
+                    and (distance.min(axis=1) <= EDGE_TOLERANCE).all())
+
+    def extract_table(self, page) -> Optional[list]:
+        """Tabela da página no formato do extract_tables, ou None se o layout não bater"""
+
+        chars = getattr(page, 'chars', None)
+        edges = self._edges(page) if chars else None
+        if edges is None:
+            return None
+
+        (vx, vtop, vbottom), (hy, hx0, hx1) = edges
+        if not self.matches(vx):
+            return None
+
+        # Altura da tabela: trecho contínuo coberto pelas linhas verticais (que
+        # já estão todas nas bordas); mais de um trecho indica mais de uma tabela
+        order = np.argsort(vtop)
+        border_top, border_bottom = vtop[order], vbottom[order]
+        reach = np.maximum.accumulate(border_bottom)
+        if (border_top[1:] > reach[:-1] + EDGE_TOLERANCE).any():
+            return None
+        table_top, table_bottom = border_top[0], reach[-1]
+
+        # Linhas da tabela: posições das linhas horizontais agrupadas pela tolerância
+        within = (hy >= table_top - EDGE_TOLERANCE) & (hy <= table_bottom + EDGE_TOLERANCE)
+        hy, hx0, hx1 = hy[within], hx0[within], hx1[within]
+        order = np.argsort(hy, kind='stable')
+        hy, hx0, hx1 = hy[order], hx0[order], hx1[order]
+        row_of_edge = np.cumsum(np.concatenate(([True], np.diff(hy) > EDGE_TOLERANCE))) - 1
+        row_bounds = hy[np.concatenate(([0], np.flatnonzero(np.diff(row_of_edge)) + 1))]
+        if len(row_bounds) < 2:
+            return None
+        rows = len(row_bounds) - 1
+
+        # Célula começa na coluna quando há linha vertical na borda esquerda
+        # cobrindo a linha da tabela e linha horizontal no topo da coluna
+        row_middle = (row_bounds[:-1] + row_bounds[1:]) / 2
+        column_middle = (self.bounds[:-1] + self.bounds[1:]) / 2
+        wall = np.zeros((rows, self.columns), dtype=bool)
+        for col in range(self.columns):
+            near = np.abs(vx - self.bounds[col]) <= EDGE_TOLERANCE
+            wall[:, col] = ((vtop[near][None, :] <= row_middle[:, None])
+                            & (vbottom[near][None, :] >= row_middle[:, None])).any(axis=1)
+        roof = np.zeros((rows + 1, self.columns), dtype=bool)
+        np.logical_or.at(roof, row_of_edge, (hx0[:, None] <= column_middle[None, :])
+                         & (hx1[:, None] >= column_middle[None, :]))
+        own_cell = wall & roof[:rows]
+
+        # Sem parede na borda, a coluna continua a célula da esquerda (mescla);
+        # com parede mas sem célula, o trecho fica fora da tabela (-1)
+        group = np.full((rows, self.columns), -1)
+        for col in range(self.columns):
+            previous = group[:, col - 1] if col else -1
+            group[:, col] = np.where(own_cell[:, col], col, np.where(wall[:, col], -1, previous))
+
+        n = len(chars)
+        x0 = np.fromiter((c['x0'] for c in chars), float, n)
+        x1 = np.fromiter((c['x1'] for c in chars), float, n)
+        top = np.fromiter((c['top'] for c in chars), float, n)
+        bottom = np.fromiter((c['bottom'] for c in chars), float, n)
+        text = np.array([c['text'] for c in chars], dtype=object)
+
+        # Caractere pertence à célula em que está o seu centro
+        middle_x = (x0 + x1) / 2
+        middle_y = (top + bottom) / 2
+        inside = ((middle_x >= self.bounds[0]) & (middle_x < self.bounds[-1])
+                  & (middle_y >= row_bounds[0]) & (middle_y < row_bounds[-1]))
+        x0, x1, top, text = x0[inside], x1[inside], top[inside], text[inside]
+        row = np.searchsorted(row_bounds, middle_y[inside], side='right') - 1
+        column = group[row, np.searchsorted(self.bounds, middle_x[inside], side='right') - 1]
+        in_cell = column >= 0
+        x0, x1, top, text, row, column = x0[in_cell], x1[in_cell], top[in_cell], text[in_cell], row[in_cell], column[in_cell]
+
+        # Células absorvidas por uma mescla ficam None, como no extract_tables;
+        # linhas e colunas sem nenhuma célula própria não entram na tabela
+        present_rows = np.flatnonzero(own_cell.any(axis=1))
+        present_columns = np.flatnonzero(own_cell.any(axis=0))
+        row_position = np.cumsum(own_cell.any(axis=1)) - 1
+        position = np.cumsum(own_cell.any(axis=0)) - 1
+        table = [['' if own_cell[r, c] else None for c in present_columns] for r in present_rows]
+        if not len(x0):
+            return table
+
+        # Linhas de texto dentro de cada célula, pela posição vertical
+        order = np.lexsort((top, column, row))
+        row, column, x0, x1, top, text = row[order], column[order], x0[order], x1[order], top[order], text[order]
+        new_line = np.ones(len(text), dtype=bool)
+        new_line[1:] = (row[1:] != row[:-1]) | (column[1:] != column[:-1]) | (np.diff(top) > LINE_TOLERANCE)
+        line = np.cumsum(new_line)
+
+        # Dentro de cada linha de texto, da esquerda para a direita
+        order = np.lexsort((x0, line))
+        row, column, x0, x1, text, line = row[order], column[order], x0[order], x1[order], text[order], line[order]
+
+        # Espaços não entram no texto, só marcam quebra de palavra
+        blank = np.fromiter((t.isspace() for t in text), bool, len(text))
+        blanks_before = np.cumsum(blank)
+        visible = np.flatnonzero(~blank)
+        if not len(visible):
+            return table
+
+        row, column, line = row[visible], column[visible], line[visible]
+        x0, x1, text, blanks_before = x0[visible], x1[visible], text[visible], blanks_before[visible]
+
+        # Em relação ao caractere visível anterior: mesma célula, mesma linha
+        # de texto, distância maior que a tolerância, espaço entre os dois
+        same_cell = np.zeros(len(text), dtype=bool)
+        same_cell[1:] = (row[1:] == row[:-1]) & (column[1:] == column[:-1])
+        same_line = np.zeros(len(text), dtype=bool)
+        same_line[1:] = line[1:] == line[:-1]
+        word_break = np.zeros(len(text), dtype=bool)
+        word_break[1:] = (x0[1:] > x1[:-1] + WORD_TOLERANCE) | (blanks_before[1:] > blanks_before[:-1])
+        word_break &= same_line
+
+        # Palavras separadas por espaço e linhas da célula por quebra de linha
+        pieces = np.where(word_break, ' ' + text, text)
+        pieces = np.where(same_cell & ~same_line, '\n' + pieces, pieces)
+
+        starts = np.flatnonzero(~same_cell)
+        ends = np.append(starts[1:], len(pieces))
+        for start, end in zip(starts, ends):
+            table[row_position[row[start]]][position[column[start]]] = ''.join(pieces[start:end])
+
+        return table
+
+
+class LayoutTableReader:
+    """extract_tables() que aprende as colunas na primeira tabela de transações
+
+    is_header_row: critério do parser para a linha de cabeçalho da tabela.
+    """
+
+    def __init__(self, is_header_row: Callable[[list], bool]):
+        self.is_header_row = is_header_row
+        self.layout = None
+        # Páginas lidas pelas colunas aprendidas / pela detecção de tabelas
+        self.layout_pages = 0
+        self.table_pages = 0
+
+    def extract_tables(self, page) -> list:
+        with timed('pdf.tabelas'):
+            return self._read_tables(page)
+
+    def _read_tables(self, page) -> list:
+        if self.layout is not None:
+            table = self.layout.extract_table(page)
+            if table is not None:
+                self.layout_pages += 1
+                return [table]
+
+        self.table_pages += 1
+        if self.layout is not None or not hasattr(page, 'find_tables'):
+            return page.extract_tables()
+
+        # Mesmo resultado do extract_tables(), guardando as bordas da
+        # primeira tabela que tiver o cabeçalho de transações
+        found = page.find_tables()
+        tables = [table.extract() for table in found]
+        for table, extracted in zip(found, tables):
+            if any(self.is_header_row(row) for row in extracted if row):
+                self.layout = ColumnLayout.from_table(table)
+                break
+
+        return tables
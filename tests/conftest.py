@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Mesmo ponto de partida do extract_universal.py: pacotes de src/
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
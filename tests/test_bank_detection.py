@@ -0,0 +1,65 @@
+"""Detecção pelo nome do arquivo só vale com confirmação do conteúdo"""
+
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from core.bank_detector import BankDetector, BankType
+from parsers.base_extractor import looks_degenerate
+from utils.pdf_document import PDFDocument
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_PDF = ROOT / 'data' / 'Santander' / 'PM - 0104.pdf'
+
+
+@pytest.fixture
+def bb_named_pdf(tmp_path):
+    if not SAMPLE_PDF.exists():
+        pytest.skip("PDF de exemplo não disponível")
+    # Extrato sem nenhum padrão do BB, com o nome no formato dos arquivos do BB
+    pdf_file = tmp_path / 'BB 110000 - 01 A 10.pdf'
+    shutil.copyfile(SAMPLE_PDF, pdf_file)
+    return pdf_file
+
+
+def test_filename_hint_needs_content_confirmation(bb_named_pdf):
+    assert BankDetector.detect_from_filename(str(bb_named_pdf)) == BankType.BANCO_DO_BRASIL
+
+    with PDFDocument(bb_named_pdf) as document:
+        assert not BankDetector.confirmed_by_content(BankType.BANCO_DO_BRASIL, str(bb_named_pdf), document)
+        bank_type, tier = BankDetector.detect_bank_with_tier(str(bb_named_pdf), document)
+
+    assert tier == BankDetector.TIER_CONTENT
+    assert bank_type != BankType.BANCO_DO_BRASIL
+
+
+def test_same_detection_as_the_original_name(bb_named_pdf):
+    with PDFDocument(SAMPLE_PDF) as document:
+        original = BankDetector.detect_bank_with_tier(str(SAMPLE_PDF), document)
+    with PDFDocument(bb_named_pdf) as document:
+        renamed = BankDetector.detect_bank_with_tier(str(bb_named_pdf), document)
+
+    assert renamed == original
+
+
+def test_degenerate_bb_rows():
+    # Formato das linhas do BBExtractorAdapter num extrato de outro layout
+    df = pd.DataFrame({
+        'historico': ['00000', '14134', '14134'],
+        'documento': ['Saldo Anterior', 'Recebimento Fornecedor', 'Recebimento Fornecedor'],
+        'valor': [222210.56, 189.99, 59.38],
+        'saldo': [222210.56, 189.99, 59.38]
+    })
+    assert looks_degenerate(df)
+
+
+def test_regular_rows_are_not_degenerate():
+    df = pd.DataFrame({
+        'historico': ['PIX RECEBIDO', 'TARIFA', 'TED 001.3306'],
+        'valor': [100.0, -2.5, 50.0],
+        'saldo': [100.0, 97.5, 147.5]
+    })
+    assert not looks_degenerate(df)
+    assert not looks_degenerate(pd.DataFrame())
@@ -0,0 +1,68 @@
+"""Recorte por perfil de layout: só no PyMuPDF e só nas páginas do layout"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from core.bank_detector import BankType
+from core.extractor_factory import ExtractorFactory
+from parsers.enhanced_generic_extractor import EnhancedGenericExtractor
+from utils.layout_profiles import get_layout_profile
+from utils.pdf_backends import backend_available
+from utils.pdf_document import PDFDocument
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_PDF = ROOT / 'data' / 'Santander' / 'PM - 0104.pdf'
+
+needs_pymupdf = pytest.mark.skipif(not backend_available('pymupdf'), reason="PyMuPDF não instalado")
+
+
+@pytest.fixture
+def sample_pdf():
+    if not SAMPLE_PDF.exists():
+        pytest.skip("PDF de exemplo não disponível")
+    return SAMPLE_PDF
+
+
+def test_profile_only_for_pymupdf():
+    assert get_layout_profile('safra', 'pdfplumber') is None
+    assert get_layout_profile('safra', 'pymupdf') is not None
+
+
+def test_factory_skips_profile_under_pdfplumber(sample_pdf):
+    with ExtractorFactory.create_extractor(BankType.SAFRA, str(sample_pdf), backend='pdfplumber') as extractor:
+        assert extractor.layout_profile is None
+
+
+@needs_pymupdf
+def test_factory_uses_profile_under_pymupdf(sample_pdf):
+    with ExtractorFactory.create_extractor(BankType.SAFRA, str(sample_pdf), backend='pymupdf') as extractor:
+        assert extractor.layout_profile is get_layout_profile('safra', 'pymupdf')
+
+
+@pytest.fixture
+def short_pdf(sample_pdf, tmp_path):
+    import pymupdf
+
+    # Primeiras páginas do extrato de exemplo (o arquivo inteiro tem 129)
+    pdf_file = tmp_path / 'amostra.pdf'
+    with pymupdf.open(sample_pdf) as source, pymupdf.open() as target:
+        target.insert_pdf(source, to_page=4)
+        target.save(pdf_file)
+    return pdf_file
+
+
+@needs_pymupdf
+def test_page_without_anchor_is_read_whole(short_pdf):
+    profile = get_layout_profile('safra', 'pymupdf')
+
+    with PDFDocument(short_pdf, 'pymupdf') as document:
+        page = next(document.iter_pages())
+        assert profile.extract_text(page) is None
+
+        cropped, _ = EnhancedGenericExtractor(str(short_pdf), 'Banco Safra', document, 1, profile).extract_statement()
+        whole, _ = EnhancedGenericExtractor(str(short_pdf), 'Banco Safra', document, 1, None).extract_statement()
+
+    assert not whole.empty
+    pd.testing.assert_frame_equal(cropped, whole)
@@ -0,0 +1,47 @@
+"""Leitura página a página sem acumular o cache das páginas já lidas"""
+
+from pathlib import Path
+
+import pytest
+
+from utils.pdf_document import PageLimits, PDFDocument
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_PDF = ROOT / 'data' / 'Santander' / 'PM - 0104.pdf'
+
+PAGES = 30
+
+
+@pytest.fixture
+def sample_pdf():
+    if not SAMPLE_PDF.exists():
+        pytest.skip("PDF de exemplo não disponível")
+    return SAMPLE_PDF
+
+
+def cached_pages(document: PDFDocument) -> int:
+    return sum(1 for page in document.pages if page._cache)
+
+
+@pytest.mark.parametrize('limits', [None, PageLimits(reopen_every=10)])
+def test_iter_pages_keeps_cache_bounded(sample_pdf, limits):
+    with PDFDocument(sample_pdf, limits=limits) as document:
+        for page in document.iter_pages(0, PAGES):
+            assert page.extract_text()
+            page.extract_words()
+            # Só a página atual tem texto/palavras guardados
+            assert cached_pages(document) == 1
+
+        assert cached_pages(document) == 0
+
+
+def test_cache_reused_until_page_is_released(sample_pdf):
+    with PDFDocument(sample_pdf) as document:
+        page = document.pages[0]
+        assert page.extract_text() is page.extract_text()
+
+        for _ in document.iter_pages(0, 1):
+            pass
+        assert not page._cache
+        # Depois de liberada, a página é lida de novo com o mesmo resultado
+        assert page.extract_text()
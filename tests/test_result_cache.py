@@ -0,0 +1,52 @@
+"""Chave do cache: conteúdo do PDF e entradas da detecção do banco"""
+
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from core.universal_extractor import _cache_info, _cache_key
+from utils.result_cache import ResultCache
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_PDF = ROOT / 'data' / 'Santander' / 'PM - 0104.pdf'
+
+
+@pytest.fixture
+def copies(tmp_path):
+    if not SAMPLE_PDF.exists():
+        pytest.skip("PDF de exemplo não disponível")
+    # Mesmo conteúdo com e sem banco no nome do arquivo
+    paths = [tmp_path / 'PM - 0104.pdf', tmp_path / 'BB 110000 - 01 A 10.pdf', tmp_path / 'outro' / 'PM - 0104.pdf']
+    for path in paths:
+        path.parent.mkdir(exist_ok=True)
+        shutil.copyfile(SAMPLE_PDF, path)
+    return paths
+
+
+def test_renamed_file_gets_another_key(copies, tmp_path):
+    cache = ResultCache(tmp_path / 'cache')
+    original, renamed, moved = copies
+
+    assert _cache_key(cache, original) != _cache_key(cache, renamed)
+    # Sem banco no nome, só o conteúdo conta
+    assert _cache_key(cache, original) == _cache_key(cache, moved)
+    assert _cache_key(cache, original) != _cache_key(cache, original, 'pymupdf')
+
+
+def test_renamed_file_misses_the_cache(copies, tmp_path):
+    cache = ResultCache(tmp_path / 'cache')
+    original, renamed, _ = copies
+
+    cache.put(_cache_key(cache, original), pd.DataFrame({'valor': [1.0]}), {'status': 'sucesso'})
+
+    assert cache.get(_cache_key(cache, original)) is not None
+    assert cache.get(_cache_key(cache, renamed)) is None
+
+
+def test_cache_info_drops_run_data():
+    entry = {'banco': 'Itaú', 'status': 'sucesso', 'transacoes': 3,
+             'resumo': {'total_creditos': 1.0}, 'tempos': {'total': 0.5}}
+
+    assert _cache_info(entry) == {'banco': 'Itaú', 'status': 'sucesso', 'transacoes': 3}